@@ -0,0 +1,264 @@
+#! /usr/bin/python3
+"""Benchmarks the main stages over a ladder of sizes and sparsity patterns.
+
+Each stage is timed best of --repeats and reported as JSON with its
+throughput in non zeros per second and megabytes per second. Pass a
+previous JSON output as --baseline to fail on regressions, e.g.
+
+  python3 benchmark.py --sizes 1000,10000 --output baseline.json
+  python3 benchmark.py --sizes 1000,10000 --baseline baseline.json
+
+Stages:
+  validate     validation.ValidateSparseMatrixProto on a SparseMatrix proto.
+  csr_build    sparse_matrix.SparseMatrix from a SparseMatrix proto.
+  spmv         multiply_by_vector with list storage.
+  spmv_numpy   multiply_by_vector with numpy storage.
+  parse        data_io.read_input of the text input file.
+  sor_solve    SparseSorSolver.solve for SOR_ITERATIONS sweeps.
+"""
+import argparse
+import contextlib
+import data_io
+import json
+import math
+import matrix_generator
+import numpy
+import os
+import platform
+import sparse_matrix
+import sparse_sor
+import sys
+import tempfile
+import time
+import validation
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+PATTERNS = ("tridiagonal", "poisson2d", "random")
+STAGES = ("validate", "csr_build", "spmv", "spmv_numpy", "parse", "sor_solve")
+# Sweeps per timed solve. The tolerance is 0 so every solve runs them all.
+SOR_ITERATIONS = 3
+# Off diagonal columns per row of the random pattern.
+RANDOM_NONZEROS_PER_ROW = 8
+# Slowdown over the baseline that counts as a regression.
+DEFAULT_THRESHOLD = 0.1
+SEED = 0
+
+
+def generate_matrix(pattern, size):
+  """Returns a diagonally dominant numpy backed matrix of about size rows."""
+  if pattern == "tridiagonal":
+    return matrix_generator.banded(size, 1, 1, seed=SEED)
+  if pattern == "poisson2d":
+    return matrix_generator.poisson_2d(max(1, int(round(math.sqrt(size)))))
+  if pattern == "random":
+    return matrix_generator.diagonally_dominant(
+        size, RANDOM_NONZEROS_PER_ROW, seed=SEED)
+  raise ValueError("Unknown sparsity pattern: %s" % pattern)
+
+
+def _best_time(function, repeats):
+  """Returns the shortest wall clock time of repeats calls to function."""
+  best = float("inf")
+  for _ in range(repeats):
+    start = time.perf_counter()
+    function()
+    best = min(best, time.perf_counter() - start)
+  return best
+
+
+class _Problem(object):
+  """The inputs every stage needs for one pattern and size, built untimed."""
+
+  def __init__(self, pattern, size, directory):
+    numpy_matrix = generate_matrix(pattern, size)
+    self.rows = numpy_matrix.rows
+    self.nonzeros = len(numpy_matrix.vals)
+    # Bytes of the csr arrays, the data an in memory stage has to touch.
+    self.csr_bytes = 16 * self.nonzeros + 8 * (self.rows + 1)
+    self.numpy_matrix = numpy_matrix
+    self.matrix_proto = data_io.convert_to_sparse_matrix_proto(
+        numpy_matrix.to_csr_proto("a"))
+    self.list_matrix = sparse_matrix.SparseMatrix(self.matrix_proto)
+    self.vector_b = matrix_generator.random_vector(
+        self.rows, (-1.0, 1.0), seed=SEED)
+    self.input_filename = os.path.join(
+        directory, "%s_%s.in" % (pattern, size))
+    data_io.write_input(self.matrix_proto, self.vector_b.to_proto(),
+                        self.input_filename)
+    self.input_bytes = os.path.getsize(self.input_filename)
+    self._solver = None
+
+  def solver(self):
+    if self._solver is None:
+      self._solver = sparse_sor.SparseSorSolver(
+          self.list_matrix, maxits=SOR_ITERATIONS, e=0)
+    return self._solver
+
+  def stage(self, name):
+    """Returns the callable to time, the non zeros and the bytes it covers."""
+    if name == "validate":
+      return (lambda: validation.ValidateSparseMatrixProto(self.matrix_proto),
+              self.nonzeros, self.csr_bytes)
+    if name == "csr_build":
+      return (lambda: sparse_matrix.SparseMatrix(self.matrix_proto),
+              self.nonzeros, self.csr_bytes)
+    if name == "spmv":
+      return (lambda: self.list_matrix.multiply_by_vector(self.vector_b),
+              self.nonzeros, self.csr_bytes)
+    if name == "spmv_numpy":
+      return (lambda: self.numpy_matrix.multiply_by_vector(self.vector_b),
+              self.nonzeros, self.csr_bytes)
+    if name == "parse":
+      return (lambda: data_io.read_input(self.input_filename),
+              self.nonzeros, self.input_bytes)
+    if name == "sor_solve":
+      solver = self.solver()
+      return (lambda: solver.solve(self.vector_b),
+              SOR_ITERATIONS * self.nonzeros, SOR_ITERATIONS * self.csr_bytes)
+    raise ValueError("Unknown stage: %s" % name)
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, patterns=PATTERNS, stages=STAGES,
+                   repeats=3, log=None):
+  """Times every stage for every pattern and size.
+
+  Args:
+    sizes: A sequence of integer row counts.
+    patterns: A sequence of PATTERNS names.
+    stages: A sequence of STAGES names.
+    repeats: The integer number of timed runs. The fastest is reported.
+    log: An optional file object for progress lines.
+  Returns:
+    A list of result dicts, one per stage, pattern and size.
+  """
+  results = []
+  with tempfile.TemporaryDirectory() as directory:
+    for pattern in patterns:
+      for size in sizes:
+        problem = _Problem(pattern, size, directory)
+        for stage in stages:
+          function, nonzeros, stage_bytes = problem.stage(stage)
+          seconds = _best_time(function, repeats)
+          result = {
+              "stage": stage, "pattern": pattern, "size": size,
+              "rows": problem.rows, "nonzeros": problem.nonzeros,
+              "seconds": seconds,
+              "nonzeros_per_second": nonzeros / seconds if seconds else None,
+              "megabytes_per_second":
+                  stage_bytes / seconds / 1e6 if seconds else None}
+          results.append(result)
+          if log is not None:
+            print("%-10s %-11s %8d rows %10.4f s %12.3g nnz/s" % (
+                stage, pattern, problem.rows, seconds,
+                result["nonzeros_per_second"] or 0), file=log)
+        os.remove(problem.input_filename)
+  return results
+
+
+def _result_key(result):
+  return (result["stage"], result["pattern"], result["size"])
+
+
+def compare_to_baseline(results, baseline_results,
+                        threshold=DEFAULT_THRESHOLD):
+  """Finds the results that are slower than their baseline.
+
+  Args:
+    results: A list of result dicts from run_benchmarks.
+    baseline_results: A list of result dicts from an earlier run. Results
+        without a baseline are skipped.
+    threshold: The float fraction a stage may slow down by, e.g. 0.1 allows
+        10% longer than the baseline.
+  Returns:
+    A list of dicts of the stage, pattern, size, both times and the ratio of
+        each regression.
+  """
+  baseline = {_result_key(result): result for result in baseline_results}
+  regressions = []
+  for result in results:
+    base = baseline.get(_result_key(result))
+    if base is None or not base["seconds"]:
+      continue
+    ratio = result["seconds"] / base["seconds"]
+    if ratio > 1 + threshold:
+      regressions.append({
+          "stage": result["stage"], "pattern": result["pattern"],
+          "size": result["size"], "seconds": result["seconds"],
+          "baseline_seconds": base["seconds"], "ratio": ratio})
+  return regressions
+
+
+def environment():
+  """Returns a dict describing where the benchmarks ran."""
+  return {"python": platform.python_version(), "numpy": numpy.__version__,
+          "platform": platform.platform(), "processor": platform.processor(),
+          "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+
+def _int_list(text):
+  return [int(value) for value in text.split(",")]
+
+
+def _name_list(choices):
+  def parse(text):
+    names = text.split(",")
+    unknown = sorted(set(names) - set(choices))
+    if unknown:
+      raise argparse.ArgumentTypeError(
+          "Unknown %s. Choose from %s" % (", ".join(unknown),
+                                          ", ".join(choices)))
+    return names
+  return parse
+
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(
+      description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES),
+                      help="Comma separated row counts.")
+  parser.add_argument("--patterns", type=_name_list(PATTERNS),
+                      default=list(PATTERNS))
+  parser.add_argument("--stages", type=_name_list(STAGES),
+                      default=list(STAGES))
+  parser.add_argument("--repeats", type=int, default=3)
+  parser.add_argument("--output", default=None,
+                      help="JSON file for the results. Defaults to stdout.")
+  parser.add_argument("--baseline", default=None,
+                      help="JSON output of an earlier run to compare with.")
+  parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="Fractional slowdown over the baseline that is a "
+                      "regression.")
+  args = parser.parse_args(argv)
+  if args.repeats < 1:
+    parser.error("--repeats must be at least 1")
+  return args
+
+
+def main(argv=None):
+  args = parse_args(argv)
+  # The solver prints warnings, which must not end up in the JSON on stdout.
+  with contextlib.redirect_stdout(sys.stderr):
+    results = run_benchmarks(args.sizes, args.patterns, args.stages,
+                             args.repeats, log=sys.stderr)
+  report = {"environment": environment(), "results": results}
+  if args.baseline:
+    with open(args.baseline) as file_obj:
+      baseline_results = json.load(file_obj)["results"]
+    report["threshold"] = args.threshold
+    report["regressions"] = compare_to_baseline(
+        report["results"], baseline_results, args.threshold)
+  if args.output:
+    with open(args.output, "w") as file_obj:
+      json.dump(report, file_obj, indent=2)
+  else:
+    json.dump(report, sys.stdout, indent=2)
+    print()
+  for regression in report.get("regressions", []):
+    print("Regression: %(stage)s %(pattern)s %(size)s took %(seconds).4f s, "
+          "%(ratio).2fx the baseline %(baseline_seconds).4f s" % regression,
+          file=sys.stderr)
+  return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
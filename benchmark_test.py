@@ -0,0 +1,63 @@
+#! /usr/bin/python3
+"""Unit tests associated with benchmark.py."""
+import benchmark
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+class BenchmarkTest(unittest.TestCase):
+
+  def testRunBenchmarks(self):
+    results = benchmark.run_benchmarks(
+        sizes=[50], patterns=benchmark.PATTERNS, stages=benchmark.STAGES,
+        repeats=1)
+    self.assertEqual(len(benchmark.PATTERNS) * len(benchmark.STAGES),
+                     len(results))
+    for result in results:
+      self.assertEqual(50, result["size"])
+      self.assertGreater(result["nonzeros"], 0)
+      self.assertGreaterEqual(result["seconds"], 0)
+    self.assertEqual(49, [result["rows"] for result in results
+                          if result["pattern"] == "poisson2d"][0])
+
+  def testCompareToBaseline(self):
+    baseline = [
+        {"stage": "spmv", "pattern": "random", "size": 10, "seconds": 1.0},
+        {"stage": "parse", "pattern": "random", "size": 10, "seconds": 1.0}]
+    results = [
+        {"stage": "spmv", "pattern": "random", "size": 10, "seconds": 1.05},
+        {"stage": "parse", "pattern": "random", "size": 10, "seconds": 1.5},
+        {"stage": "parse", "pattern": "random", "size": 20, "seconds": 9.0}]
+    regressions = benchmark.compare_to_baseline(results, baseline, 0.1)
+    self.assertEqual(1, len(regressions))
+    self.assertEqual(("parse", 1.5), (regressions[0]["stage"],
+                                      regressions[0]["ratio"]))
+    self.assertEqual(2, len(benchmark.compare_to_baseline(
+        results, baseline, 0.0)))
+
+  def testMainWritesJsonAndFailsOnRegression(self):
+    with tempfile.TemporaryDirectory() as directory:
+      output = os.path.join(directory, "results.json")
+      argv = ["--sizes", "20", "--patterns", "tridiagonal", "--stages",
+              "spmv,validate", "--repeats", "1", "--output", output]
+      with mock.patch("sys.stderr", io.StringIO()):
+        self.assertEqual(0, benchmark.main(argv))
+      with open(output) as file_obj:
+        report = json.load(file_obj)
+      self.assertEqual(2, len(report["results"]))
+      self.assertIn("numpy", report["environment"])
+      for result in report["results"]:
+        result["seconds"] = 1e-12
+      baseline = os.path.join(directory, "baseline.json")
+      with open(baseline, "w") as file_obj:
+        json.dump(report, file_obj)
+      with mock.patch("sys.stderr", io.StringIO()):
+        self.assertEqual(1, benchmark.main(argv + ["--baseline", baseline]))
+      with open(output) as file_obj:
+        self.assertEqual(2, len(json.load(file_obj)["regressions"]))
+
+if __name__ == '__main__':
+  unittest.main()
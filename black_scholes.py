@@ -1,13 +1,17 @@
 #! /usr/bin/python3
 """This script is for running the black sholes algorithm for option pricing."""
 
+import argparse
+import copy
+import functools
 import numpy
 import math
+import plotting
 import sparse_matrix
+import sys
 import vector
 import sparse_sor
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import tridiagonal_solver
 
 
 # These values can be adjusted as required.
@@ -23,6 +27,9 @@ strike_price = 1 # Price at which we can sell our asset at time 0.
 # scalar for converting rates to relevant time period of days.
 k = (time_to_exercise / timesteps_total) / 365
 
+# Number of discretizations whose operator and solver are kept in memory.
+OPERATOR_CACHE_SIZE = 32
+
 def start_prices(strike_price, stock_prices_time_0):
   """This calculates the list of start prices of the option at time 0.
 
@@ -62,6 +69,38 @@ def generate_black_scholes_matrix(N, k, sigma, r):
   return grid
 
 
+def generate_black_scholes_sparse_matrix(N, k, sigma, r, use_numpy=False):
+  """Generates the black scholes matrix directly in csr form in O(N).
+
+  The three diagonals are computed with vectorized numpy operations in the
+  same order as generate_black_scholes_matrix, so the coefficients are bit
+  identical to it, and like it 0 valued coefficients are not stored.
+
+  Args:
+    N: The desired dimension of the matrix. we want to work from 0 to N-1.
+    k: The number of intervals into which each timestep is broken.
+    sigma: The standard deviation
+    r: The risk free rate.
+    use_numpy: boolean whether the returned matrix uses numpy storage.
+
+  Returns:
+    A sparse_matrix.SparseMatrix.
+  """
+  n = numpy.arange(1, N + 1, dtype=numpy.float64)
+  rows = numpy.arange(N, dtype=numpy.int64)
+  # Each row holds its previous, current and next element in column order.
+  cols = numpy.stack([rows - 1, rows, rows + 1], axis=1)
+  vals = numpy.stack([
+      -((n * k) / 2) * (n * sigma ** 2 - r),
+      1 + (k * r) + (k * (sigma ** 2) * (n ** 2)),
+      -((n * k) / 2) * (n * (sigma ** 2) + r)], axis=1)
+  stored = (cols >= 0) & (cols < N) & (vals != 0)
+  row_start = numpy.zeros(N + 1, dtype=numpy.int64)
+  numpy.cumsum(stored.sum(axis=1), out=row_start[1:])
+  return sparse_matrix.SparseMatrix(
+      csr_arrays=(row_start, cols[stored], vals[stored]), use_numpy=use_numpy)
+
+
 def generate_adjustment_term(strike_price, k, sigma, r):
   """Generate the adjustment term for f_(1,m+1).
 
@@ -90,10 +129,81 @@ def generate_stock_price_array(stock_price_max, h):
           h + 1)]
 
 
+def build_black_scholes_solver(h, k, sigma, r, direct=False):
+  """Builds the solver for the timesteps of one discretization.
+
+  It only depends on h, k, sigma and r, so it can be shared by every
+  timestep and by every strike price priced on the same grid.
+
+  Args:
+    h: h the number of intervals into which the price is broken.
+    k: k the number of intervals into which each timestep is broken.
+    sigma: The standard deviation
+    r: The risk free rate.
+    direct: boolean whether to use the tridiagonal (Thomas) solver.
+
+  Returns:
+    A tridiagonal_solver.TridiagonalSolver or sparse_sor.SparseSorSolver.
+  """
+  # A matrix will have N-2 * N-2 elements. Of which only 3 * N-2 are populated
+  A = generate_black_scholes_sparse_matrix(h - 1, k, sigma, r)
+  if direct and A.is_tridiagonal():
+    return tridiagonal_solver.TridiagonalSolver(A)
+  return sparse_sor.SparseSorSolver(A, maxits=100, e=.0001, w=1.0, fused=True)
+
+
+@functools.lru_cache(maxsize=OPERATOR_CACHE_SIZE)
+def _cached_black_scholes_solver(h, k, sigma, r, direct):
+  """A solver that is never solved with, so it only holds the setup."""
+  return build_black_scholes_solver(h, k, sigma, r, direct)
+
+
+def get_black_scholes_solver(h, k, sigma, r, direct=False):
+  """Returns a solver for a discretization built from an in process LRU cache.
+
+  Pricings that differ only in strike price or payoff reuse the built
+  operator A and its solver setup instead of regenerating them. The setup
+  (A and its diagonal split or factorization) is never modified, so it is
+  shared. Every call returns a new shallow copy of the cached solver, so
+  the per solve state (b, x, iteration, stopping_reason, sweep_times) of
+  one caller is never seen or overwritten by another, including from other
+  threads.
+
+  Args:
+    h: h the number of intervals into which the price is broken.
+    k: k the number of intervals into which each timestep is broken.
+    sigma: The standard deviation
+    r: The risk free rate.
+    direct: boolean whether to use the tridiagonal (Thomas) solver.
+
+  Returns:
+    A solver from build_black_scholes_solver owned by the caller.
+  """
+  return copy.copy(_cached_black_scholes_solver(h, k, sigma, r, bool(direct)))
+
+
+def operator_cache_stats():
+  """Returns a dict of the operator cache hits, misses, size and bound."""
+  info = _cached_black_scholes_solver.cache_info()
+  return {"hits": info.hits, "misses": info.misses, "entries": info.currsize,
+          "max_entries": info.maxsize}
+
+
+def clear_operator_cache():
+  """Drops every cached operator and resets the hit and miss counts."""
+  _cached_black_scholes_solver.cache_clear()
+
+
 def generate_option_price_grid(
-    timesteps, strike_price, h, k, sigma, r, stock_price_array):
+    timesteps, strike_price, h, k, sigma, r, stock_price_array,
+    warm_start=False, iteration_counts=None, direct=False, keep_last=None,
+    solver=None):
   """Generate the matrix of option prices for each price, timestep pair.
 
+  The grid is one preallocated float64 array. Each timestep's solution and
+  boundary prices are written straight into its row, so no per step copies
+  of the price row are made.
+
   Args:
     timesteps: The integer number of timesteps to run for.
     strike_price: The strike price of the option in question.
@@ -101,36 +211,66 @@ def generate_option_price_grid(
     k: k the number of intervals into which each timestep is broken.
     sigma: The standard deviation
     r: The risk free rate.
+    warm_start: boolean whether to start each timestep's solve from the
+        previous timestep's solution instead of 0.
+    iteration_counts: An optional list. The SOR iteration count of every
+        timestep is appended to it.
+    direct: boolean whether to solve each timestep directly with the
+        tridiagonal (Thomas) solver instead of iterating with SOR.
+    keep_last: An optional integer K. Only the last K timesteps are kept,
+        in a ring of K rows, to bound memory on very fine grids.
+    solver: An optional solver from build_black_scholes_solver for the same
+        h, k, sigma and r. Taken from the operator cache otherwise.
 
   Returns:
-    A list of lists matrix. The  rows are for different stock prices and the
-        columns are the different timesteps.
+    A numpy array of shape (timesteps + 1, h + 1), or (K, h + 1) with
+        keep_last. The rows are the timesteps in order, the columns are the
+        stock prices.
+  Raises:
+    ValueError if keep_last is less than 1.
   """
-  option_price_grid =[[None for _ in range(h + 1)] for _ in range(
-      timesteps + 1)]
-  # row is across prices columns are over time
+  if keep_last is not None and keep_last < 1:
+    raise ValueError("keep_last must be at least 1")
+  row_count = timesteps + 1
+  if keep_last is not None:
+    row_count = min(keep_last, row_count)
+  option_price_grid = numpy.empty((row_count, h + 1), dtype=numpy.float64)
   option_price_grid[0] = start_prices(strike_price, stock_price_array)
-  # A matrix will have N-2 * N-2 elements. Of which only 3 * N-2 are populated
-  A = sparse_matrix.SparseMatrix(dense_matrix=generate_black_scholes_matrix(
-      h - 1, k, sigma, r))
+  sparse_sor_solver = solver
+  if sparse_sor_solver is None:
+    sparse_sor_solver = get_black_scholes_solver(h, k, sigma, r, direct)
 
   adjustment = generate_adjustment_term(strike_price, k, sigma, r)
-  time_step = 1
-  while time_step < (timesteps + 1):
-    # Need to create a new list here to avoid Python list mutability.
-    f_vector = option_price_grid[time_step - 1][:]
+  for time_step in range(1, timesteps + 1):
+    previous = option_price_grid[(time_step - 1) % row_count]
+    f = vector.Vector(number_list=previous[1:-1])
     # Need to adjust 1st element by adding adjustment term.
-    f_vector[1] += adjustment
-    f = vector.Vector(number_list=f_vector[1:-1])
-    sparse_sor_solver = sparse_sor.SparseSorSolver(A, f, 100, .0001, 1.0)
-    option_price_grid[time_step] = (
-        [strike_price] + sparse_sor_solver.get_solution().values + [0])
-    time_step += 1
+    f.buffer[0] += adjustment
+    x0 = None
+    if warm_start and time_step > 1:
+      x0 = previous[1:-1].tolist()
+    sparse_sor_solver.solve(f, x0)
+    if iteration_counts is not None:
+      iteration_counts.append(sparse_sor_solver.iteration)
+    row = option_price_grid[time_step % row_count]
+    # Boundary conditions. The option is worth the strike price when the
+    # stock is worthless and nothing at the maximum stock price. They are
+    # set on every row written, as a ring slot may still hold the edges of
+    # the start prices.
+    row[0] = strike_price
+    row[-1] = 0
+    row[1:-1] = sparse_sor_solver.x
+  oldest_row = (timesteps + 1) % row_count
+  if oldest_row:
+    # Rotate the ring so the kept rows are in time order.
+    option_price_grid = numpy.roll(option_price_grid, -oldest_row, axis=0)
   return option_price_grid
 
 
 def run_black_scholes(
-    time_to_exercise, timesteps, strike_price, h ,k, sigma, r, stock_price_max):
+    time_to_exercise, timesteps, strike_price, h ,k, sigma, r, stock_price_max,
+    warm_start=False, iteration_counts=None, direct=False, keep_last=None,
+    solver=None, verbose=True):
   """Runs the black scholes program.
 
   Args:
@@ -141,25 +281,41 @@ def run_black_scholes(
     k: k the number of intervals into which each timestep is broken.
     sigma: The standard deviation
     r: The risk free rate.
+    warm_start: boolean whether to warm start each timestep's solve from the
+        previous solution.
+    iteration_counts: An optional list to append per timestep iteration
+        counts to.
+    direct: boolean whether to use the direct tridiagonal solver.
+    keep_last: An optional integer number of final timesteps to keep.
+    solver: An optional shared solver from build_black_scholes_solver.
+    verbose: boolean whether to print the grid dimensions.
 
   Returns:
-    A dict mapping the stock price at time timestep to the option price.
+    The numpy option price grid from generate_option_price_grid.
   Raises:
     Exception if the passed k and h values are unstable.
   """
   if (k / h ** 2) >= 1 / 2:
     raise Exception("k/h**2 needs to be less than 1/2 for stability")
-  print("Price intervals: %s\nTime_intervals: %s days"
-        % (h + 1, time_to_exercise))
+  if verbose:
+    print("Price intervals: %s\nTime_intervals: %s days"
+          % (h + 1, time_to_exercise))
   stock_price_array = generate_stock_price_array(stock_price_max, h)
   option_price_grid = generate_option_price_grid(
-      timesteps, strike_price, h, k, sigma, r, stock_price_array)
+      timesteps, strike_price, h, k, sigma, r, stock_price_array,
+      warm_start=warm_start, iteration_counts=iteration_counts,
+      direct=direct, keep_last=keep_last, solver=solver)
   return option_price_grid
 
 def generate_3d_plot(
     time_to_exercise, timesteps_total, stock_price_array, option_price_grid,
-    exercise_price, sigma):
-  """Generate 3d plot of the computed data."""
+    exercise_price, sigma, headless=False, output_dir="."):
+  """Generate 3d plot of the computed data.
+
+  matplotlib is imported here, so pricing without plotting never loads it.
+  In headless mode the plot is saved as black_scholes_surface.png.
+  """
+  plt = plotting.get_pyplot(headless)
   fig = plt.figure()
   ax = fig.add_subplot(111, projection='3d')
   # Need to include time t
@@ -173,21 +329,47 @@ def generate_3d_plot(
   ax.set_ylabel('Time to Exercise (days)')
   ax.set_zlabel('Option Price ($)')
   plt.title('Black Scholes Option Price Surface for Strike Price X = $%s, '
-            'Sigma = %s' %  (strike_price, sigma), y=1.025)
+            'Sigma = %s' %  (exercise_price, sigma), y=1.025)
 
+  plotting.finish_plot(plt, "black_scholes_surface", headless, output_dir)
 
 
-  plt.show()
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument(
+      "--headless", action="store_true",
+      help="Write the prices to CSV and the surface to PNG instead of "
+      "showing a plot.")
+  parser.add_argument("--output-dir", default=".",
+                      help="Directory for the headless CSV and PNG files.")
+  parser.add_argument("--no-plot", action="store_true",
+                      help="Skip the surface plot.")
+  args = parser.parse_args(argv)
 
-if __name__ == "__main__":
+  iteration_counts = []
   option_price_grid = run_black_scholes(
       time_to_exercise,
-      timesteps_total, strike_price, h, k, sigma, r, stock_price_max)
+      timesteps_total, strike_price, h, k, sigma, r, stock_price_max,
+      warm_start=True, iteration_counts=iteration_counts)
+  print("SOR iterations per timestep: %s" % iteration_counts)
 
   stock_price_array = generate_stock_price_array(stock_price_max, h)
-  values = {stock_price: option_price for stock_price, option_price in
-            zip(stock_price_array, option_price_grid[-1])}
-  for key, value in sorted(values.items()):
-    print("Stock price: %s, Option price: %s" % (key, value))
-  generate_3d_plot(time_to_exercise, timesteps_total, stock_price_array,
-                    option_price_grid, strike_price, sigma)
+  if args.headless:
+    plotting.write_csv(
+        "black_scholes_prices", ["stock_price", "option_price"],
+        zip(stock_price_array, option_price_grid[-1].tolist()),
+        args.output_dir)
+  else:
+    values = {stock_price: option_price for stock_price, option_price in
+              zip(stock_price_array, option_price_grid[-1])}
+    for key, value in sorted(values.items()):
+      print("Stock price: %s, Option price: %s" % (key, value))
+  if not args.no_plot:
+    generate_3d_plot(time_to_exercise, timesteps_total, stock_price_array,
+                     option_price_grid, strike_price, sigma, args.headless,
+                     args.output_dir)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,235 @@
+#! /usr/bin/python3
+"""Prices a grid of Black Scholes configurations across a process pool.
+
+Configurations that share h, k, sigma and r share one operator and solver
+through the black_scholes operator cache, so each worker builds the matrix
+once per discretization rather than once per strike. Results
+are written as CSV as soon as each task finishes, e.g.
+
+  python3 black_scholes_sweep.py --strikes 0.8,0.9,1.0,1.1 \
+      --sigmas 0.2,0.3 --rates 0.02 --workers 4 --output surface.csv
+
+Pass --scaling 1,2,4 to time the same sweep at each worker count.
+"""
+import argparse
+import black_scholes
+import collections
+import concurrent.futures
+import csv
+import itertools
+import math
+import os
+import sys
+import time
+
+# One configuration to price. The fields are the run_black_scholes
+# arguments of the same names.
+PricingParameters = collections.namedtuple(
+    "PricingParameters", ["time_to_exercise", "timesteps", "strike_price", "h",
+                          "k", "sigma", "r", "stock_price_max"])
+
+# The priced configuration. option_prices are the prices at exercise for
+# each of the h + 1 stock_prices.
+SweepResult = collections.namedtuple(
+    "SweepResult", ["parameters", "stock_prices", "option_prices",
+                    "iterations", "seconds"])
+
+# Wall clock time of one sweep at a worker count. Speedup and efficiency are
+# relative to the first worker count measured.
+ScalingPoint = collections.namedtuple(
+    "ScalingPoint", ["workers", "seconds", "speedup", "efficiency"])
+
+# Tasks per worker. More tasks balance the load better, fewer share more.
+TASKS_PER_WORKER = 4
+
+
+def parameter_grid(strike_prices, sigmas, rates, time_to_exercise=30,
+                   timesteps=30, h=200, stock_price_max=2.0):
+  """Returns the PricingParameters for every strike, sigma and r.
+
+  k is derived from the time to exercise as in black_scholes.py.
+  """
+  k = (time_to_exercise / timesteps) / 365
+  return [PricingParameters(time_to_exercise, timesteps, strike_price, h, k,
+                            sigma, r, stock_price_max)
+          for sigma, r, strike_price in itertools.product(
+              sigmas, rates, strike_prices)]
+
+
+def _operator_key(parameters):
+  """The parameters the operator A and its solver depend on."""
+  return (parameters.h, parameters.k, parameters.sigma, parameters.r)
+
+
+def plan_tasks(parameter_sets, workers):
+  """Splits the parameter sets into tasks that each share one operator.
+
+  Args:
+    parameter_sets: A list of PricingParameters.
+    workers: The integer number of worker processes.
+  Returns:
+    A list of lists of PricingParameters. Every list has one operator key.
+  """
+  chunk_size = max(1, math.ceil(
+      len(parameter_sets) / (workers * TASKS_PER_WORKER)))
+  groups = collections.OrderedDict()
+  for parameters in parameter_sets:
+    groups.setdefault(_operator_key(parameters), []).append(parameters)
+  return [group[start:start + chunk_size] for group in groups.values()
+          for start in range(0, len(group), chunk_size)]
+
+
+def price_task(parameter_sets, direct=False, warm_start=True):
+  """Prices configurations sharing one operator. Runs in a sweep worker.
+
+  Returns:
+    A list of SweepResult in the order of parameter_sets.
+  """
+  first = parameter_sets[0]
+  solver = black_scholes.get_black_scholes_solver(
+      first.h, first.k, first.sigma, first.r, direct)
+  results = []
+  for parameters in parameter_sets:
+    start = time.perf_counter()
+    iteration_counts = []
+    option_price_grid = black_scholes.run_black_scholes(
+        *parameters, warm_start=warm_start, iteration_counts=iteration_counts,
+        direct=direct, keep_last=1, solver=solver, verbose=False)
+    results.append(SweepResult(
+        parameters,
+        black_scholes.generate_stock_price_array(
+            parameters.stock_price_max, parameters.h),
+        option_price_grid[-1].tolist(), sum(iteration_counts),
+        time.perf_counter() - start))
+  return results
+
+
+def run_sweep(parameter_sets, workers=None, direct=False, warm_start=True):
+  """Prices every configuration across a pool of worker processes.
+
+  Args:
+    parameter_sets: A list of PricingParameters.
+    workers: The integer number of worker processes. Defaults to the number
+        of CPUs.
+    direct: boolean whether to use the direct tridiagonal solver.
+    warm_start: boolean whether to warm start each timestep's SOR solve.
+  Yields:
+    A SweepResult for every configuration, in the order the tasks finish.
+  """
+  workers = workers or os.cpu_count()
+  with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+    futures = [pool.submit(price_task, task, direct, warm_start)
+               for task in plan_tasks(parameter_sets, workers)]
+    for future in concurrent.futures.as_completed(futures):
+      yield from future.result()
+
+
+def measure_scaling(parameter_sets, worker_counts, direct=False,
+                    warm_start=True):
+  """Times the whole sweep at each worker count.
+
+  Returns:
+    A list of ScalingPoint in the order of worker_counts.
+  """
+  points = []
+  for workers in worker_counts:
+    start = time.perf_counter()
+    for _ in run_sweep(parameter_sets, workers, direct, warm_start):
+      pass
+    seconds = time.perf_counter() - start
+    base_workers = points[0].workers if points else workers
+    base_seconds = points[0].seconds if points else seconds
+    speedup = base_seconds / seconds
+    points.append(ScalingPoint(
+        workers, seconds, speedup, speedup * base_workers / workers))
+  return points
+
+
+def format_scaling_report(points):
+  """Returns a printable table of ScalingPoints."""
+  lines = ["%8s %10s %8s %10s" % ("workers", "seconds", "speedup",
+                                  "efficiency")]
+  for point in points:
+    lines.append("%8d %10.3f %8.2f %10.2f" % point)
+  return "\n".join(lines)
+
+
+def _float_list(text):
+  return [float(value) for value in text.split(",")]
+
+
+def _int_list(text):
+  return [int(value) for value in text.split(",")]
+
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(
+      description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--strikes", type=_float_list, default=[1.0],
+                      help="Comma separated strike prices.")
+  parser.add_argument("--sigmas", type=_float_list, default=[.3],
+                      help="Comma separated daily standard deviations.")
+  parser.add_argument("--rates", type=_float_list, default=[0.02],
+                      help="Comma separated daily risk free rates.")
+  parser.add_argument("--days", type=int, default=30,
+                      help="Days to exercise.")
+  parser.add_argument("--timesteps", type=int, default=30)
+  parser.add_argument("--h", type=int, default=200,
+                      help="Number of stock price intervals.")
+  parser.add_argument("--stock-price-max", type=float, default=2.0)
+  parser.add_argument("--workers", type=int, default=os.cpu_count())
+  parser.add_argument("--direct", action="store_true",
+                      help="Use the direct tridiagonal solver.")
+  parser.add_argument("--output", default=None,
+                      help="CSV file for the prices. Defaults to stdout.")
+  parser.add_argument("--scaling", type=_int_list, default=None,
+                      help="Comma separated worker counts to time the sweep "
+                      "at instead of writing prices.")
+  args = parser.parse_args(argv)
+  if args.workers < 1 or (args.scaling and min(args.scaling) < 1):
+    parser.error("Worker counts must be at least 1")
+  return args
+
+
+def write_results(results, file_obj):
+  """Writes SweepResults as CSV rows as they arrive. Returns the count."""
+  writer = csv.writer(file_obj)
+  writer.writerow(["strike_price", "sigma", "r", "stock_price",
+                   "option_price", "iterations", "seconds"])
+  count = 0
+  for result in results:
+    parameters = result.parameters
+    for stock_price, option_price in zip(result.stock_prices,
+                                         result.option_prices):
+      writer.writerow([parameters.strike_price, parameters.sigma,
+                       parameters.r, stock_price, option_price,
+                       result.iterations, "%.6f" % result.seconds])
+    file_obj.flush()
+    count += 1
+  return count
+
+
+def main(argv=None):
+  args = parse_args(argv)
+  parameter_sets = parameter_grid(
+      args.strikes, args.sigmas, args.rates, args.days, args.timesteps, args.h,
+      args.stock_price_max)
+  if args.scaling:
+    print(format_scaling_report(
+        measure_scaling(parameter_sets, args.scaling, args.direct)))
+    return 0
+  start = time.perf_counter()
+  results = run_sweep(parameter_sets, args.workers, args.direct)
+  if args.output:
+    with open(args.output, "w", newline="") as file_obj:
+      count = write_results(results, file_obj)
+  else:
+    count = write_results(results, sys.stdout)
+  seconds = time.perf_counter() - start
+  print("Priced %s configurations with %s workers in %.3f s (%.1f/s)" %
+        (count, args.workers, seconds, count / seconds), file=sys.stderr)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,67 @@
+#! /usr/bin/python3
+"""Unit tests associated with black_scholes_sweep.py."""
+import black_scholes
+import black_scholes_sweep
+import io
+import unittest
+
+class BlackScholesSweepTest(unittest.TestCase):
+
+  def setUp(self):
+    self.parameter_sets = black_scholes_sweep.parameter_grid(
+        [0.9, 1.0, 1.1], [0.2, 0.3], [0.02], time_to_exercise=10,
+        timesteps=10, h=40)
+
+  def testParameterGrid(self):
+    self.assertEqual(6, len(self.parameter_sets))
+    self.assertEqual(10 / 10 / 365, self.parameter_sets[0].k)
+    self.assertEqual([0.9, 1.0, 1.1, 0.9, 1.0, 1.1],
+                     [p.strike_price for p in self.parameter_sets])
+
+  def testPlanTasksSharesOperators(self):
+    for workers in (1, 2, 8):
+      tasks = black_scholes_sweep.plan_tasks(self.parameter_sets, workers)
+      self.assertEqual(self.parameter_sets, sum(tasks, []))
+      for task in tasks:
+        self.assertEqual(1, len({(p.h, p.k, p.sigma, p.r) for p in task}))
+    # Six sets over four tasks per worker are chunked in twos per operator.
+    self.assertEqual([2, 1, 2, 1], [len(task) for task in
+        black_scholes_sweep.plan_tasks(self.parameter_sets, 1)])
+
+  def testPriceTaskMatchesRunBlackScholes(self):
+    task = self.parameter_sets[:3]
+    results = black_scholes_sweep.price_task(task)
+    for parameters, result in zip(task, results):
+      expected = black_scholes.run_black_scholes(
+          *parameters, warm_start=True, verbose=False)
+      self.assertEqual(parameters, result.parameters)
+      self.assertEqual(expected[-1].tolist(), result.option_prices)
+      self.assertEqual(41, len(result.stock_prices))
+
+  def testPriceTask_StrikeAboveMaximumStockPrice(self):
+    parameters, = black_scholes_sweep.parameter_grid(
+        [2.5], [.3], [.02], h=20, stock_price_max=2.0)
+    result, = black_scholes_sweep.price_task([parameters])
+    expected = black_scholes.run_black_scholes(
+        *parameters, warm_start=True, verbose=False)
+    self.assertEqual(expected[-1].tolist(), result.option_prices)
+    self.assertEqual(0.0, result.option_prices[-1])
+
+  def testRunSweep(self):
+    results = list(black_scholes_sweep.run_sweep(self.parameter_sets, 2))
+    self.assertEqual(sorted(self.parameter_sets),
+                     sorted(result.parameters for result in results))
+    output = io.StringIO()
+    self.assertEqual(
+        6, black_scholes_sweep.write_results(results, output))
+    self.assertEqual(1 + 6 * 41, len(output.getvalue().splitlines()))
+
+  def testMeasureScaling(self):
+    points = black_scholes_sweep.measure_scaling(self.parameter_sets[:2], [1, 2])
+    self.assertEqual([1, 2], [point.workers for point in points])
+    self.assertEqual(1.0, points[0].speedup)
+    self.assertIn("efficiency",
+                  black_scholes_sweep.format_scaling_report(points))
+
+if __name__ == '__main__':
+  unittest.main()
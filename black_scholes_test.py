@@ -0,0 +1,136 @@
+#! /usr/bin/python3
+"""Unit tests associated with black_scholes.py."""
+import black_scholes
+import numpy
+import sparse_matrix
+import unittest
+
+class BlackScholesTest(unittest.TestCase):
+
+  def testGenerateBlackScholesSparseMatrix_BitIdentical(self):
+    for N, k, sigma, r in ((199, 1 / 365, .3, 0.02), (50, 0.5, 35, 0.54)):
+      expected = sparse_matrix.SparseMatrix(
+          dense_matrix=black_scholes.generate_black_scholes_matrix(
+              N, k, sigma, r))
+      matrix_a = black_scholes.generate_black_scholes_sparse_matrix(
+          N, k, sigma, r)
+
+      self.assertEqual(expected.rowStart, matrix_a.rowStart)
+      self.assertEqual(expected.cols, matrix_a.cols)
+      self.assertEqual(expected.vals, matrix_a.vals)
+
+  def testGenerateBlackScholesSparseMatrix_SkipsZeroCoefficients(self):
+    # n * sigma ** 2 - r is 0 for n = 2, so row 1 has no lower entry.
+    matrix_a = black_scholes.generate_black_scholes_sparse_matrix(
+        3, 0.5, 0.5, 0.5)
+    expected = sparse_matrix.SparseMatrix(
+        dense_matrix=black_scholes.generate_black_scholes_matrix(
+            3, 0.5, 0.5, 0.5))
+    self.assertEqual([0, 2, 4, 6], matrix_a.rowStart)
+    self.assertEqual(expected.rowStart, matrix_a.rowStart)
+    self.assertEqual(expected.cols, matrix_a.cols)
+
+  def testGenerateBlackScholesSparseMatrix_Large(self):
+    matrix_a = black_scholes.generate_black_scholes_sparse_matrix(
+        83573, 1 / 365, 35, 0.54, use_numpy=True)
+    self.assertEqual(83573, matrix_a.rows)
+    self.assertEqual(3 * 83573 - 2, len(matrix_a.vals))
+    self.assertTrue(matrix_a.is_tridiagonal())
+
+  def _option_price_grid(self, **kwargs):
+    stock_price_array = black_scholes.generate_stock_price_array(2.0, 40)
+    return black_scholes.generate_option_price_grid(
+        10, 1, 40, 1 / 365, .3, 0.02, stock_price_array, **kwargs)
+
+  def testGenerateOptionPriceGrid_Boundaries(self):
+    grid = self._option_price_grid()
+    self.assertEqual((11, 41), grid.shape)
+    self.assertEqual(numpy.float64, grid.dtype)
+    self.assertEqual([1.0] * 11, grid[:, 0].tolist())
+    self.assertEqual([0.0] * 11, grid[:, -1].tolist())
+    self.assertEqual(black_scholes.start_prices(
+        1, black_scholes.generate_stock_price_array(2.0, 40)),
+        grid[0].tolist())
+
+  def testGenerateOptionPriceGrid_KeepLast(self):
+    grid = self._option_price_grid(warm_start=True)
+    for keep_last in (1, 3, 4, 11, 20):
+      kept = self._option_price_grid(warm_start=True, keep_last=keep_last)
+      self.assertTrue(numpy.array_equal(grid[-keep_last:], kept))
+    with self.assertRaises(ValueError):
+      self._option_price_grid(keep_last=0)
+
+  def testGenerateOptionPriceGrid_WarmStartSavesIterations(self):
+    cold_counts = []
+    warm_counts = []
+    cold = self._option_price_grid(iteration_counts=cold_counts)
+    warm = self._option_price_grid(warm_start=True,
+                                   iteration_counts=warm_counts)
+    self.assertEqual(10, len(cold_counts))
+    self.assertEqual(10, len(warm_counts))
+    self.assertLess(sum(warm_counts), sum(cold_counts))
+    self.assertTrue(numpy.allclose(cold, warm, atol=1e-3))
+
+  def testGenerateOptionPriceGrid_KeepLastStrikeAboveMaximum(self):
+    # The time 0 payoff is nonzero at the maximum stock price, and must not
+    # leak into later rows that reuse its ring slot.
+    stock_price_array = black_scholes.generate_stock_price_array(2.0, 20)
+    grid = black_scholes.generate_option_price_grid(
+        10, 3.0, 20, 1 / 365, .3, 0.02, stock_price_array)
+    for keep_last in (1, 3, 4):
+      kept = black_scholes.generate_option_price_grid(
+          10, 3.0, 20, 1 / 365, .3, 0.02, stock_price_array,
+          keep_last=keep_last)
+      self.assertTrue(numpy.array_equal(grid[-keep_last:], kept))
+      self.assertEqual([0.0] * keep_last, kept[:, -1].tolist())
+
+  def testGenerateOptionPriceGrid_DirectMatchesSor(self):
+    grid = self._option_price_grid()
+    direct = self._option_price_grid(direct=True)
+    self.assertTrue(numpy.allclose(grid, direct, atol=1e-3))
+
+  def testOperatorCache(self):
+    black_scholes.clear_operator_cache()
+    first = self._option_price_grid()
+    solver = black_scholes.get_black_scholes_solver(40, 1 / 365, .3, 0.02)
+    stock_price_array = black_scholes.generate_stock_price_array(2.0, 40)
+    other_strike = black_scholes.generate_option_price_grid(
+        10, 1.2, 40, 1 / 365, .3, 0.02, stock_price_array)
+    self.assertEqual({"hits": 2, "misses": 1, "entries": 1,
+                      "max_entries": black_scholes.OPERATOR_CACHE_SIZE},
+                     black_scholes.operator_cache_stats())
+    self.assertIs(solver.A, black_scholes.get_black_scholes_solver(
+        40, 1 / 365, .3, 0.02, direct=False).A)
+    self.assertIsNot(solver.A, black_scholes.get_black_scholes_solver(
+        40, 1 / 365, .3, 0.02, direct=True).A)
+    self.assertTrue(numpy.array_equal(first, self._option_price_grid()))
+    self.assertEqual(1.2, other_strike[-1][0])
+    black_scholes.clear_operator_cache()
+    self.assertEqual(0, black_scholes.operator_cache_stats()["entries"])
+
+  def testOperatorCacheSolversDoNotShareState(self):
+    black_scholes.clear_operator_cache()
+    solver_a = black_scholes.get_black_scholes_solver(40, 1 / 365, .3, 0.02)
+    solver_b = black_scholes.get_black_scholes_solver(40, 1 / 365, .3, 0.02)
+    self.assertIsNot(solver_a, solver_b)
+    self.assertIs(solver_a.A, solver_b.A)
+    self.assertIs(solver_a.diagonal, solver_b.diagonal)
+    stock_price_array = black_scholes.generate_stock_price_array(2.0, 40)
+    black_scholes.generate_option_price_grid(
+        10, 1, 40, 1 / 365, .3, 0.02, stock_price_array, solver=solver_a)
+    x_a, b_a = list(solver_a.x), list(solver_a.b.values)
+    state_a = (solver_a.iteration, solver_a.stopping_reason,
+               list(solver_a.sweep_times))
+    black_scholes.generate_option_price_grid(
+        10, 1.5, 40, 1 / 365, .3, 0.02, stock_price_array, solver=solver_b)
+    black_scholes.generate_option_price_grid(
+        10, 0.5, 40, 1 / 365, .3, 0.02, stock_price_array)
+    self.assertEqual(x_a, list(solver_a.x))
+    self.assertEqual(b_a, list(solver_a.b.values))
+    self.assertEqual(state_a, (solver_a.iteration, solver_a.stopping_reason,
+                               list(solver_a.sweep_times)))
+    self.assertNotEqual(x_a, list(solver_b.x))
+    black_scholes.clear_operator_cache()
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,166 @@
+#! /usr/bin/python3
+"""Binary on disk csr format that is opened with zero copy memory maps.
+
+A file is a fixed size header followed by the raw little endian rowStart
+(int64), cols (int64) and vals (float64) arrays. The header holds a CRC32 of
+the three arrays so stale or corrupt files can be rejected.
+
+To convert an input file (text, binary record or Matrix Market) run
+
+  python3 csr_file.py input.mtx output.csr
+"""
+import data_io
+import numpy
+import os
+import sparse_matrix
+import struct
+import sys
+import zlib
+
+MAGIC = b'SORCSR\x00\x00'
+VERSION = 1
+# magic, version, reserved, rows, columns, nnz, checksum. Padded to 64 bytes
+# so that every array starts 8 byte aligned.
+_HEADER = struct.Struct('<8sIIQQQQ')
+HEADER_SIZE = 64
+_ROW_START_DTYPE = numpy.dtype('<i8')
+_COLS_DTYPE = numpy.dtype('<i8')
+_VALS_DTYPE = numpy.dtype('<f8')
+
+
+class CsrFileError(Exception):
+  """Exception for when a csr file is malformed, corrupt or stale."""
+
+
+def _csr_arrays(matrix):
+  """Returns the csr arrays of a SparseMatrix in the on disk dtypes."""
+  return (numpy.ascontiguousarray(matrix.rowStart, dtype=_ROW_START_DTYPE),
+          numpy.ascontiguousarray(matrix.cols, dtype=_COLS_DTYPE),
+          numpy.ascontiguousarray(matrix.vals, dtype=_VALS_DTYPE))
+
+
+def _checksum(arrays):
+  """Returns the CRC32 of the bytes of a sequence of arrays."""
+  checksum = 0
+  for array in arrays:
+    checksum = zlib.crc32(memoryview(array).cast('B'), checksum)
+  return checksum
+
+
+def csr_checksum(matrix):
+  """Returns the checksum a csr file written from matrix would hold.
+
+  Args:
+    matrix: A sparse_matrix.SparseMatrix.
+  Returns:
+    The integer CRC32 of the matrix's csr arrays.
+  """
+  return _checksum(_csr_arrays(matrix))
+
+
+def write_csr_file(matrix, filename):
+  """Writes a SparseMatrix to a csr file.
+
+  The file is written next to its destination and then renamed, so readers
+  never see a partly written file.
+
+  Args:
+    matrix: A sparse_matrix.SparseMatrix.
+    filename: The string filename.
+  Returns:
+    The integer checksum stored in the header.
+  Raises:
+    IOError. If the file cannot be written.
+  """
+  arrays = _csr_arrays(matrix)
+  checksum = _checksum(arrays)
+  header = _HEADER.pack(MAGIC, VERSION, 0, matrix.rows, matrix.columns,
+                        len(arrays[2]), checksum)
+  temporary_filename = filename + '.tmp'
+  with open(temporary_filename, 'wb') as file_obj:
+    file_obj.write(header.ljust(HEADER_SIZE, b'\x00'))
+    for array in arrays:
+      file_obj.write(memoryview(array).cast('B'))
+  os.replace(temporary_filename, filename)
+  return checksum
+
+
+def read_csr_header(filename):
+  """Reads and checks the header of a csr file.
+
+  Args:
+    filename: The string filename.
+  Returns:
+    A tuple of the integer rows, columns, nnz and checksum.
+  Raises:
+    IOError. If the file cannot be opened or does not exist.
+    CsrFileError. If the header is invalid or the file has the wrong size.
+  """
+  with open(filename, 'rb') as file_obj:
+    header = file_obj.read(HEADER_SIZE)
+  if len(header) != HEADER_SIZE:
+    raise CsrFileError("%s is too short for a csr file" % filename)
+  magic, version, _, rows, columns, nnz, checksum = _HEADER.unpack_from(header)
+  if magic != MAGIC:
+    raise CsrFileError("%s is not a csr file" % filename)
+  if version != VERSION:
+    raise CsrFileError("Unsupported csr file version %s" % version)
+  expected_size = (HEADER_SIZE + (rows + 1) * _ROW_START_DTYPE.itemsize +
+                   nnz * (_COLS_DTYPE.itemsize + _VALS_DTYPE.itemsize))
+  if os.path.getsize(filename) != expected_size:
+    raise CsrFileError("%s has the wrong size for its header" % filename)
+  return rows, columns, nnz, checksum
+
+
+def open_csr_file(filename, expected_checksum=None, verify=False):
+  """Opens a csr file as a numpy backed SparseMatrix without copying it.
+
+  The arrays are read only memory maps, so opening is independent of the
+  matrix size and processes opening the same file share the page cache.
+
+  Args:
+    filename: The string filename.
+    expected_checksum: An optional integer checksum, e.g. from csr_checksum
+        of the source matrix. Files holding any other checksum are stale.
+    verify: boolean whether to recompute the checksum over the whole file.
+        This reads every page.
+  Returns:
+    A sparse_matrix.SparseMatrix using numpy storage.
+  Raises:
+    IOError. If the file cannot be opened or does not exist.
+    CsrFileError. If the file is malformed, stale or corrupt.
+  """
+  rows, columns, nnz, checksum = read_csr_header(filename)
+  if expected_checksum is not None and expected_checksum != checksum:
+    raise CsrFileError("%s is stale: checksum %s, expected %s" %
+                       (filename, checksum, expected_checksum))
+  offset = HEADER_SIZE
+  arrays = []
+  for dtype, length in ((_ROW_START_DTYPE, rows + 1), (_COLS_DTYPE, nnz),
+                        (_VALS_DTYPE, nnz)):
+    if length:
+      arrays.append(numpy.memmap(filename, dtype=dtype, mode='r',
+                                 offset=offset, shape=(length,)))
+    else:
+      # A zero length file region cannot be memory mapped.
+      arrays.append(numpy.zeros(0, dtype=dtype))
+    offset += length * dtype.itemsize
+  if verify and _checksum(arrays) != checksum:
+    raise CsrFileError("%s is corrupt: checksum does not match" % filename)
+  return sparse_matrix.SparseMatrix(
+      csr_arrays=tuple(arrays), column_count=columns, use_numpy=True)
+
+
+if __name__ == "__main__":
+  if len(sys.argv) != 3:
+    raise Exception("Usage: csr_file.py input_file output.csr")
+  input_filename, output_filename = sys.argv[1:]
+  if input_filename.endswith(".mtx"):
+    matrix = data_io.read_matrix_market(input_filename, use_numpy=True)
+  else:
+    matrix = sparse_matrix.SparseMatrix(
+        data_io.read_input_csr(input_filename)[0], use_numpy=True)
+  checksum = write_csr_file(matrix, output_filename)
+  print("Wrote %s x %s matrix with %s values to %s (checksum %s)" %
+        (matrix.rows, matrix.columns, len(matrix.vals), output_filename,
+         checksum))
@@ -0,0 +1,92 @@
+#! /usr/bin/python3
+"""Unit tests associated with csr_file.py."""
+import numpy
+import os
+import tempfile
+import unittest
+import csr_file
+import sparse_matrix
+import sparse_sor
+import vector
+
+class CsrFileTest(unittest.TestCase):
+
+  def setUp(self):
+    self.temporary_directory = tempfile.TemporaryDirectory()
+    self.filename = os.path.join(self.temporary_directory.name, "a.csr")
+    self.matrix = sparse_matrix.SparseMatrix(dense_matrix=[
+        [4.0, -1.0, 0.0, 0.0],
+        [-1.0, 4.0, -1.0, 0.0],
+        [0.0, -1.0, 4.0, 0.0],
+        [0.0, 0.0, 0.0, 2.5]])
+
+  def tearDown(self):
+    self.temporary_directory.cleanup()
+
+  def testRoundTrip(self):
+    checksum = csr_file.write_csr_file(self.matrix, self.filename)
+    self.assertEqual(csr_file.csr_checksum(self.matrix), checksum)
+    opened = csr_file.open_csr_file(self.filename, checksum, verify=True)
+    self.assertTrue(opened.use_numpy)
+    self.assertEqual((4, 4), (opened.rows, opened.columns))
+    self.assertEqual(self.matrix.rowStart, opened.rowStart.tolist())
+    self.assertEqual(self.matrix.cols, opened.cols.tolist())
+    self.assertEqual(self.matrix.vals, opened.vals.tolist())
+    self.assertFalse(os.path.exists(self.filename + ".tmp"))
+
+  def testOpenIsMemoryMapped(self):
+    csr_file.write_csr_file(self.matrix, self.filename)
+    opened = csr_file.open_csr_file(self.filename)
+    self.assertIsInstance(opened.vals.base, numpy.memmap)
+    self.assertFalse(opened.vals.flags.writeable)
+
+  def testSolveFromOpenedFile(self):
+    csr_file.write_csr_file(self.matrix, self.filename)
+    opened = csr_file.open_csr_file(self.filename)
+    vector_b = vector.Vector(number_list=[3.0, 2.0, 3.0, 2.5])
+    expected = sparse_sor.SparseSorSolver(
+        self.matrix, vector_b, 100, 10**-10).to_proto()
+    actual = sparse_sor.SparseSorSolver(
+        opened, vector_b, 100, 10**-10).to_proto()
+    self.assertEqual(expected, actual)
+
+  def testEmptyMatrix(self):
+    empty = sparse_matrix.SparseMatrix(dense_matrix=[[0.0, 0.0]])
+    csr_file.write_csr_file(empty, self.filename)
+    opened = csr_file.open_csr_file(self.filename, verify=True)
+    self.assertEqual((1, 2, 0), (opened.rows, opened.columns,
+                                 len(opened.vals)))
+
+  def testStaleChecksum(self):
+    checksum = csr_file.write_csr_file(self.matrix, self.filename)
+    with self.assertRaises(csr_file.CsrFileError):
+      csr_file.open_csr_file(self.filename, expected_checksum=checksum + 1)
+
+  def testCorruptValues(self):
+    csr_file.write_csr_file(self.matrix, self.filename)
+    with open(self.filename, "r+b") as file_obj:
+      file_obj.seek(-8, os.SEEK_END)
+      file_obj.write(b"\xff" * 8)
+    csr_file.open_csr_file(self.filename)
+    with self.assertRaises(csr_file.CsrFileError):
+      csr_file.open_csr_file(self.filename, verify=True)
+
+  def testBadMagic(self):
+    with open(self.filename, "wb") as file_obj:
+      file_obj.write(b"\x00" * csr_file.HEADER_SIZE)
+    with self.assertRaises(csr_file.CsrFileError):
+      csr_file.open_csr_file(self.filename)
+
+  def testTruncatedFile(self):
+    csr_file.write_csr_file(self.matrix, self.filename)
+    with open(self.filename, "r+b") as file_obj:
+      file_obj.truncate(os.path.getsize(self.filename) - 8)
+    with self.assertRaises(csr_file.CsrFileError):
+      csr_file.open_csr_file(self.filename)
+
+  def testMissingFile(self):
+    with self.assertRaises(IOError):
+      csr_file.open_csr_file(self.filename)
+
+if __name__ == '__main__':
+  unittest.main()
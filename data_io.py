@@ -1,6 +1,50 @@
 """Library for use in input and output of program."""
 from proto_genfiles.protos import sor_pb2
+import array
+import io
+import numpy
+import operator
 import re
+import os
+import sparse_matrix
+import validation
+
+# Every binary record file starts with these bytes.
+RECORD_FILE_MAGIC = b'SORREC1\n'
+# Files with these extensions are written in the binary record format.
+BINARY_EXTENSIONS = ('.pb', '.bin', '.rec')
+
+# Maps each sor_pb2.SorRecord field to the message type it holds.
+_RECORD_FIELDS = {
+    sor_pb2.SparseMatrix: 'sparse_matrix',
+    sor_pb2.CsrMatrix: 'csr_matrix',
+    sor_pb2.Vector: 'vector',
+    sor_pb2.SorReturnValue: 'result',
+}
+
+
+# Characters read from a text file at a time.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# A quoted string, a bare word such as a field name or number, or one of the
+# text format's punctuation characters.
+_TEXT_TOKEN = re.compile(r'"(?:[^"\\\n]|\\.)*"|[^\s{}:"]+|[{}:]')
+
+
+class RecordFormatError(Exception):
+  """Exception for when a binary record file is malformed."""
+
+
+class TextFormatError(Exception):
+  """Exception for when a text format input file is malformed."""
+
+
+class MatrixMarketFormatError(Exception):
+  """Exception for when a Matrix Market file is malformed or unsupported."""
+
+
+# Bytes of Matrix Market entry lines parsed at a time.
+MATRIX_MARKET_CHUNK_SIZE = 1 << 24
 
 def _read_file(filename):
   """Reads input file.
@@ -20,65 +64,641 @@ def _read_file(filename):
   return file_contents
 
 
+def is_binary_file(filename):
+  """Detects whether a file uses the binary record format.
+
+  Existing files are detected from their header, new files from their
+  extension.
+
+  Args:
+    filename: The string filename.
+  Returns:
+    boolean whether the file is, or should be written as, a record file.
+  """
+  if os.path.exists(filename):
+    with open(filename, 'rb') as file_obj:
+      return file_obj.read(len(RECORD_FILE_MAGIC)) == RECORD_FILE_MAGIC
+  return _has_binary_extension(filename)
+
+
+def _has_binary_extension(filename):
+  """Returns whether a filename has one of the BINARY_EXTENSIONS."""
+  return os.path.splitext(filename)[1] in BINARY_EXTENSIONS
+
+
+def _encode_varint(value):
+  """Encodes a non negative integer as protobuf varint bytes."""
+  encoded = bytearray()
+  while True:
+    byte = value & 0x7f
+    value >>= 7
+    if value:
+      encoded.append(byte | 0x80)
+    else:
+      encoded.append(byte)
+      return bytes(encoded)
+
+
+def _read_varint(file_obj):
+  """Reads one varint from a binary file.
+
+  Returns:
+    The integer, or None at the end of the file.
+  Raises:
+    RecordFormatError if the file ends part way through the varint.
+  """
+  value = 0
+  shift = 0
+  while True:
+    byte = file_obj.read(1)
+    if not byte:
+      if shift:
+        raise RecordFormatError("File ended inside a record length")
+      return None
+    value |= (byte[0] & 0x7f) << shift
+    if not byte[0] & 0x80:
+      return value
+    shift += 7
+
+
+def write_records(messages, filename):
+  """Writes messages to a length delimited binary record file.
+
+  Args:
+    messages: An iterable of sor_pb2.SparseMatrix, sor_pb2.CsrMatrix,
+        sor_pb2.Vector or sor_pb2.SorReturnValue protos.
+    filename: The string filename.
+  Raises:
+    IOError. If the file cannot be opened or written.
+    RecordFormatError. If a message type cannot be stored in a record.
+  """
+  with open(filename, 'wb') as file_obj:
+    file_obj.write(RECORD_FILE_MAGIC)
+    for message in messages:
+      field = _RECORD_FIELDS.get(type(message))
+      if field is None:
+        raise RecordFormatError(
+            "Cannot store %s in a record file" % type(message).__name__)
+      record = sor_pb2.SorRecord()
+      getattr(record, field).CopyFrom(message)
+      serialized = record.SerializeToString()
+      file_obj.write(_encode_varint(len(serialized)))
+      file_obj.write(serialized)
+
+
+def iter_records(filename):
+  """Iterates over the messages of a binary record file.
+
+  Args:
+    filename: The string filename.
+  Yields:
+    The proto held by each record, in file order.
+  Raises:
+    IOError. If the file cannot be opened or does not exist.
+    RecordFormatError. If the file is not a valid record file.
+  """
+  with open(filename, 'rb') as file_obj:
+    if file_obj.read(len(RECORD_FILE_MAGIC)) != RECORD_FILE_MAGIC:
+      raise RecordFormatError("%s is not a record file" % filename)
+    while True:
+      length = _read_varint(file_obj)
+      if length is None:
+        return
+      serialized = file_obj.read(length)
+      if len(serialized) != length:
+        raise RecordFormatError("File ended inside a record")
+      record = sor_pb2.SorRecord.FromString(serialized)
+      field = record.WhichOneof('record')
+      if field is None:
+        raise RecordFormatError("Empty record")
+      yield getattr(record, field)
+
+
+def read_records(filename):
+  """Reads every message of a binary record file into a list."""
+  return list(iter_records(filename))
+
+
+def write_input(matrix_proto, vector_proto, filename='nas_Sor.in'):
+  """Writes an input file for read_input.
+
+  Args:
+    matrix_proto: A sor_pb2.SparseMatrix or sor_pb2.CsrMatrix A.
+    vector_proto: A sor_pb2.Vector b.
+    filename: The string filename. Binary for the BINARY_EXTENSIONS.
+  Raises:
+    IOError. If the file cannot be opened or written.
+  """
+  if _has_binary_extension(filename):
+    write_records([matrix_proto, vector_proto], filename)
+    return
+  if isinstance(matrix_proto, sor_pb2.CsrMatrix):
+    matrix_proto = convert_to_sparse_matrix_proto(matrix_proto)
+  with open(filename, 'w') as file_obj:
+    file_obj.write(str(matrix_proto) + '\n' + str(vector_proto))
+
+
 def read_input(filename='nas_Sor.in'):
   """Reads input.
 
+  Binary record files hold the matrix and vector as records. Otherwise the
+  file is in the text proto format.
+
   Args:
     filename: The string filename.
   Returns:
-    tuple of sor_pb2.SparseMatrix A and sor_pb2.Vector b.
+    tuple of sor_pb2.SparseMatrix A and sor_pb2.Vector b. A binary file may
+    hold a sor_pb2.CsrMatrix A instead.
   Raises:
     IOError. If the file cannot be opened or does not exist.
+    RecordFormatError. If a binary file lacks a matrix or a vector.
   """
-  file_contents = _read_file(filename)
-  values = file_contents.split('\n\n')
-  string_matrix = values[0]
-  string_vector = values[1]
-  matrix_proto = _process_string_matrix_proto(string_matrix)
-  vector_proto = _process_string_vector_proto(string_vector)
-  return (matrix_proto, vector_proto)
+  if is_binary_file(filename):
+    matrix_proto = None
+    vector_proto = None
+    for message in iter_records(filename):
+      if matrix_proto is None and isinstance(
+          message, (sor_pb2.SparseMatrix, sor_pb2.CsrMatrix)):
+        matrix_proto = message
+      elif vector_proto is None and isinstance(message, sor_pb2.Vector):
+        vector_proto = message
+    if matrix_proto is None or vector_proto is None:
+      raise RecordFormatError("%s needs a matrix and a vector" % filename)
+    return (matrix_proto, vector_proto)
+  with open(filename, 'r') as file_obj:
+    parsed = _parse_text_input(file_obj)
+  return (_to_sparse_matrix_proto(parsed), _to_vector_proto(parsed))
 
 
-def _process_string_vector_proto(string_vector_proto):
-  string_segments = string_vector_proto.split('values: ')
-  head_segment = string_segments[0]
-  name = re.search(r'vector_name: "([^"]+)"', head_segment).group(1)
-  length = re.search(r'length: (\d+)', head_segment).group(1)
-  vector_proto = sor_pb2.Vector(vector_name=name, length=int(length))
-  for value in string_segments[1:]:
-    vector_proto.values.append(float(value.strip()))
+def read_input_csr(filename='nas_Sor.in', chunk_size=DEFAULT_CHUNK_SIZE):
+  """Reads input straight into the packed csr form.
+
+  Text files are tokenized in a single streaming pass of chunk_size reads,
+  so memory is bounded by the size of the parsed arrays, not the file.
+
+  Args:
+    filename: The string filename.
+    chunk_size: The integer number of characters to read at a time.
+  Returns:
+    tuple of sor_pb2.CsrMatrix A and sor_pb2.Vector b.
+  Raises:
+    IOError. If the file cannot be opened or does not exist.
+    TextFormatError. If the text is malformed or an index is out of bounds.
+  """
+  if is_binary_file(filename):
+    matrix_proto, vector_proto = read_input(filename)
+    if isinstance(matrix_proto, sor_pb2.SparseMatrix):
+      matrix_proto = convert_to_csr_matrix_proto(matrix_proto)
+    return (matrix_proto, vector_proto)
+  with open(filename, 'r') as file_obj:
+    parsed = _parse_text_input(file_obj, chunk_size)
+  # The conversion packs each row and column into one sort key, so indices
+  # past the header counts would silently land in other rows.
+  if parsed['values'] and (
+      numpy.frombuffer(parsed['row_indices'], dtype=numpy.uint64).max() >=
+      parsed['row_count'] or
+      numpy.frombuffer(parsed['column_indices'], dtype=numpy.uint64).max() >=
+      parsed['column_count']):
+    raise TextFormatError("Row or column index out of bounds")
+  row_ptr, col_index, value = sparse_matrix.coo_to_csr_arrays(
+      parsed['row_count'], parsed['column_count'], parsed['row_indices'],
+      parsed['column_indices'], parsed['values'])
+  csr_matrix_proto = sor_pb2.CsrMatrix(
+      matrix_name=parsed['matrix_name'], row_count=parsed['row_count'],
+      column_count=parsed['column_count'])
+  # Extending from a memoryview reads the numbers straight out of the array.
+  csr_matrix_proto.row_ptr.extend(memoryview(row_ptr))
+  csr_matrix_proto.col_index.extend(memoryview(col_index))
+  csr_matrix_proto.value.extend(memoryview(value))
+  return (csr_matrix_proto, _to_vector_proto(parsed))
+
+
+def _iter_text_tokens(file_obj, chunk_size=DEFAULT_CHUNK_SIZE, position=None):
+  """Splits a text format file into tokens, reading it in chunks.
+
+  Args:
+    file_obj: A file like object opened in text mode.
+    chunk_size: The integer number of characters to read at a time.
+    position: An optional dict. It is updated with the text, first line and
+        token iterator of the current chunk, for _token_line_number.
+  Yields:
+    The string tokens in order.
+  """
+  carry = ''
+  line_number = 1
+  while True:
+    chunk = file_obj.read(chunk_size)
+    buffer = carry + chunk
+    # Fields never span lines, so tokens after the last newline are held
+    # back until the next chunk completes them.
+    cut = buffer.rfind('\n') + 1 if chunk else len(buffer)
+    carry = buffer[cut:]
+    tokens = iter(_TEXT_TOKEN.findall(buffer, 0, cut))
+    if position is not None:
+      position.update(text=buffer[:cut], line_number=line_number,
+                      tokens=tokens)
+    yield from tokens
+    if not chunk:
+      return
+    line_number += buffer.count('\n', 0, cut)
+
+
+def _token_line_number(position):
+  """Returns the line number of the last token yielded by _iter_text_tokens.
+
+  The line is only worked out when an error is reported, so tokenizing does
+  not pay for tracking it.
+  """
+  # The token iterator knows how many tokens of the chunk are left.
+  index = (len(_TEXT_TOKEN.findall(position['text'])) -
+           operator.length_hint(position['tokens']) - 1)
+  for i, match in enumerate(_TEXT_TOKEN.finditer(position['text'])):
+    if i == index:
+      return position['line_number'] + position['text'].count(
+          '\n', 0, match.start())
+  return position['line_number']
+
+
+def _parse_text_input(file_obj, chunk_size=DEFAULT_CHUNK_SIZE):
+  """Parses a text format matrix and vector into flat arrays in one pass.
+
+  Every token is looked at once. Matrix values are appended to coordinate
+  arrays and vector values to a value array as they are read.
+
+  Args:
+    file_obj: A file like object opened in text mode.
+    chunk_size: The integer number of characters to read at a time.
+  Returns:
+    A dict of the header fields, the matrix 'row_indices', 'column_indices'
+    and 'values' arrays and the 'vector_values' array.
+  Raises:
+    TextFormatError if the text is malformed.
+  """
+  parsed = {'matrix_name': '', 'row_count': 0, 'column_count': 0,
+            'vector_name': '', 'length': 0,
+            'row_indices': array.array('Q'),
+            'column_indices': array.array('Q'),
+            'values': array.array('d'),
+            'vector_values': array.array('d')}
+  position = {}
+  tokens = _iter_text_tokens(file_obj, chunk_size, position)
+  try:
+    for field in tokens:
+      separator = next(tokens)
+      if separator == ':':
+        token = next(tokens)
+      else:
+        token = separator
+      if token == '{':
+        if field != 'values':
+          raise TextFormatError("Unexpected message field %s" % field)
+        row_index = 0
+        column_index = 0
+        value = 0.0
+        for value_field in tokens:
+          if value_field == '}':
+            break
+          if next(tokens) != ':':
+            raise TextFormatError("Expected : after %s" % value_field)
+          token = next(tokens)
+          if value_field == 'row_index':
+            row_index = int(token)
+          elif value_field == 'column_index':
+            column_index = int(token)
+          elif value_field == 'value':
+            value = float(token)
+          else:
+            raise TextFormatError("Unknown field %s" % value_field)
+        else:
+          raise TextFormatError("Input ended inside a values message")
+        parsed['row_indices'].append(row_index)
+        parsed['column_indices'].append(column_index)
+        parsed['values'].append(value)
+      elif separator != ':':
+        raise TextFormatError("Expected : after %s" % field)
+      elif field == 'values':
+        parsed['vector_values'].append(float(token))
+      elif field in ('matrix_name', 'vector_name'):
+        parsed[field] = token.strip('"')
+      elif field in ('row_count', 'column_count', 'length'):
+        parsed[field] = int(token)
+      else:
+        raise TextFormatError("Unknown field %s" % field)
+  except StopIteration:
+    raise TextFormatError("Input ended part way through a field")
+  except ValueError as error:
+    raise TextFormatError("Invalid number on line %s: %s" %
+                          (_token_line_number(position), error))
+  except OverflowError:
+    # A negative index does not fit the unsigned index arrays.
+    raise TextFormatError(
+        "Negative index in the values message ending on line %s" %
+        _token_line_number(position))
+  return parsed
+
+
+def _to_sparse_matrix_proto(parsed):
+  """Builds a SparseMatrix proto from the output of _parse_text_input."""
+  sparse_matrix_proto = sor_pb2.SparseMatrix(
+      matrix_name=parsed['matrix_name'], row_count=parsed['row_count'],
+      column_count=parsed['column_count'])
+  for row_index, column_index, value in zip(
+      parsed['row_indices'], parsed['column_indices'], parsed['values']):
+    sparse_value = sparse_matrix_proto.values.add()
+    sparse_value.row_index = row_index
+    sparse_value.column_index = column_index
+    sparse_value.value = value
+  return sparse_matrix_proto
+
+
+def _to_vector_proto(parsed):
+  """Builds a Vector proto from the output of _parse_text_input."""
+  vector_proto = sor_pb2.Vector(
+      vector_name=parsed['vector_name'], length=parsed['length'])
+  vector_proto.values.extend(parsed['vector_values'])
   return vector_proto
 
 
+def _process_string_vector_proto(string_vector_proto):
+  return _to_vector_proto(_parse_text_input(io.StringIO(string_vector_proto)))
+
+
 def _process_string_matrix_proto(string_matrix_proto):
-  string_segments = string_matrix_proto.split('values ')
-  head_segment = string_segments[0]
-  name = re.search(r'matrix_name: "([^"]+)"', head_segment).group(1)
-  rows = re.search(r'row_count: (\d+)', head_segment).group(1)
-  columns = re.search(r'column_count: (\d+)', head_segment).group(1)
+  return _to_sparse_matrix_proto(
+      _parse_text_input(io.StringIO(string_matrix_proto)))
+
+
+def convert_to_csr_matrix_proto(sparse_matrix_proto):
+  """Converts a SparseMatrix proto into the packed CsrMatrix proto.
+
+  Args:
+    sparse_matrix_proto: A sor_pb2.SparseMatrix proto.
+  Returns:
+    A sor_pb2.CsrMatrix proto.
+  Raises:
+    validation.ValidationError if the input is invalid.
+  """
+  validation.ValidateSparseMatrixProto(sparse_matrix_proto)
+  row_indices = []
+  column_indices = []
+  values = []
+  for value in sparse_matrix_proto.values:
+    row_indices.append(value.row_index)
+    column_indices.append(value.column_index)
+    values.append(value.value)
+  row_ptr, col_index, value = sparse_matrix.coo_to_csr(
+      sparse_matrix_proto.row_count, sparse_matrix_proto.column_count,
+      row_indices, column_indices, values)
+  csr_matrix_proto = sor_pb2.CsrMatrix(
+      matrix_name=sparse_matrix_proto.matrix_name,
+      row_count=sparse_matrix_proto.row_count,
+      column_count=sparse_matrix_proto.column_count)
+  csr_matrix_proto.row_ptr.extend(row_ptr)
+  csr_matrix_proto.col_index.extend(col_index)
+  csr_matrix_proto.value.extend(value)
+  return csr_matrix_proto
+
+
+def convert_to_sparse_matrix_proto(csr_matrix_proto):
+  """Converts a packed CsrMatrix proto into a SparseMatrix proto.
+
+  Args:
+    csr_matrix_proto: A sor_pb2.CsrMatrix proto.
+  Returns:
+    A sor_pb2.SparseMatrix proto.
+  Raises:
+    validation.ValidationError if the input is invalid.
+  """
+  validation.ValidateCsrMatrixProto(csr_matrix_proto)
   sparse_matrix_proto = sor_pb2.SparseMatrix(
-      matrix_name=name, row_count=int(rows), column_count=int(columns))
-  for segment in string_segments[1:]:
-    sparse_value = sparse_matrix_proto.values.add()
-    row_index = re.search(r'row_index: (\d+)', segment)
-    column_index = re.search(r'column_index: (\d+)', segment)
-    value = re.search(r'value: (-?[\d.]+)', segment).group(1)
-    if row_index:
-      sparse_value.row_index = int(row_index.group(1))
-    if column_index:
-      sparse_value.column_index = int(row_index.group(1))
-    sparse_value.value = float(value)
+      matrix_name=csr_matrix_proto.matrix_name,
+      row_count=csr_matrix_proto.row_count,
+      column_count=csr_matrix_proto.column_count)
+  row_ptr = csr_matrix_proto.row_ptr
+  col_index = csr_matrix_proto.col_index
+  value = csr_matrix_proto.value
+  for row in range(csr_matrix_proto.row_count):
+    for j in range(row_ptr[row], row_ptr[row + 1]):
+      sparse_value = sparse_matrix_proto.values.add()
+      sparse_value.row_index = row
+      sparse_value.column_index = col_index[j]
+      sparse_value.value = value[j]
   return sparse_matrix_proto
 
 
+def _read_matrix_market_header(file_obj):
+  """Reads the banner, comments and size line of a Matrix Market file.
+
+  Args:
+    file_obj: A file like object opened in text mode at the start.
+  Returns:
+    A tuple of the lower case format, field and symmetry strings and the
+    list of integers on the size line.
+  Raises:
+    MatrixMarketFormatError if the header is malformed or unsupported.
+  """
+  banner = file_obj.readline().split()
+  if (len(banner) != 5 or banner[0] != '%%MatrixMarket' or
+      banner[1].lower() != 'matrix'):
+    raise MatrixMarketFormatError("Missing %%MatrixMarket matrix banner")
+  matrix_format, field, symmetry = [word.lower() for word in banner[2:]]
+  if matrix_format not in ('coordinate', 'array'):
+    raise MatrixMarketFormatError("Unknown format %s" % matrix_format)
+  if field not in ('real', 'integer', 'pattern'):
+    raise MatrixMarketFormatError("Unsupported field %s" % field)
+  if symmetry not in ('general', 'symmetric', 'skew-symmetric'):
+    raise MatrixMarketFormatError("Unsupported symmetry %s" % symmetry)
+  line = file_obj.readline()
+  while line.startswith('%') or (line and not line.strip()):
+    line = file_obj.readline()
+  try:
+    size = [int(word) for word in line.split()]
+  except ValueError:
+    raise MatrixMarketFormatError("Invalid size line: %s" % line)
+  return matrix_format, field, symmetry, size
+
+
+def _iter_matrix_market_chunks(file_obj, columns, chunk_size):
+  """Parses the entry lines of a Matrix Market file in chunks.
+
+  Args:
+    file_obj: A file like object positioned after the size line.
+    columns: The integer number of numbers on each entry line.
+    chunk_size: The approximate number of bytes to parse at a time.
+  Yields:
+    float64 numpy arrays of shape (entries, columns).
+  Raises:
+    MatrixMarketFormatError if an entry line is malformed.
+  """
+  while True:
+    lines = file_obj.readlines(chunk_size)
+    if not lines:
+      return
+    words = ' '.join(
+        line for line in lines if not line.startswith('%')).split()
+    try:
+      numbers = numpy.array(words, dtype=numpy.float64)
+    except ValueError as error:
+      raise MatrixMarketFormatError("Invalid entry: %s" % error)
+    if len(numbers) % columns:
+      raise MatrixMarketFormatError(
+          "Entries must have %s numbers each" % columns)
+    yield numbers.reshape(-1, columns)
+
+
+def read_matrix_market(filename, use_numpy=False,
+                       chunk_size=MATRIX_MARKET_CHUNK_SIZE):
+  """Reads a Matrix Market coordinate file straight into csr storage.
+
+  The entries are parsed chunk by chunk into coordinate arrays that are
+  preallocated from the size line. Symmetric and skew-symmetric files are
+  expanded on the fly as each chunk is parsed.
+
+  Args:
+    filename: The string filename.
+    use_numpy: boolean whether the matrix uses numpy storage.
+    chunk_size: The approximate number of bytes to parse at a time.
+  Returns:
+    A sparse_matrix.SparseMatrix.
+  Raises:
+    IOError. If the file cannot be opened or does not exist.
+    MatrixMarketFormatError. If the file is malformed or unsupported.
+  """
+  with open(filename, 'r') as file_obj:
+    matrix_format, field, symmetry, size = _read_matrix_market_header(
+        file_obj)
+    if matrix_format != 'coordinate' or len(size) != 3:
+      raise MatrixMarketFormatError("Matrices must be in coordinate format")
+    row_count, column_count, entry_count = size
+    capacity = entry_count if symmetry == 'general' else 2 * entry_count
+    row_indices = numpy.empty(capacity, dtype=numpy.int64)
+    column_indices = numpy.empty(capacity, dtype=numpy.int64)
+    values = numpy.empty(capacity, dtype=numpy.float64)
+    entry_columns = 2 if field == 'pattern' else 3
+    filled = 0
+    read = 0
+    for entries in _iter_matrix_market_chunks(
+        file_obj, entry_columns, chunk_size):
+      read += len(entries)
+      if read > entry_count:
+        raise MatrixMarketFormatError("More entries than the size line says")
+      rows = entries[:, 0].astype(numpy.int64) - 1
+      cols = entries[:, 1].astype(numpy.int64) - 1
+      vals = entries[:, 2] if field != 'pattern' else numpy.ones(len(rows))
+      end = filled + len(rows)
+      row_indices[filled:end] = rows
+      column_indices[filled:end] = cols
+      values[filled:end] = vals
+      filled = end
+      if symmetry != 'general':
+        # Only one triangle is stored. Mirror the off diagonal entries.
+        mirrored = rows != cols
+        end = filled + mirrored.sum()
+        row_indices[filled:end] = cols[mirrored]
+        column_indices[filled:end] = rows[mirrored]
+        values[filled:end] = (
+            -vals[mirrored] if symmetry == 'skew-symmetric' else vals[mirrored])
+        filled = end
+  if read != entry_count:
+    raise MatrixMarketFormatError("Fewer entries than the size line says")
+  row_indices = row_indices[:filled]
+  column_indices = column_indices[:filled]
+  if filled and (row_indices.min() < 0 or row_indices.max() >= row_count or
+                 column_indices.min() < 0 or
+                 column_indices.max() >= column_count):
+    raise MatrixMarketFormatError("Row or column index out of bounds")
+  row_start, cols, vals = sparse_matrix.coo_to_csr_arrays(
+      row_count, column_count, row_indices, column_indices, values[:filled])
+  try:
+    validation.ValidateCsrArrays(row_start, cols, len(vals), column_count)
+  except validation.ValidationError as error:
+    raise MatrixMarketFormatError("Invalid matrix: %s" % error)
+  return sparse_matrix.SparseMatrix(
+      csr_arrays=(row_start, cols, vals), column_count=column_count,
+      use_numpy=use_numpy)
+
+
+def read_matrix_market_vector(filename, vector_name='b'):
+  """Reads a Matrix Market array file, or an n x 1 matrix, as a vector.
+
+  Args:
+    filename: The string filename.
+    vector_name: The string name to give the vector.
+  Returns:
+    A sor_pb2.Vector proto.
+  Raises:
+    IOError. If the file cannot be opened or does not exist.
+    MatrixMarketFormatError. If the file is not a single column or an index
+        is out of bounds.
+  """
+  with open(filename, 'r') as file_obj:
+    matrix_format, field, symmetry, size = _read_matrix_market_header(
+        file_obj)
+    if size[1:2] != [1] or field == 'pattern' or symmetry != 'general':
+      raise MatrixMarketFormatError("Vectors must be a single real column")
+    values = numpy.zeros(size[0])
+    if matrix_format == 'array':
+      chunks = list(_iter_matrix_market_chunks(
+          file_obj, 1, MATRIX_MARKET_CHUNK_SIZE))
+      if chunks:
+        values = numpy.concatenate(chunks)[:, 0]
+      if len(values) != size[0]:
+        raise MatrixMarketFormatError("Wrong number of array entries")
+    else:
+      for entries in _iter_matrix_market_chunks(
+          file_obj, 3, MATRIX_MARKET_CHUNK_SIZE):
+        rows = entries[:, 0].astype(numpy.int64) - 1
+        if len(rows) and (rows.min() < 0 or rows.max() >= size[0]):
+          raise MatrixMarketFormatError("Row index out of bounds")
+        values[rows] = entries[:, 2]
+  vector_proto = sor_pb2.Vector(vector_name=vector_name, length=size[0])
+  vector_proto.values.extend(values.tolist())
+  return vector_proto
+
+
+def write_matrix_market(matrix, filename, comment=None):
+  """Writes a SparseMatrix as a general real Matrix Market coordinate file.
+
+  Args:
+    matrix: A sparse_matrix.SparseMatrix.
+    filename: The string filename.
+    comment: An optional string written as a comment after the banner.
+  Raises:
+    IOError. If the file cannot be opened or written.
+  """
+  row_start = numpy.asarray(matrix.rowStart, dtype=numpy.int64)
+  rows = numpy.repeat(numpy.arange(1, matrix.rows + 1), numpy.diff(row_start))
+  cols = numpy.asarray(matrix.cols, dtype=numpy.int64) + 1
+  vals = numpy.asarray(matrix.vals, dtype=numpy.float64)
+  with open(filename, 'w') as file_obj:
+    file_obj.write('%%MatrixMarket matrix coordinate real general\n')
+    if comment:
+      for line in comment.splitlines():
+        file_obj.write('%% %s\n' % line)
+    file_obj.write('%d %d %d\n' % (matrix.rows, matrix.columns, len(vals)))
+    # Write a bounded number of lines at a time.
+    for start in range(0, len(vals), 1 << 16):
+      end = start + (1 << 16)
+      file_obj.write(''.join(
+          '%d %d %r\n' % entry for entry in
+          zip(rows[start:end].tolist(), cols[start:end].tolist(),
+              vals[start:end].tolist())))
+
+
 def write_output(output_message, filename="nas_Sor.out"):
   """Writes output file
+
+  The binary record format is used for binary extensions, text otherwise.
+
   Args:
     filename: The string filename.
     output_message: A pb2.SorReturnValue proto message to be written to file
   Raises:
     IOError. If the file cannot be opened or written.
   """
+  if _has_binary_extension(filename):
+    write_records([output_message], filename)
+    return
   try:
     file_obj = open(filename, 'w+')
     file_obj.seek(0)
@@ -0,0 +1,92 @@
+#! /usr/bin/python3
+"""Measures the text input parsing throughput of data_io in MB/s.
+
+Generates a nas_Sor.in style text file holding a tridiagonal matrix and a
+vector of the requested size, then times data_io.read_input_csr on it.
+
+  python3 data_io_benchmark.py --size-mb 1024
+"""
+import argparse
+import data_io
+import os
+import tempfile
+import time
+
+# Rows written per call to write.
+_ROWS_PER_WRITE = 10000
+
+
+def _matrix_value_text(row, column, value):
+  """Returns the text format of one matrix value."""
+  return ("values {\n  row_index: %d\n  column_index: %d\n  value: %r\n}\n" %
+          (row, column, value))
+
+
+def generate_text_input(filename, size_bytes):
+  """Writes a text format tridiagonal system of roughly size_bytes.
+
+  Args:
+    filename: The string filename to write.
+    size_bytes: The integer approximate file size.
+  Returns:
+    The integer number of rows written.
+  """
+  # A row is three matrix values and one vector value.
+  row_bytes = len(_matrix_value_text(10 ** 6, 10 ** 6, -1.25)) * 3 + 20
+  rows = max(2, size_bytes // row_bytes)
+  with open(filename, 'w') as file_obj:
+    file_obj.write('matrix_name: "a"\nrow_count: %d\ncolumn_count: %d\n' %
+                   (rows, rows))
+    for start in range(0, rows, _ROWS_PER_WRITE):
+      parts = []
+      for row in range(start, min(rows, start + _ROWS_PER_WRITE)):
+        if row > 0:
+          parts.append(_matrix_value_text(row, row - 1, -1.25))
+        parts.append(_matrix_value_text(row, row, 4.5))
+        if row < rows - 1:
+          parts.append(_matrix_value_text(row, row + 1, -1.75))
+      file_obj.write(''.join(parts))
+    file_obj.write('\nvector_name: "b"\nlength: %d\n' % rows)
+    for start in range(0, rows, _ROWS_PER_WRITE):
+      file_obj.write(''.join(
+          'values: %r\n' % (row * 0.5) for row in
+          range(start, min(rows, start + _ROWS_PER_WRITE))))
+  return rows
+
+
+def run_benchmark(filename, chunk_size):
+  """Times read_input_csr on a file.
+
+  Returns:
+    A tuple of the elapsed seconds and the MB/s throughput.
+  """
+  size_mb = os.path.getsize(filename) / 2 ** 20
+  start = time.perf_counter()
+  data_io.read_input_csr(filename, chunk_size)
+  elapsed = time.perf_counter() - start
+  return elapsed, size_mb / elapsed
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--size-mb', type=float, default=1024,
+                      help='Size of the generated input file in MB.')
+  parser.add_argument('--chunk-size', type=int,
+                      default=data_io.DEFAULT_CHUNK_SIZE,
+                      help='Characters read from the file at a time.')
+  parser.add_argument('--input', help='Benchmark an existing file instead.')
+  args = parser.parse_args()
+  if args.input:
+    filename = args.input
+  else:
+    handle, filename = tempfile.mkstemp(suffix='.in')
+    os.close(handle)
+    rows = generate_text_input(filename, int(args.size_mb * 2 ** 20))
+    print("Generated %s rows in %s" % (rows, filename))
+  try:
+    elapsed, throughput = run_benchmark(filename, args.chunk_size)
+    print("Parsed %.1f MB in %.2f s: %.1f MB/s" %
+          (os.path.getsize(filename) / 2 ** 20, elapsed, throughput))
+  finally:
+    if not args.input:
+      os.remove(filename)
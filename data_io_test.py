@@ -1,8 +1,12 @@
 #! /usr/bin/python3
 """Unit tests associated with io.py."""
 from proto_genfiles.protos import sor_pb2
+import io
+import os
+import tempfile
 import unittest
 import data_io
+import sparse_matrix
 
 class IoTest(unittest.TestCase):
 
@@ -60,6 +64,59 @@ class IoTest(unittest.TestCase):
         str(self.negative_matrix_proto))
     self.assertEqual(negative_matrix_proto, self.negative_matrix_proto)
 
+  def testProcessStringMatrixProto_OffDiagonal(self):
+    matrix_proto = sor_pb2.SparseMatrix(
+        matrix_name="off diagonal", row_count=3, column_count=4)
+    for row, column, value in ((0, 3, 1e-05), (2, 1, -2.5), (1, 0, 3)):
+      sparse_value = matrix_proto.values.add()
+      sparse_value.row_index = row
+      sparse_value.column_index = column
+      sparse_value.value = value
+    self.assertEqual(matrix_proto,
+                     data_io._process_string_matrix_proto(str(matrix_proto)))
+
+  def testParseTextInput_SmallChunks(self):
+    text = str(self.negative_matrix_proto) + '\n' + str(self.vector_proto)
+    for chunk_size in (1, 2, 3, 7, 64):
+      parsed = data_io._parse_text_input(io.StringIO(text), chunk_size)
+      self.assertEqual(self.negative_matrix_proto,
+                       data_io._to_sparse_matrix_proto(parsed))
+      self.assertEqual(self.vector_proto, data_io._to_vector_proto(parsed))
+
+  def testParseTextInput_Malformed(self):
+    for text in ('row_count: 3\nvalues {\n  value: 1.0\n',
+                 'row_count: three\n', 'colour: 3\n'):
+      self.assertRaises(data_io.TextFormatError, data_io._parse_text_input,
+                        io.StringIO(text))
+
+  def testParseTextInput_ErrorLineNumbers(self):
+    negative_index = ('row_count: 2\ncolumn_count: 2\nvalues {\n'
+                      '  row_index: -1\n  column_index: 0\n  value: 1.0\n}\n')
+    invalid_number = 'row_count: 2\n\ncolumn_count: two\n'
+    for chunk_size in (1, 5, data_io.DEFAULT_CHUNK_SIZE):
+      with self.assertRaisesRegex(data_io.TextFormatError,
+                                  'Negative index.* line 7'):
+        data_io._parse_text_input(io.StringIO(negative_index), chunk_size)
+      with self.assertRaisesRegex(data_io.TextFormatError, 'line 3'):
+        data_io._parse_text_input(io.StringIO(invalid_number), chunk_size)
+
+  def testReadInputCsr(self):
+    a, b = data_io.read_input_csr(self.input_file, chunk_size=16)
+    self.assertEqual(data_io.convert_to_csr_matrix_proto(
+        data_io.read_input(self.input_file)[0]), a)
+    self.assertEqual([3.0, 4.0, 5.0], list(b.values))
+
+  def testReadInputCsr_IndexOutOfBounds(self):
+    header = 'row_count: 2\ncolumn_count: 2\n'
+    with tempfile.TemporaryDirectory() as directory:
+      for indices in ((2, 0), (0, 2)):
+        text = header + (
+            'values {\n  row_index: %s\n  column_index: %s\n  value: 1.0\n}\n'
+            'values {\n  row_index: 1\n  column_index: 1\n  value: 2.0\n}\n'
+            % indices)
+        self.assertRaises(data_io.TextFormatError, data_io.read_input_csr,
+                          self._write_text(directory, 'a.in', text))
+
   def testProcessStringVectorProto(self):
     vector_proto_b = data_io._process_string_vector_proto(
         str(self.vector_proto))
@@ -70,6 +127,168 @@ class IoTest(unittest.TestCase):
         str(self.negative_vector_proto))
     self.assertEqual(negative_vector_proto, self.negative_vector_proto)
 
+  def testConvertToCsrMatrixProto(self):
+    csr_matrix_proto = data_io.convert_to_csr_matrix_proto(self.matrix_proto)
+    self.assertEqual("a", csr_matrix_proto.matrix_name)
+    self.assertEqual([0, 1, 2, 3], list(csr_matrix_proto.row_ptr))
+    self.assertEqual([0, 1, 2], list(csr_matrix_proto.col_index))
+    self.assertEqual([3.9, 7.8, 11.7], list(csr_matrix_proto.value))
+    self.assertLess(csr_matrix_proto.ByteSize(), self.matrix_proto.ByteSize())
+
+  def testConvertToSparseMatrixProto_RoundTrip(self):
+    csr_matrix_proto = data_io.convert_to_csr_matrix_proto(
+        self.negative_matrix_proto)
+    self.assertEqual(self.negative_matrix_proto,
+                     data_io.convert_to_sparse_matrix_proto(csr_matrix_proto))
+
+  def testBinaryInputRoundTrip(self):
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'input.pb')
+      data_io.write_input(self.matrix_proto, self.vector_proto, filename)
+      self.assertTrue(data_io.is_binary_file(filename))
+      a, b = data_io.read_input(filename)
+    self.assertEqual(self.matrix_proto, a)
+    self.assertEqual(self.vector_proto, b)
+
+  def testTextInputRoundTrip(self):
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'input.in')
+      data_io.write_input(self.matrix_proto, self.vector_proto, filename)
+      self.assertFalse(data_io.is_binary_file(filename))
+      self.assertEqual(str(self.matrix_proto) + '\n' + str(self.vector_proto),
+                       data_io._read_file(filename))
+      a, b = data_io.read_input(filename)
+    self.assertEqual(self.matrix_proto, a)
+    self.assertEqual(self.vector_proto, b)
+
+  def testRecordFile_ManyRecords(self):
+    output_proto = sor_pb2.SorReturnValue(
+        result_name="x", vector=self.vector_proto,
+        stopping_reason=sor_pb2.SorReturnValue.DIRECT_SOLVE)
+    csr_matrix_proto = data_io.convert_to_csr_matrix_proto(self.matrix_proto)
+    messages = [csr_matrix_proto, self.vector_proto,
+                self.negative_vector_proto, output_proto, output_proto]
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'records')
+      data_io.write_records(messages, filename)
+      self.assertTrue(data_io.is_binary_file(filename))
+      self.assertEqual(messages, data_io.read_records(filename))
+      a, b = data_io.read_input(filename)
+    self.assertEqual(csr_matrix_proto, a)
+    self.assertEqual(self.vector_proto, b)
+
+  def testRecordFile_Truncated(self):
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'records.pb')
+      data_io.write_records([self.vector_proto], filename)
+      with open(filename, 'rb+') as file_obj:
+        file_obj.truncate(os.path.getsize(filename) - 1)
+      self.assertRaises(data_io.RecordFormatError, data_io.read_records,
+                        filename)
+
+  def testWriteOutput_Binary(self):
+    output_proto = sor_pb2.SorReturnValue(
+        result_name="x", vector=self.vector_proto)
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'output.pb')
+      data_io.write_output(output_proto, filename)
+      self.assertEqual([output_proto], data_io.read_records(filename))
+
+  def _write_text(self, directory, name, text):
+    filename = os.path.join(directory, name)
+    with open(filename, 'w') as file_obj:
+      file_obj.write(text)
+    return filename
+
+  def testReadMatrixMarket_General(self):
+    text = ('%%MatrixMarket matrix coordinate real general\n'
+            '% A comment\n'
+            '3 4 4\n'
+            '3 1 -2.5\n'
+            '1 1 1.0\n'
+            '1 4 2e-3\n'
+            '2 2 4\n')
+    with tempfile.TemporaryDirectory() as directory:
+      for chunk_size in (1, data_io.MATRIX_MARKET_CHUNK_SIZE):
+        matrix = data_io.read_matrix_market(
+            self._write_text(directory, 'a.mtx', text), chunk_size=chunk_size)
+        self.assertEqual([[1.0, 0, 0, 2e-3], [0, 4.0, 0, 0], [-2.5, 0, 0, 0]],
+                         matrix.to_dense_matrix())
+
+  def testReadMatrixMarket_SymmetricExpanded(self):
+    text = ('%%MatrixMarket matrix coordinate integer symmetric\n'
+            '3 3 4\n1 1 4\n2 1 -1\n2 2 4\n3 2 -1\n')
+    with tempfile.TemporaryDirectory() as directory:
+      matrix = data_io.read_matrix_market(
+          self._write_text(directory, 'a.mtx', text), use_numpy=False)
+    self.assertEqual([[4, -1, 0], [-1, 4, -1], [0, -1, 0]],
+                     matrix.to_dense_matrix())
+    self.assertEqual([0, 2, 5, 6], matrix.rowStart)
+
+  def testReadMatrixMarket_PatternSkewSymmetric(self):
+    pattern = ('%%MatrixMarket matrix coordinate pattern general\n'
+               '2 2 2\n1 2\n2 1\n')
+    skew = ('%%MatrixMarket matrix coordinate real skew-symmetric\n'
+            '2 2 1\n2 1 3.5\n')
+    with tempfile.TemporaryDirectory() as directory:
+      pattern_matrix = data_io.read_matrix_market(
+          self._write_text(directory, 'p.mtx', pattern))
+      skew_matrix = data_io.read_matrix_market(
+          self._write_text(directory, 's.mtx', skew))
+    self.assertEqual([[0, 1.0], [1.0, 0]], pattern_matrix.to_dense_matrix())
+    self.assertEqual([[0, -3.5], [3.5, 0]], skew_matrix.to_dense_matrix())
+
+  def testReadMatrixMarket_Invalid(self):
+    invalid_files = [
+        '%%MatrixMarket matrix coordinate complex general\n1 1 1\n1 1 1 0\n',
+        '%%MatrixMarket matrix coordinate real general\n2 2 2\n1 1 1\n',
+        '%%MatrixMarket matrix coordinate real general\n2 2 1\n3 1 1\n',
+        '%%MatrixMarket matrix coordinate real general\n2 2 2\n1 1 1\n'
+        '1 1 2\n',
+        'not a matrix market file\n',
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+      for text in invalid_files:
+        self.assertRaises(data_io.MatrixMarketFormatError,
+                          data_io.read_matrix_market,
+                          self._write_text(directory, 'a.mtx', text))
+
+  def testMatrixMarket_RoundTrip(self):
+    dense = [[9.1, 0, 0, 1.0 / 3],
+             [0, 0, 0, 0],
+             [-5, 0, 1e-300, 0]]
+    matrix = sparse_matrix.SparseMatrix(dense_matrix=dense)
+    with tempfile.TemporaryDirectory() as directory:
+      filename = os.path.join(directory, 'a.mtx')
+      data_io.write_matrix_market(matrix, filename, comment='round trip')
+      self.assertEqual(dense,
+                       data_io.read_matrix_market(filename).to_dense_matrix())
+
+  def testReadMatrixMarketVector(self):
+    array_text = ('%%MatrixMarket matrix array real general\n'
+                  '3 1\n1.5\n-2\n3\n')
+    coordinate_text = ('%%MatrixMarket matrix coordinate real general\n'
+                       '3 1 1\n2 1 7\n')
+    with tempfile.TemporaryDirectory() as directory:
+      array_vector = data_io.read_matrix_market_vector(
+          self._write_text(directory, 'b.mtx', array_text))
+      coordinate_vector = data_io.read_matrix_market_vector(
+          self._write_text(directory, 'c.mtx', coordinate_text))
+    self.assertEqual([1.5, -2.0, 3.0], list(array_vector.values))
+    self.assertEqual(3, array_vector.length)
+    self.assertEqual([0.0, 7.0, 0.0], list(coordinate_vector.values))
+
+  def testReadMatrixMarketVector_IndexOutOfBounds(self):
+    zero_index = ('%%MatrixMarket matrix coordinate real general\n'
+                  '3 1 1\n0 1 7\n')
+    past_end = ('%%MatrixMarket matrix coordinate real general\n'
+                '3 1 1\n4 1 7\n')
+    with tempfile.TemporaryDirectory() as directory:
+      for text in (zero_index, past_end):
+        self.assertRaises(data_io.MatrixMarketFormatError,
+                          data_io.read_matrix_market_vector,
+                          self._write_text(directory, 'b.mtx', text))
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -1,13 +1,11 @@
 #! /usr/bin/python3 
 """This script is to experiment with different relaxation rates on a very large
 matrix."""
-import sparse_matrix
-import vector
+import argparse
+import matrix_generator
+import plotting
 import sparse_sor
-import pandas
-from proto_genfiles.protos import sor_pb2
-import random
-from matplotlib import pyplot
+import sys
 
 
 def effect_relaxation_rate(
@@ -32,47 +30,43 @@ def effect_relaxation_rate(
  
 index_list = [ x / 10 for x in range(1,21)]
 
-# Experiment to see effect of very large matrix 
-print("--------------------------------------------------------------------")
-print("Experiment with large, randomly generated diagonally dominant matrix")
-print("--------------------------------------------------------------------")
 
-# Create tridiagonal matrix
-matrix_a_proto = sor_pb2.SparseMatrix(
-    matrix_name="a", row_count=5000, column_count=5000)
-for i in range(0, 5000):
-  value = matrix_a_proto.values.add()
-  value.row_index = i
-  value.column_index = i
-  value.value = random.randint(10,15)
-for i in range(1, 5000):
-  value = matrix_a_proto.values.add()
-  value.row_index = i
-  value.column_index = i-1
-  value.value = random.randint(2,4)
-for i in range(0, 4999):
-  value = matrix_a_proto.values.add()
-  value.row_index = i
-  value.column_index = i+1
-  value.value = random.randint(-4,4)
-  
-matrix_a = sparse_matrix.SparseMatrix(matrix_a_proto)
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument(
+      "--headless", action="store_true",
+      help="Write the result table to CSV and the plot to PNG instead of "
+      "showing the plot.")
+  parser.add_argument("--output-dir", default=".",
+                      help="Directory for the headless CSV and PNG files.")
+  parser.add_argument("--size", type=int, default=5000,
+                      help="Number of rows in the matrix.")
+  parser.add_argument("--seed", type=int, default=None,
+                      help="Seed for a reproducible matrix and vector.")
+  args = parser.parse_args(argv)
 
-# Create vector with 5000 entries
-vector_a_list = []
-for i in range(5000):
-  vector_a_list.append(random.randint(10,20))
+  # Experiment to see effect of very large matrix 
+  print("--------------------------------------------------------------------")
+  print("Experiment with large, randomly generated diagonally dominant matrix")
+  print("--------------------------------------------------------------------")
 
-vector_b = vector.Vector(name = "a", number_list = vector_a_list)
+  # Create tridiagonal matrix
+  matrix_a = matrix_generator.tridiagonal(
+      args.size, lower_range=(2, 4), diagonal_range=(10, 15),
+      upper_range=(-4, 4), seed=args.seed, integers=True)
 
-large_matrix_sor = effect_relaxation_rate(matrix_a, vector_b)
+  # Create vector with one entry per row
+  vector_b = matrix_generator.random_vector(
+      args.size, (10, 20), seed=None if args.seed is None else args.seed + 1,
+      integers=True, name="a")
 
-table2 = pandas.DataFrame({'relaxation_rate':index_list,
-                           'large_matrix': large_matrix_sor}).set_index(
-                           'relaxation_rate')
-                           
-pyplot.plot(table2[:1.2])
-pyplot.ylabel('Number of Iterations Run')
-pyplot.xlabel('Relaxation Rate')
-pyplot.legend(["large_matrix"], loc=9,ncol=4)
-pyplot.show()
\ No newline at end of file
+  large_matrix_sor = effect_relaxation_rate(matrix_a, vector_b)
+
+  plotting.plot_relaxation_iterations(
+      "large_matrix", index_list, [("large_matrix", large_matrix_sor)],
+      args.headless, args.output_dir, max_rate=1.2)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
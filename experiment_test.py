@@ -0,0 +1,31 @@
+#! /usr/bin/python3
+"""Unit tests associated with experiment.py."""
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+import experiment
+
+class ExperimentTest(unittest.TestCase):
+
+  def testMainHeadless(self):
+    with tempfile.TemporaryDirectory() as output_dir:
+      with contextlib.redirect_stdout(io.StringIO()) as output:
+        self.assertEqual(
+            0, experiment.main(["--headless", "--output-dir", output_dir]))
+      self.assertIn("Show effect of different levels of tolerance",
+                    output.getvalue())
+      for name in ("relaxation_rates", "conditioning"):
+        self.assertTrue(
+            os.path.getsize(os.path.join(output_dir, name + ".png")))
+        with open(os.path.join(output_dir, name + ".csv"),
+                  newline="") as file_obj:
+          rows = list(csv.reader(file_obj))
+        self.assertEqual("relaxation_rate", rows[0][0])
+        # One row per relaxation rate from 0.1 to 2.0.
+        self.assertEqual(191, len(rows) - 1)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,254 @@
+"""Generators for large synthetic test systems.
+
+Every matrix is built directly as csr arrays with vectorized numpy
+operations and returned as a sparse_matrix.SparseMatrix. Banded and stencil
+matrices are generated in row then column order so they need no sort.
+Random generators take a seed so the same call always gives the same
+matrix. Matrices with 10**7 non zeros take under a second.
+"""
+import numpy
+import sparse_matrix
+import vector
+
+
+def _rng(seed):
+  return numpy.random.default_rng(seed)
+
+
+def _uniform(rng, size, value_range, integers):
+  """Returns size random values from value_range.
+
+  Integers are drawn from the closed range [low, high] and floats from the
+  half open range [low, high).
+  """
+  low, high = value_range
+  if integers:
+    return rng.integers(low, high, size=size, endpoint=True).astype(
+        numpy.float64)
+  return rng.uniform(low, high, size=size)
+
+
+def _from_row_entries(row_count, column_count, cols, vals, stored, use_numpy):
+  """Builds a SparseMatrix from per row (row_count, width) entry arrays.
+
+  Args:
+    row_count: The integer number of rows.
+    column_count: The integer number of columns.
+    cols: A (row_count, width) integer array of column indices, increasing
+        along each row.
+    vals: A (row_count, width) float array of values.
+    stored: A (row_count, width) boolean array of the entries to keep.
+    use_numpy: boolean whether the matrix uses numpy storage.
+  """
+  row_start = numpy.zeros(row_count + 1, dtype=numpy.int64)
+  numpy.cumsum(stored.sum(axis=1), out=row_start[1:])
+  return sparse_matrix.SparseMatrix(
+      csr_arrays=(row_start, cols[stored], vals[stored]),
+      column_count=column_count, use_numpy=use_numpy)
+
+
+def _stencil(shape, diagonal, off_diagonal, use_numpy):
+  """Builds the matrix of a nearest neighbour stencil on a regular grid.
+
+  Grid point (x, y, ...) is row x + nx * (y + ny * (...)). Neighbours
+  outside the grid are dropped, i.e. Dirichlet boundaries.
+  """
+  row_count = int(numpy.prod(shape))
+  rows = numpy.arange(row_count, dtype=numpy.int64)
+  coordinates = numpy.unravel_index(rows, shape[::-1])[::-1]
+  strides = numpy.cumprod((1,) + tuple(shape[:-1]))
+  offsets = []
+  valid = []
+  # Lower neighbours from the largest stride down, then the upper ones, so
+  # the columns of each row are increasing.
+  for axis in reversed(range(len(shape))):
+    offsets.append(-strides[axis])
+    valid.append(coordinates[axis] > 0)
+  offsets.append(0)
+  valid.append(numpy.ones(row_count, dtype=bool))
+  for axis in range(len(shape)):
+    offsets.append(strides[axis])
+    valid.append(coordinates[axis] < shape[axis] - 1)
+  cols = rows[:, None] + numpy.array(offsets, dtype=numpy.int64)[None, :]
+  vals = numpy.full(cols.shape, float(off_diagonal))
+  vals[:, len(shape)] = diagonal
+  return _from_row_entries(row_count, row_count, cols, vals,
+                           numpy.stack(valid, axis=1), use_numpy)
+
+
+def poisson_2d(nx, ny=None, use_numpy=True):
+  """The 5 point finite difference Laplacian on an nx by ny grid.
+
+  Args:
+    nx: The integer number of grid points along x.
+    ny: The integer number of grid points along y. Defaults to nx.
+    use_numpy: boolean whether the matrix uses numpy storage.
+  Returns:
+    A sparse_matrix.SparseMatrix of nx * ny rows with 4 on the diagonal and
+        -1 for each neighbour.
+  """
+  return _stencil((nx, nx if ny is None else ny), 4.0, -1.0, use_numpy)
+
+
+def poisson_3d(nx, ny=None, nz=None, use_numpy=True):
+  """The 7 point finite difference Laplacian on an nx by ny by nz grid.
+
+  Args:
+    nx: The integer number of grid points along x.
+    ny: The integer number of grid points along y. Defaults to nx.
+    nz: The integer number of grid points along z. Defaults to nx.
+    use_numpy: boolean whether the matrix uses numpy storage.
+  Returns:
+    A sparse_matrix.SparseMatrix of nx * ny * nz rows with 6 on the diagonal
+        and -1 for each neighbour.
+  """
+  return _stencil((nx, nx if ny is None else ny, nx if nz is None else nz),
+                  6.0, -1.0, use_numpy)
+
+
+def banded(n, lower_bandwidth, upper_bandwidth, seed=None,
+           value_range=(-1.0, 1.0), margin=1.0, use_numpy=True):
+  """A random strictly row diagonally dominant banded matrix.
+
+  Args:
+    n: The integer number of rows and columns.
+    lower_bandwidth: The integer number of diagonals below the main one.
+    upper_bandwidth: The integer number of diagonals above the main one.
+    seed: An optional integer seed.
+    value_range: The (low, high) range of the off diagonal values.
+    margin: The positive float by which each diagonal value exceeds the sum
+        of the absolute off diagonal values in its row.
+    use_numpy: boolean whether the matrix uses numpy storage.
+  Returns:
+    A sparse_matrix.SparseMatrix.
+  """
+  rows = numpy.arange(n, dtype=numpy.int64)
+  offsets = numpy.arange(-lower_bandwidth, upper_bandwidth + 1,
+                         dtype=numpy.int64)
+  cols = rows[:, None] + offsets[None, :]
+  stored = (cols >= 0) & (cols < n)
+  vals = _uniform(_rng(seed), cols.shape, value_range, False)
+  vals[:, lower_bandwidth] = 0
+  vals[:, lower_bandwidth] = (
+      numpy.abs(numpy.where(stored, vals, 0)).sum(axis=1) + margin)
+  return _from_row_entries(n, n, cols, vals, stored, use_numpy)
+
+
+def tridiagonal(n, lower_range, diagonal_range, upper_range, seed=None,
+                integers=False, use_numpy=True):
+  """A random tridiagonal matrix with each diagonal drawn from its own range.
+
+  Zero off diagonal values are not stored.
+
+  Args:
+    n: The integer number of rows and columns.
+    lower_range: The (low, high) range of the sub diagonal.
+    diagonal_range: The (low, high) range of the main diagonal.
+    upper_range: The (low, high) range of the super diagonal.
+    seed: An optional integer seed.
+    integers: boolean whether to draw whole numbers from [low, high] rather
+        than floats from [low, high).
+    use_numpy: boolean whether the matrix uses numpy storage.
+  Returns:
+    A sparse_matrix.SparseMatrix.
+  """
+  rng = _rng(seed)
+  rows = numpy.arange(n, dtype=numpy.int64)
+  cols = numpy.stack([rows - 1, rows, rows + 1], axis=1)
+  vals = numpy.stack([_uniform(rng, n, value_range, integers) for value_range
+                      in (lower_range, diagonal_range, upper_range)], axis=1)
+  stored = (cols >= 0) & (cols < n) & (vals != 0)
+  stored[:, 1] = True
+  return _from_row_entries(n, n, cols, vals, stored, use_numpy)
+
+
+def _sorted_unique(keys):
+  """Returns the sorted distinct keys.
+
+  A plain sort and neighbour comparison. numpy.unique is several times
+  slower on 10**7 keys.
+  """
+  keys = numpy.sort(keys)
+  if len(keys):
+    keys = keys[numpy.concatenate(([True], keys[1:] != keys[:-1]))]
+  return keys
+
+
+def _random_entries(rng, row_count, column_count, nonzeros_per_row):
+  """Returns the row and column indices of random columns in every row."""
+  rows = numpy.repeat(numpy.arange(row_count, dtype=numpy.int64),
+                      nonzeros_per_row)
+  cols = rng.integers(0, column_count, size=len(rows), dtype=numpy.int64)
+  return rows, cols
+
+
+def random_sparse(row_count, column_count=None, nonzeros_per_row=10,
+                  seed=None, value_range=(-1.0, 1.0), use_numpy=True):
+  """A matrix with uniformly random sparsity.
+
+  Columns are drawn independently per row and duplicates are merged, so a
+  row can hold slightly fewer than nonzeros_per_row values.
+
+  Args:
+    row_count: The integer number of rows.
+    column_count: The integer number of columns. Defaults to row_count.
+    nonzeros_per_row: The integer number of columns drawn per row.
+    seed: An optional integer seed.
+    value_range: The (low, high) range of the values.
+    use_numpy: boolean whether the matrix uses numpy storage.
+  Returns:
+    A sparse_matrix.SparseMatrix.
+  """
+  if column_count is None:
+    column_count = row_count
+  rng = _rng(seed)
+  rows, cols = _random_entries(rng, row_count, column_count, nonzeros_per_row)
+  keys = _sorted_unique(rows * column_count + cols)
+  vals = _uniform(rng, len(keys), value_range, False)
+  return sparse_matrix.SparseMatrix(
+      csr_arrays=sparse_matrix.coo_to_csr_arrays(
+          row_count, column_count, keys // column_count, keys % column_count,
+          vals),
+      column_count=column_count, use_numpy=use_numpy)
+
+
+def diagonally_dominant(n, nonzeros_per_row=10, seed=None,
+                        value_range=(-1.0, 1.0), margin=1.0, use_numpy=True):
+  """A strictly row diagonally dominant matrix with random sparsity.
+
+  Args:
+    n: The integer number of rows and columns.
+    nonzeros_per_row: The integer number of off diagonal columns drawn per
+        row. Duplicates are merged.
+    seed: An optional integer seed.
+    value_range: The (low, high) range of the off diagonal values.
+    margin: The positive float by which each diagonal value exceeds the sum
+        of the absolute off diagonal values in its row.
+    use_numpy: boolean whether the matrix uses numpy storage.
+  Returns:
+    A sparse_matrix.SparseMatrix.
+  """
+  rng = _rng(seed)
+  rows, cols = _random_entries(rng, n, n, nonzeros_per_row)
+  diagonal = numpy.arange(n, dtype=numpy.int64)
+  keys = _sorted_unique(numpy.concatenate([rows * n + cols,
+                                          diagonal * n + diagonal]))
+  rows, cols = keys // n, keys % n
+  vals = _uniform(rng, len(keys), value_range, False)
+  on_diagonal = rows == cols
+  vals[on_diagonal] = 0
+  vals[on_diagonal] = numpy.bincount(
+      rows, weights=numpy.abs(vals), minlength=n) + margin
+  return sparse_matrix.SparseMatrix(
+      csr_arrays=sparse_matrix.coo_to_csr_arrays(n, n, rows, cols, vals),
+      use_numpy=use_numpy)
+
+
+def random_vector(n, value_range=(0.0, 1.0), seed=None, integers=False,
+                  name="b"):
+  """A vector.Vector of n values drawn from value_range.
+
+  Whole numbers are drawn from [low, high] and floats from [low, high).
+  """
+  return vector.Vector(
+      name=name, number_list=_uniform(_rng(seed), n, value_range, integers))
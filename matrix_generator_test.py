@@ -0,0 +1,87 @@
+#! /usr/bin/python3
+"""Unit tests associated with matrix_generator.py."""
+import matrix_generator
+import numpy
+import unittest
+import validation
+
+class MatrixGeneratorTest(unittest.TestCase):
+
+  def assertValidCsr(self, matrix):
+    self.assertTrue(validation.ValidateCsrArrays(
+        matrix.rowStart, matrix.cols, len(matrix.vals), matrix.columns))
+
+  def assertSameMatrix(self, matrix_a, matrix_b):
+    self.assertEqual(matrix_a.rowStart.tolist(), matrix_b.rowStart.tolist())
+    self.assertEqual(matrix_a.cols.tolist(), matrix_b.cols.tolist())
+    self.assertEqual(matrix_a.vals.tolist(), matrix_b.vals.tolist())
+
+  def testPoisson2d(self):
+    matrix_a = matrix_generator.poisson_2d(3, 2)
+    self.assertValidCsr(matrix_a)
+    expected = numpy.array(
+        [[4, -1, 0, -1, 0, 0],
+         [-1, 4, -1, 0, -1, 0],
+         [0, -1, 4, 0, 0, -1],
+         [-1, 0, 0, 4, -1, 0],
+         [0, -1, 0, -1, 4, -1],
+         [0, 0, -1, 0, -1, 4]], dtype=float)
+    dense = numpy.zeros((6, 6))
+    for i in range(6):
+      start, end = matrix_a.rowStart[i], matrix_a.rowStart[i + 1]
+      dense[i, matrix_a.cols[start:end]] = matrix_a.vals[start:end]
+    self.assertTrue(numpy.array_equal(expected, dense))
+
+  def testPoisson3d(self):
+    matrix_a = matrix_generator.poisson_3d(4, 3, 2)
+    self.assertValidCsr(matrix_a)
+    self.assertEqual(24, matrix_a.rows)
+    # Each of the 3 axes has (n - 1) * (other points) links, stored twice.
+    self.assertEqual(24 + 2 * (3 * 6 + 2 * 8 + 1 * 12), len(matrix_a.vals))
+    self.assertEqual(12, matrix_a.bandwidth())
+    # Interior rows sum to 0, boundary rows are diagonally dominant.
+    self.assertTrue((numpy.array(matrix_a.diagonal_dominance_margins()) >= 0)
+                    .all())
+
+  def testBanded(self):
+    matrix_a = matrix_generator.banded(50, 2, 3, seed=1)
+    self.assertValidCsr(matrix_a)
+    self.assertEqual(3, matrix_a.bandwidth())
+    self.assertTrue(matrix_a.is_strictly_row_diagonally_dominant())
+    self.assertSameMatrix(matrix_a, matrix_generator.banded(50, 2, 3, seed=1))
+
+  def testTridiagonal(self):
+    matrix_a = matrix_generator.tridiagonal(
+        100, (2, 4), (10, 15), (-4, 4), seed=2, integers=True)
+    self.assertValidCsr(matrix_a)
+    self.assertTrue(matrix_a.is_tridiagonal())
+    self.assertTrue(matrix_a.is_strictly_row_diagonally_dominant())
+    self.assertTrue((matrix_a.vals != 0).all())
+    self.assertTrue((matrix_a.vals == numpy.round(matrix_a.vals)).all())
+
+  def testDiagonallyDominant(self):
+    matrix_a = matrix_generator.diagonally_dominant(200, 8, seed=3)
+    self.assertValidCsr(matrix_a)
+    self.assertTrue(matrix_a.is_strictly_row_diagonally_dominant())
+    self.assertSameMatrix(
+        matrix_a, matrix_generator.diagonally_dominant(200, 8, seed=3))
+    self.assertFalse(numpy.array_equal(
+        matrix_a.vals,
+        matrix_generator.diagonally_dominant(200, 8, seed=4).vals))
+
+  def testRandomSparse(self):
+    matrix_a = matrix_generator.random_sparse(30, 70, 5, seed=5)
+    self.assertValidCsr(matrix_a)
+    self.assertEqual((30, 70), (matrix_a.rows, matrix_a.columns))
+    self.assertLessEqual(len(matrix_a.vals), 30 * 5)
+    self.assertGreater(len(matrix_a.vals), 30 * 4)
+
+  def testRandomVector(self):
+    vector_b = matrix_generator.random_vector(
+        20, (10, 20), seed=6, integers=True)
+    self.assertEqual(20, vector_b.length)
+    self.assertTrue(all(10 <= value <= 20 and value == int(value)
+                        for value in vector_b.values))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,87 @@
+"""Plotting and result file helpers shared by the experiment scripts.
+
+matplotlib is only imported when a plot is actually drawn, so importing the
+scripts as libraries stays fast and does not need a display. In headless
+mode plots are saved as PNG files instead of being shown.
+"""
+import csv
+import os
+
+
+def get_pyplot(headless=False):
+  """Imports and returns matplotlib.pyplot.
+
+  Args:
+    headless: boolean whether to select the non interactive Agg backend so
+        no display is needed and nothing blocks.
+  Returns:
+    The matplotlib.pyplot module.
+  """
+  import matplotlib
+  if headless:
+    matplotlib.use("Agg")
+  from matplotlib import pyplot
+  return pyplot
+
+
+def finish_plot(pyplot, name, headless=False, output_dir="."):
+  """Shows the current figure, or saves it as output_dir/name.png.
+
+  Returns:
+    The string PNG filename in headless mode, None otherwise.
+  """
+  if not headless:
+    pyplot.show()
+    return None
+  filename = os.path.join(output_dir, name + ".png")
+  pyplot.savefig(filename)
+  pyplot.close()
+  print("Wrote plot to: %s" % filename)
+  return filename
+
+
+def write_csv(name, header, rows, output_dir="."):
+  """Writes a header and rows to output_dir/name.csv.
+
+  Returns:
+    The string CSV filename.
+  """
+  filename = os.path.join(output_dir, name + ".csv")
+  with open(filename, "w", newline="") as file_obj:
+    writer = csv.writer(file_obj)
+    writer.writerow(header)
+    writer.writerows(rows)
+  print("Wrote results to: %s" % filename)
+  return filename
+
+
+def plot_relaxation_iterations(name, relaxation_rates, series, headless=False,
+                               output_dir=".", max_rate=None):
+  """Plots the iterations run against the relaxation rate for each series.
+
+  In headless mode the table is also written to output_dir/name.csv.
+
+  Args:
+    name: The string base name of the output files.
+    relaxation_rates: A list of the float relaxation rates.
+    series: A list of (label, list of iteration counts) pairs, one count per
+        relaxation rate.
+    headless: boolean whether to save the plot rather than show it.
+    output_dir: The string directory for the headless files.
+    max_rate: An optional float. Higher relaxation rates are not plotted.
+  """
+  if headless:
+    write_csv(name, ["relaxation_rate"] + [label for label, _ in series],
+              zip(relaxation_rates, *[counts for _, counts in series]),
+              output_dir)
+  shown = [i for i, rate in enumerate(relaxation_rates)
+           if max_rate is None or rate <= max_rate]
+  pyplot = get_pyplot(headless)
+  pyplot.figure()
+  for label, counts in series:
+    pyplot.plot([relaxation_rates[i] for i in shown],
+                [counts[i] for i in shown], label=label)
+  pyplot.ylabel('Number of Iterations Run')
+  pyplot.xlabel('Relaxation Rate')
+  pyplot.legend(loc=9, ncol=4)
+  return finish_plot(pyplot, name, headless, output_dir)
@@ -0,0 +1,46 @@
+#! /usr/bin/python3
+"""Unit tests associated with plotting.py."""
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import plotting
+
+class PlottingTest(unittest.TestCase):
+
+  def setUp(self):
+    self.temporary_directory = tempfile.TemporaryDirectory()
+    self.output_dir = self.temporary_directory.name
+
+  def tearDown(self):
+    self.temporary_directory.cleanup()
+
+  def testScriptsImportWithoutPlottingLibraries(self):
+    for module in ("black_scholes", "experiment", "experiment_large_matrix"):
+      output = subprocess.check_output(
+          [sys.executable, "-c",
+           "import sys, %s; print(sorted({'matplotlib', 'pandas'} & "
+           "set(sys.modules)))" % module], text=True)
+      self.assertEqual("[]", output.strip())
+
+  def testWriteCsv(self):
+    filename = plotting.write_csv("table", ["a", "b"], [(1, 2.5), (3, 4)],
+                                  self.output_dir)
+    with open(filename, newline="") as file_obj:
+      self.assertEqual([["a", "b"], ["1", "2.5"], ["3", "4"]],
+                       list(csv.reader(file_obj)))
+
+  def testPlotRelaxationIterationsHeadless(self):
+    filename = plotting.plot_relaxation_iterations(
+        "rates", [0.5, 1.0, 1.5], [("a", [9, 5, 7]), ("b", [8, 4, 6])],
+        headless=True, output_dir=self.output_dir, max_rate=1.0)
+    self.assertEqual(os.path.join(self.output_dir, "rates.png"), filename)
+    self.assertTrue(os.path.getsize(filename))
+    with open(os.path.join(self.output_dir, "rates.csv")) as file_obj:
+      self.assertEqual("relaxation_rate,a,b\n0.5,9,8\n1.0,5,4\n1.5,7,6\n",
+                       file_obj.read())
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,160 @@
+"""Content addressed on disk cache of SOR solve results.
+
+Entries are serialized sor_pb2.SorReturnValue protos stored one per file and
+named by a SHA-256 over the csr arrays of A, b, the starting x and the
+solver parameters, so identical solves map to the same entry no matter
+where their inputs came from. The least recently used entries are evicted
+once the cache grows past its size bound.
+"""
+import collections
+import hashlib
+import numpy
+import os
+import struct
+from google.protobuf import message
+from proto_genfiles.protos import sor_pb2
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_ENTRY_EXTENSION = ".pb"
+
+
+def _update_with_array(digest, values, dtype):
+  """Feeds the length and the bytes of values as dtype into digest."""
+  array = numpy.ascontiguousarray(values, dtype=dtype)
+  digest.update(struct.pack("<Q", len(array)))
+  digest.update(memoryview(array).cast("B"))
+
+
+def matrix_digest(matrix):
+  """Returns a hex SHA-256 of the shape and csr arrays of a SparseMatrix.
+
+  Solvers compute this once per matrix and reuse it for every solve key.
+  """
+  digest = hashlib.sha256()
+  digest.update(struct.pack("<QQ", matrix.rows, matrix.columns))
+  _update_with_array(digest, matrix.rowStart, numpy.int64)
+  _update_with_array(digest, matrix.cols, numpy.int64)
+  _update_with_array(digest, matrix.vals, numpy.float64)
+  return digest.hexdigest()
+
+
+def solve_key(matrix_hex_digest, b_values, x0, parameters):
+  """Returns the cache key of one solve.
+
+  Args:
+    matrix_hex_digest: The string matrix_digest of A.
+    b_values: A sequence of the numbers in b.
+    x0: An optional sequence of numbers the solve starts from. None is 0.
+    parameters: A tuple of the solver parameters that affect the result.
+        Its repr is hashed, so it must only hold numbers and strings.
+  Returns:
+    A hex string key.
+  """
+  digest = hashlib.sha256(matrix_hex_digest.encode("ascii"))
+  _update_with_array(digest, b_values, numpy.float64)
+  if x0 is None:
+    digest.update(b"\x00")
+  else:
+    digest.update(b"\x01")
+    _update_with_array(digest, x0, numpy.float64)
+  digest.update(repr(parameters).encode("utf-8"))
+  return digest.hexdigest()
+
+
+class SorResultCache(object):
+  def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+    """Open or create a result cache in directory.
+
+    Several processes may share one directory. Entries are written
+    atomically and recency is tracked through file modification times.
+
+    Args:
+      directory: The string directory holding the entries. Created if it does
+          not exist.
+      max_bytes: The integer size bound for the sum of all entry sizes.
+    """
+    self.directory = directory
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    os.makedirs(directory, exist_ok=True)
+    # Maps key to entry size in bytes, least recently used first.
+    self._entries = collections.OrderedDict()
+    self._total_bytes = 0
+    existing = []
+    for entry in os.scandir(directory):
+      if entry.is_file() and entry.name.endswith(_ENTRY_EXTENSION):
+        stat = entry.stat()
+        existing.append((stat.st_mtime_ns, entry.name[:-len(_ENTRY_EXTENSION)],
+                         stat.st_size))
+    for _, key, size in sorted(existing):
+      self._entries[key] = size
+      self._total_bytes += size
+
+  def _path(self, key):
+    return os.path.join(self.directory, key + _ENTRY_EXTENSION)
+
+  def _forget(self, key):
+    """Drops key from the index and deletes its file if it still exists."""
+    self._total_bytes -= self._entries.pop(key, 0)
+    try:
+      os.remove(self._path(key))
+    except FileNotFoundError:
+      pass
+
+  def get(self, key):
+    """Returns the cached sor_pb2.SorReturnValue for key, or None on a miss.
+
+    Unreadable entries count as misses and are removed.
+    """
+    path = self._path(key)
+    try:
+      with open(path, "rb") as file_obj:
+        data = file_obj.read()
+      result = sor_pb2.SorReturnValue()
+      result.ParseFromString(data)
+    except FileNotFoundError:
+      self._total_bytes -= self._entries.pop(key, 0)
+      self.misses += 1
+      return None
+    except message.DecodeError:
+      self._forget(key)
+      self.misses += 1
+      return None
+    os.utime(path)
+    self._total_bytes -= self._entries.pop(key, 0)
+    self._entries[key] = len(data)
+    self._total_bytes += len(data)
+    self.hits += 1
+    return result
+
+  def put(self, key, result):
+    """Stores a sor_pb2.SorReturnValue under key and evicts down to size.
+
+    Results larger than the whole cache are not stored.
+    """
+    data = result.SerializeToString()
+    if len(data) > self.max_bytes:
+      return
+    path = self._path(key)
+    temporary_path = "%s.%s.tmp" % (path, os.getpid())
+    with open(temporary_path, "wb") as file_obj:
+      file_obj.write(data)
+    os.replace(temporary_path, path)
+    self._total_bytes -= self._entries.pop(key, 0)
+    self._entries[key] = len(data)
+    self._total_bytes += len(data)
+    while self._total_bytes > self.max_bytes:
+      oldest_key = next(iter(self._entries))
+      self._forget(oldest_key)
+      self.evictions += 1
+
+  def stats(self):
+    """Returns a dict of the hit, miss and eviction counts and the size."""
+    return {"hits": self.hits, "misses": self.misses,
+            "evictions": self.evictions, "entries": len(self._entries),
+            "bytes": self._total_bytes}
+
+  def __len__(self):
+    return len(self._entries)
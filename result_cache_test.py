@@ -0,0 +1,103 @@
+#! /usr/bin/python3
+"""Unit tests associated with result_cache.py."""
+import os
+import tempfile
+import unittest
+import result_cache
+import sparse_matrix
+import sparse_sor
+import vector
+from proto_genfiles.protos import sor_pb2
+
+class SorResultCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.temporary_directory = tempfile.TemporaryDirectory()
+    self.directory = self.temporary_directory.name
+    self.matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[7, 1, 0],
+         [1, -7, 1],
+         [0, 1, 8]])
+    self.vector_b = vector.Vector(name="b", number_list=[1, 1, 1])
+
+  def tearDown(self):
+    self.temporary_directory.cleanup()
+
+  def _result(self, values):
+    return sor_pb2.SorReturnValue(
+        result_name="x", stopping_iteration=3,
+        vector=vector.Vector(name="x", number_list=values).to_proto())
+
+  def testGetAndPut(self):
+    cache = result_cache.SorResultCache(self.directory)
+    self.assertIsNone(cache.get("a"))
+    cache.put("a", self._result([1.0, 2.0]))
+    self.assertEqual(self._result([1.0, 2.0]), cache.get("a"))
+    self.assertEqual((1, 1, 1), (cache.hits, cache.misses, len(cache)))
+
+  def testReopenKeepsEntries(self):
+    result_cache.SorResultCache(self.directory).put(
+        "a", self._result([1.0]))
+    cache = result_cache.SorResultCache(self.directory)
+    self.assertEqual(1, len(cache))
+    self.assertEqual(self._result([1.0]), cache.get("a"))
+
+  def testLeastRecentlyUsedEviction(self):
+    entry_bytes = len(self._result([1.0]).SerializeToString())
+    cache = result_cache.SorResultCache(self.directory, 2 * entry_bytes)
+    cache.put("a", self._result([1.0]))
+    cache.put("b", self._result([2.0]))
+    cache.get("a")
+    cache.put("c", self._result([3.0]))
+    self.assertEqual(1, cache.evictions)
+    self.assertIsNone(cache.get("b"))
+    self.assertIsNotNone(cache.get("a"))
+    self.assertIsNotNone(cache.get("c"))
+    self.assertEqual(2 * entry_bytes, cache.stats()["bytes"])
+
+  def testCorruptEntryIsAMiss(self):
+    cache = result_cache.SorResultCache(self.directory)
+    cache.put("a", self._result([1.0]))
+    with open(os.path.join(self.directory, "a.pb"), "wb") as file_obj:
+      file_obj.write(b"\xff\xff")
+    self.assertIsNone(cache.get("a"))
+    self.assertEqual(0, len(cache))
+
+  def testSolveKeyDependsOnInputs(self):
+    digest = result_cache.matrix_digest(self.matrix_a)
+    key = result_cache.solve_key(digest, [1, 1, 1], None, (10, .01))
+    self.assertEqual(
+        key, result_cache.solve_key(digest, [1.0, 1.0, 1.0], None, (10, .01)))
+    self.assertNotEqual(
+        key, result_cache.solve_key(digest, [1, 1, 2], None, (10, .01)))
+    self.assertNotEqual(
+        key, result_cache.solve_key(digest, [1, 1, 1], [0, 0, 0], (10, .01)))
+    self.assertNotEqual(
+        key, result_cache.solve_key(digest, [1, 1, 1], None, (11, .01)))
+    numpy_matrix = sparse_matrix.SparseMatrix(
+        dense_matrix=[[7, 1, 0], [1, -7, 1], [0, 1, 8]], use_numpy=True)
+    self.assertEqual(digest, result_cache.matrix_digest(numpy_matrix))
+
+  def testSolverUsesCache(self):
+    cache = result_cache.SorResultCache(self.directory)
+    expected = sparse_sor.SparseSorSolver(
+        self.matrix_a, self.vector_b, 10, .0001, 1.0).to_proto()
+    first = sparse_sor.SparseSorSolver(
+        self.matrix_a, self.vector_b, 10, .0001, 1.0, cache=cache)
+    second = sparse_sor.SparseSorSolver(
+        self.matrix_a, self.vector_b, 10, .0001, 1.0, cache=cache)
+    self.assertEqual(expected, first.to_proto())
+    self.assertEqual(expected, second.to_proto())
+    self.assertEqual([], second.sweep_times)
+    self.assertEqual((1, 1), (cache.hits, cache.misses))
+    # A hit gives x as a list of its own, as a miss does.
+    self.assertIsInstance(second.x, list)
+    result = second.solve(self.vector_b)
+    second.x[0] = 99
+    self.assertNotEqual(99, result.vector.values[0])
+    sparse_sor.SparseSorSolver(
+        self.matrix_a, self.vector_b, 10, .0001, 1.5, cache=cache)
+    self.assertEqual((2, 2), (cache.hits, cache.misses))
+
+if __name__ == '__main__':
+  unittest.main()
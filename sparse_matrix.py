@@ -1,28 +1,139 @@
 """Class and methods pertaining to Sparse Matrices."""
+import numpy
 import validation
 import vector
+from proto_genfiles.protos import sor_pb2
 
 class NonConformableException(Exception):
   """Exception for when one tries to multiply non conformable matrices."""
   pass
 
 
+def coo_to_csr(row_count, column_count, row_indices, column_indices, values):
+  """Convert coordinate (COO) format into csr format in linear time.
+
+  Uses two stable counting sort passes, first by column and then by row, so
+  the entries of each row come out ordered by column. Costs
+  O(nnz + rows + columns) time and memory. Empty rows, including leading and
+  trailing ones, get a zero length slice.
+
+  Args:
+    row_count: The integer number of rows in the matrix.
+    column_count: The integer number of columns in the matrix.
+    row_indices: A sequence of the row index of each value.
+    column_indices: A sequence of the column index of each value.
+    values: A sequence of the values.
+  Returns:
+    Three lists; the rowstart, column and values in the matrix
+  """
+  nnz = len(values)
+  # Counting sort by column.
+  column_start = [0] * (column_count + 1)
+  for col in column_indices:
+    column_start[col + 1] += 1
+  for j in range(column_count):
+    column_start[j + 1] += column_start[j]
+  by_column = [0] * nnz
+  for k, col in enumerate(column_indices):
+    by_column[column_start[col]] = k
+    column_start[col] += 1
+  # Stable counting sort of the column ordering by row.
+  rowStart = [0] * (row_count + 1)
+  for row in row_indices:
+    rowStart[row + 1] += 1
+  for i in range(row_count):
+    rowStart[i + 1] += rowStart[i]
+  next_slot = rowStart[:-1]
+  cols = [0] * nnz
+  vals = [0] * nnz
+  for k in by_column:
+    row = row_indices[k]
+    slot = next_slot[row]
+    cols[slot] = column_indices[k]
+    vals[slot] = values[k]
+    next_slot[row] = slot + 1
+  return rowStart, cols, vals
+
+
+def coo_to_csr_arrays(row_count, column_count, row_indices, column_indices,
+                      values):
+  """Convert coordinate (COO) arrays into csr numpy arrays.
+
+  The vectorized counterpart of coo_to_csr for large inputs. Input that is
+  already ordered by row then column, as text and Matrix Market files
+  usually are, is not sorted again.
+
+  Args:
+    row_count: The integer number of rows in the matrix.
+    column_count: The integer number of columns in the matrix.
+    row_indices: An integer array like of the row index of each value.
+    column_indices: An integer array like of the column index of each value.
+    values: A float array like of the values.
+  Returns:
+    Three numpy arrays; the int64 rowstart, int64 column and float64 values.
+  """
+  rows = numpy.asarray(row_indices, dtype=numpy.int64)
+  cols = numpy.asarray(column_indices, dtype=numpy.int64)
+  vals = numpy.asarray(values, dtype=numpy.float64)
+  keys = rows * column_count + cols
+  if len(keys) and (numpy.diff(keys) < 0).any():
+    order = numpy.argsort(keys, kind="stable")
+    rows, cols, vals = rows[order], cols[order], vals[order]
+  row_start = numpy.zeros(row_count + 1, dtype=numpy.int64)
+  numpy.cumsum(numpy.bincount(rows, minlength=row_count),
+               out=row_start[1:])
+  return row_start, cols, vals
+
+
 class SparseMatrix(object):
-  def __init__(self, sparse_matrix_proto=None, dense_matrix=None):
+  def __init__(self, sparse_matrix_proto=None, dense_matrix=None,
+               use_numpy=False, csr_arrays=None, column_count=None):
     """Initialize Sparse Matrix.
 
     Args:
-      sparse_matrix_proto: A sor_pb2.SparseMatrix proto.
+      sparse_matrix_proto: A sor_pb2.SparseMatrix or sor_pb2.CsrMatrix proto.
       dense_matrix: A list of lists with only numerical entries.
+      use_numpy: boolean whether to store the csr arrays as contiguous numpy
+          arrays and use the vectorized kernels.
+      csr_arrays: A tuple of already built rowstart, column and value
+          sequences (lists or numpy arrays).
+      column_count: The integer number of columns when passing csr_arrays.
+          Defaults to the number of rows.
     """
-    if not (sparse_matrix_proto or dense_matrix):
+    sources = [source for source in (sparse_matrix_proto, dense_matrix,
+                                     csr_arrays) if source is not None]
+    if not sources:
       raise Exception("Need to pass a proto or matrix to constructor")
-    if sparse_matrix_proto and dense_matrix:
+    if len(sources) > 1:
       raise Exception("Both should not be submitted")
-    if sparse_matrix_proto:
+    self.use_numpy = use_numpy
+    self._dominance_margins = None
+    if sparse_matrix_proto is not None:
       self.from_proto(sparse_matrix_proto)
-    else:
+    elif dense_matrix is not None:
       self.from_dense_matrix(dense_matrix)
+    else:
+      self.from_csr_arrays(*csr_arrays, column_count=column_count)
+    if self.use_numpy:
+      self._convert_to_numpy_storage()
+
+  def _convert_to_numpy_storage(self):
+    """Replace the csr lists with contiguous int64/float64 numpy arrays."""
+    self.rowStart = numpy.ascontiguousarray(self.rowStart, dtype=numpy.int64)
+    self.cols = numpy.ascontiguousarray(self.cols, dtype=numpy.int64)
+    self.vals = numpy.ascontiguousarray(self.vals, dtype=numpy.float64)
+    self._row_index_array = None
+
+  @property
+  def _row_indices(self):
+    """Row index of every stored value. Lets the kernels reduce by row.
+
+    Built on first use, so opening memory mapped storage stays zero copy.
+    """
+    if self._row_index_array is None:
+      self._row_index_array = numpy.repeat(
+          numpy.arange(self.rows, dtype=numpy.int64), numpy.diff(self.rowStart))
+    return self._row_index_array
 
   def from_dense_matrix(self, dense_matrix):
     """Construct from dense matrix.
@@ -31,17 +142,39 @@ class SparseMatrix(object):
       dense_matrix: A list of lists with only numerical entries.
     """
     # Add validation
-    self.columns = len(dense_matrix[0])
+    # An empty list is a matrix with no rows and no columns.
+    self.columns = len(dense_matrix[0]) if len(dense_matrix) else 0
     self.rows = len(dense_matrix)
     self.rowStart, self.cols, self.vals = self._get_csr_structure(
       dense_matrix=dense_matrix)
 
+  def from_csr_arrays(self, row_start, cols, vals, column_count=None):
+    """Construct from already built csr arrays without copying them.
+
+    Args:
+      row_start: A sequence of rows + 1 offsets into cols and vals.
+      cols: A sequence of the column index of each value.
+      vals: A sequence of the values.
+      column_count: The integer number of columns. Defaults to the number of
+          rows.
+    """
+    self.rows = len(row_start) - 1
+    self.columns = self.rows if column_count is None else column_count
+    if not self.use_numpy:
+      row_start, cols, vals = [
+          sequence.tolist() if hasattr(sequence, "tolist") else sequence
+          for sequence in (row_start, cols, vals)]
+    self.rowStart, self.cols, self.vals = row_start, cols, vals
+
   def from_proto(self, sparse_matrix_proto):
     """Construct from sparse matrix proto.
 
     Args:
-      sparse_matrix_proto: A sor_pb2.SparseMatrix proto.
+      sparse_matrix_proto: A sor_pb2.SparseMatrix or sor_pb2.CsrMatrix proto.
     """
+    if isinstance(sparse_matrix_proto, sor_pb2.CsrMatrix):
+      self.from_csr_proto(sparse_matrix_proto)
+      return
     validation.ValidateSparseMatrixProto(sparse_matrix_proto)
     self.columns = sparse_matrix_proto.column_count
     self.rows = sparse_matrix_proto.row_count
@@ -49,68 +182,95 @@ class SparseMatrix(object):
       sparse_matrix_proto.values)
 
 
-  def _convert_dense_matrix_to_tuple_list(self, dense_matrix):
-    """Convert a dense matrix into a list of its non 0 valued tuples.
+  def from_csr_proto(self, csr_matrix_proto):
+    """Construct from csr matrix proto with bulk copies of its arrays.
+
+    Args:
+      csr_matrix_proto: A sor_pb2.CsrMatrix proto.
+    """
+    validation.ValidateCsrMatrixProto(csr_matrix_proto)
+    self.columns = csr_matrix_proto.column_count
+    self.rows = csr_matrix_proto.row_count
+    if self.use_numpy:
+      self.rowStart = numpy.array(csr_matrix_proto.row_ptr, dtype=numpy.int64)
+      self.cols = numpy.array(csr_matrix_proto.col_index, dtype=numpy.int64)
+      self.vals = numpy.array(csr_matrix_proto.value, dtype=numpy.float64)
+    else:
+      self.rowStart = list(csr_matrix_proto.row_ptr)
+      self.cols = list(csr_matrix_proto.col_index)
+      self.vals = list(csr_matrix_proto.value)
+
+  def to_csr_proto(self, matrix_name=""):
+    """Converts to a sor_pb2.CsrMatrix proto.
+
+    Args:
+      matrix_name: The string name to give the matrix.
+    Returns:
+      A sor_pb2.CsrMatrix proto.
+    """
+    csr_matrix_proto = sor_pb2.CsrMatrix(
+        matrix_name=matrix_name, row_count=self.rows,
+        column_count=self.columns)
+    csr_matrix_proto.row_ptr.extend(numpy.asarray(self.rowStart).tolist())
+    csr_matrix_proto.col_index.extend(numpy.asarray(self.cols).tolist())
+    csr_matrix_proto.value.extend(
+        numpy.asarray(self.vals, dtype=numpy.float64).tolist())
+    return csr_matrix_proto
+
+  def _convert_dense_matrix_to_coo_lists(self, dense_matrix):
+    """Convert a dense matrix into coordinate lists of its non 0 values.
 
     Args:
       dense_matrix: A list of lists with only numerical entries.
     Returns:
-      A list of tuples of the form row index, col_index, value.
+      Three lists; the row indices, column indices and values.
     """
-    tuple_list = []
-    for i in range(len(dense_matrix)):
-      for j in range(len(dense_matrix[0])):
-        if dense_matrix[i][j] != 0:
-          tuple_list.append((i, j, dense_matrix[i][j]))
-    return tuple_list
+    row_indices = []
+    column_indices = []
+    values = []
+    for i, row in enumerate(dense_matrix):
+      for j, value in enumerate(row):
+        if value != 0:
+          row_indices.append(i)
+          column_indices.append(j)
+          values.append(value)
+    return row_indices, column_indices, values
 
-  def _convert_proto_to_tuple_list(self, sparse_value_proto):
-    """Convert a proto into a list of its non 0 valued tuples.
+  def _convert_proto_to_coo_lists(self, sparse_value_proto):
+    """Convert a stream of SparseValue protos into coordinate lists.
 
     Args:
-      sparse_value_proto: sor_pb2.SparseMatrix proto.
+      sparse_value_proto: The repeated sor_pb2.SparseValue field.
     Returns:
-      A list of tuples of the form row index, col_index, value.
+      Three lists; the row indices, column indices and values.
     """
-    tuple_list = []
+    row_indices = []
+    column_indices = []
+    values = []
     for value in sparse_value_proto:
-      tuple_list.append((value.row_index, value.column_index, value.value))
-    return tuple_list
+      row_indices.append(value.row_index)
+      column_indices.append(value.column_index)
+      values.append(value.value)
+    return row_indices, column_indices, values
 
   def _get_csr_structure(self, sparse_value_proto=None, dense_matrix=None):
     """Convert either a proto or a dense matrix into csr format
 
+    self.rows and self.columns must be set before calling this.
+
     Args:
-      sparse_value_proto: sor_pb2.SparseMatrix proto.
+      sparse_value_proto: The repeated sor_pb2.SparseValue field.
       dense_matrix: A list of lists with only numerical entries.
     Returns:
       Three lists; the rowstart, column and values in the matrix
     """
-    # Need some checking
     if sparse_value_proto is not None:
-      temp_list = self._convert_proto_to_tuple_list(sparse_value_proto)
+      coo_lists = self._convert_proto_to_coo_lists(sparse_value_proto)
     elif dense_matrix is not None:
-      temp_list = self._convert_dense_matrix_to_tuple_list(dense_matrix)
-    sorted_list = sorted(temp_list, key=lambda element: (element[0], element[1]))
-    # popping left is O(n). Better to replace with a queue.
-    row, col, val = sorted_list.pop(0)
-    rowStart = [row]
-    cols = [col]
-    vals = [val]
-    # This does not get returned. Used to keep track.
-    rows = [row]
-    for i, row in enumerate(sorted_list):
-      # need to check for empty rows and resolve them.
-      if row[0] > rows[-1]:
-        for _ in range(row[0] - rows[-1]):
-          # This is to account for potentially empty rows.
-          rowStart.append(i + 1)
-      cols.append(row[1])
-      vals.append(row[2])
-      rows.append(row[0])
-    # Add sentinel value.
-    rowStart.append(len(vals))
-    return rowStart, cols, vals
+      coo_lists = self._convert_dense_matrix_to_coo_lists(dense_matrix)
+    else:
+      raise Exception("Need to pass a proto or matrix")
+    return coo_to_csr(self.rows, self.columns, *coo_lists)
 
   def __repr__(self):
     """Change print format to print csr in dense form."""
@@ -133,6 +293,35 @@ class SparseMatrix(object):
     return self.columns == self.rows
 
 
+  def diagonal_dominance_margins(self):
+    """Computes the diagonal dominance margin of every row in O(nnz).
+
+    The margin of row i is abs(a_ii) minus the sum of abs(a_ij) over j != i.
+    The result is cached on the matrix.
+
+    Returns:
+      A list of floats, one margin per row. None if the matrix is not square.
+    """
+    if not self.is_square_matrix():
+      return None
+    if self._dominance_margins is None and self.use_numpy:
+      signed = numpy.where(self.cols == self._row_indices,
+                           numpy.abs(self.vals), -numpy.abs(self.vals))
+      self._dominance_margins = numpy.bincount(
+          self._row_indices, weights=signed, minlength=self.rows).tolist()
+    elif self._dominance_margins is None:
+      margins = [0] * self.rows
+      for i in range(self.rows):
+        margin = 0
+        for j in range(self.rowStart[i], self.rowStart[i + 1]):
+          if self.cols[j] == i:
+            margin += abs(self.vals[j])
+          else:
+            margin -= abs(self.vals[j])
+        margins[i] = margin
+      self._dominance_margins = margins
+    return self._dominance_margins
+
   def is_strictly_row_diagonally_dominant(self):
     """Checks whether matrix is diagonally dominant.
 
@@ -142,15 +331,62 @@ class SparseMatrix(object):
     if not self.is_square_matrix():
       # All diagonally dominant matrices are square
       return False
-    dense_mat = self.to_dense_matrix()
-    for i in range(len(dense_mat)):
-      abs_row_sum = 0
-      for j in range(len(dense_mat[i])):
-          if i != j:
-            abs_row_sum += abs(dense_mat[i][j])
-      if abs(dense_mat[i][i]) <= abs_row_sum:
-        return False
-    return True
+    return all(margin > 0 for margin in self.diagonal_dominance_margins())
+
+  def bandwidth(self):
+    """Returns the bandwidth, the largest abs(i - j) over the non 0 values."""
+    if self.use_numpy:
+      if not len(self.vals):
+        return 0
+      return int(numpy.abs(self._row_indices - self.cols).max())
+    bandwidth = 0
+    for i in range(self.rows):
+      for j in range(self.rowStart[i], self.rowStart[i + 1]):
+        bandwidth = max(bandwidth, abs(i - self.cols[j]))
+    return bandwidth
+
+  def is_tridiagonal(self):
+    """Checks whether matrix is square with bandwidth at most 1.
+
+    Returns:
+      Boolean of whether or not it is tridiagonal.
+    """
+    return self.is_square_matrix() and self.bandwidth() <= 1
+
+  def greedy_coloring(self):
+    """Greedily colors the rows so that rows of one color share no couplings.
+
+    Rows i and j are coupled if a_ij or a_ji is non zero. Rows are visited in
+    order and each takes the smallest color not used by a coupled row, so a
+    tridiagonal matrix gets two colors.
+
+    Returns:
+      A list with the integer color of every row.
+    Raises:
+      NonConformableException if the matrix is not square.
+    """
+    if not self.is_square_matrix():
+      raise NonConformableException("Only square matrices can be colored")
+    row_start = numpy.asarray(self.rowStart).tolist()
+    cols = numpy.asarray(self.cols).tolist()
+    row_indices = []
+    for i in range(self.rows):
+      row_indices.extend([i] * (row_start[i + 1] - row_start[i]))
+    # The transpose gives the rows coupled to row i through column i.
+    transpose_start, transpose_cols, _ = coo_to_csr(
+        self.columns, self.rows, cols, row_indices, row_indices)
+    colors = [-1] * self.rows
+    for i in range(self.rows):
+      used = set()
+      for j in range(row_start[i], row_start[i + 1]):
+        used.add(colors[cols[j]])
+      for j in range(transpose_start[i], transpose_start[i + 1]):
+        used.add(colors[transpose_cols[j]])
+      color = 0
+      while color in used:
+        color += 1
+      colors[i] = color
+    return colors
 
   def multiply_by_vector(self, vector_object):
     """Multiply this matrix by the target vector
@@ -159,7 +395,7 @@ class SparseMatrix(object):
         vector_object: A vector.Vector object.i
 
       Returns:
-        a list of numbers.
+        a list of numbers, or a numpy.ndarray when using numpy storage.
 
       Raises:
         NonConformableException if the matrix and vector are non
@@ -169,11 +405,16 @@ class SparseMatrix(object):
       raise Exception("Can only multiply by a vector")
     if not self.is_conformable(vector_object):
       raise NonConformableException("")
+    if self.use_numpy:
+      x = numpy.asarray(vector_object, dtype=numpy.float64)
+      return numpy.bincount(self._row_indices, weights=self.vals * x[self.cols],
+                            minlength=self.rows)
     # New empty 0 vector
     new_vec = [0] * self.rows
+    values = vector_object.buffer
     for i in range(self.rows):
       for j in range(self.rowStart[i], self.rowStart[i + 1]):
-          new_vec[i] += self.vals[j] * vector_object.values[self.cols[j]]
+          new_vec[i] += self.vals[j] * values[self.cols[j]]
     return new_vec
 
   def is_conformable(self, vector_object):
@@ -193,6 +434,11 @@ class SparseMatrix(object):
 
   def one_norm(self):
     """Returns the matrix one norm. The maximum column sum."""
+    if self.use_numpy:
+      if not len(self.vals):
+        return 0
+      return numpy.bincount(
+          self.cols, weights=numpy.abs(self.vals), minlength=self.columns).max()
     one_norm = 0
     col_totals = {}
     for i, col in enumerate(self.cols):
@@ -204,6 +450,12 @@ class SparseMatrix(object):
 
   def infinity_norm(self):
     """Returns the matrix infinity norm. The maximum row sum."""
+    if self.use_numpy:
+      if not len(self.vals):
+        return 0
+      return numpy.bincount(
+          self._row_indices, weights=numpy.abs(self.vals),
+          minlength=self.rows).max()
     infinity_norm = 0
     for i in range(self.rows):
       row_sum = 0
@@ -1,5 +1,6 @@
 #! /usr/bin/python3
 """Unit tests associated with sparse_matrix.py."""
+import numpy
 import sparse_matrix
 import vector
 from proto_genfiles.protos import sor_pb2
@@ -28,6 +29,20 @@ class SparseMatrixTest(unittest.TestCase):
     self.assertEqual([0, 1, 2], matrix_a.cols)
     self.assertEqual([3.9, 7.8, 11.7], matrix_a.vals)
 
+  def testSparseMatrix_CsrProtoRoundTrip(self):
+    dense = [[1, 0, 2],
+             [0, 0, 0],
+             [3, 4, 0]]
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=dense)
+    csr_matrix_proto = matrix_a.to_csr_proto("a")
+    self.assertEqual([0, 2, 2, 4], list(csr_matrix_proto.row_ptr))
+
+    for use_numpy in (False, True):
+      matrix_b = sparse_matrix.SparseMatrix(csr_matrix_proto,
+                                            use_numpy=use_numpy)
+      self.assertEqual(3, matrix_b.columns)
+      self.assertEqual(dense, matrix_b.to_dense_matrix())
+
   def testSparseMatrix_FromDenseMatrix(self):
     matrix_a_proto = sor_pb2.SparseMatrix(
         matrix_name="a", row_count=3, column_count=3)
@@ -61,6 +76,76 @@ class SparseMatrixTest(unittest.TestCase):
     self.assertEqual([1, 1], matrix_a.vals)
     self.assertEqual(expected, matrix_a.to_dense_matrix())
 
+  def testSparseMatrix_LeadingAndTrailingEmptyRows(self):
+    expected = [[0, 0, 0],
+                [0, 2, 0],
+                [0, 0, 0]]
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=expected)
+
+    self.assertEqual([0, 0, 1, 1], matrix_a.rowStart)
+    self.assertEqual([1], matrix_a.cols)
+    self.assertEqual([2], matrix_a.vals)
+    self.assertEqual(expected, matrix_a.to_dense_matrix())
+
+  def testSparseMatrix_EmptyDenseMatrix(self):
+    for use_numpy in (False, True):
+      matrix_a = sparse_matrix.SparseMatrix(dense_matrix=[],
+                                            use_numpy=use_numpy)
+
+      self.assertEqual(0, matrix_a.rows)
+      self.assertEqual(0, matrix_a.columns)
+      self.assertEqual([0], list(matrix_a.rowStart))
+      self.assertEqual([], list(matrix_a.cols))
+      self.assertEqual([], list(matrix_a.vals))
+      self.assertEqual([], matrix_a.to_dense_matrix())
+
+  def testSparseMatrix_FromUnsortedProto(self):
+    matrix_a_proto = sor_pb2.SparseMatrix(
+        matrix_name="a", row_count=4, column_count=3)
+    for row, col, val in [(2, 2, 5.0), (1, 2, 3.0), (2, 0, 4.0), (1, 0, 2.0)]:
+      value = matrix_a_proto.values.add()
+      value.row_index = row
+      value.column_index = col
+      value.value = val
+
+    matrix_a = sparse_matrix.SparseMatrix(matrix_a_proto)
+
+    self.assertEqual([0, 0, 2, 4, 4], matrix_a.rowStart)
+    self.assertEqual([0, 2, 0, 2], matrix_a.cols)
+    self.assertEqual([2.0, 3.0, 4.0, 5.0], matrix_a.vals)
+
+  def testSparseMatrix_FromCsrArrays(self):
+    matrix_a = sparse_matrix.SparseMatrix(
+        csr_arrays=([0, 1, 1, 3], [2, 0, 3], [5, 6, 7]), column_count=4)
+    self.assertEqual([[0, 0, 5, 0], [0, 0, 0, 0], [6, 0, 0, 7]],
+                     matrix_a.to_dense_matrix())
+
+    numpy_matrix = sparse_matrix.SparseMatrix(
+        csr_arrays=(numpy.array([0, 1, 2]), numpy.array([1, 0]),
+                    numpy.array([2.0, 3.0])), use_numpy=True)
+    self.assertEqual(2, numpy_matrix.columns)
+    self.assertEqual([2.0, 3.0], numpy_matrix.multiply_by_vector(
+        vector.Vector(number_list=[1, 1])).tolist())
+
+  def testSparseMatrix_MultipleSources(self):
+    self.assertRaises(Exception, sparse_matrix.SparseMatrix,
+                      dense_matrix=[[1]], csr_arrays=([0, 1], [0], [1]))
+    self.assertRaises(Exception, sparse_matrix.SparseMatrix)
+
+  def testCooToCsr(self):
+    rowStart, cols, vals = sparse_matrix.coo_to_csr(
+        3, 3, [2, 0, 2, 0], [1, 2, 0, 0], [6, 2, 5, 1])
+    self.assertEqual([0, 2, 2, 4], rowStart)
+    self.assertEqual([0, 2, 0, 1], cols)
+    self.assertEqual([1, 2, 5, 6], vals)
+
+  def testCooToCsrArrays(self):
+    rowStart, cols, vals = sparse_matrix.coo_to_csr_arrays(
+        4, 3, [2, 0, 2, 0], [1, 2, 0, 0], [6, 2, 5, 1])
+    self.assertEqual([0, 2, 2, 4, 4], rowStart.tolist())
+    self.assertEqual([0, 2, 0, 1], cols.tolist())
+    self.assertEqual([1.0, 2.0, 5.0, 6.0], vals.tolist())
+
   def testsparsematrix_bigsquarematrix(self):
     expected = [[9.1, 0, 0, 0, 1],
                 [0, 0, 1, 0, 0],
@@ -134,6 +219,65 @@ class SparseMatrixTest(unittest.TestCase):
     matrix_a = sparse_matrix.SparseMatrix(dense_matrix=non_square_mat)
     self.assertFalse(matrix_a.is_strictly_row_diagonally_dominant())
 
+  def testSparseMatrixDiagonalDominanceMargins(self):
+    mat = [[8, 1, -10],
+           [2, 9, -3],
+           [0, 0, 0]]
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=mat)
+    self.assertEqual([-3, 4, 0], matrix_a.diagonal_dominance_margins())
+    # The margins are cached on the matrix.
+    self.assertIs(matrix_a.diagonal_dominance_margins(),
+                  matrix_a.diagonal_dominance_margins())
+    numpy_matrix = sparse_matrix.SparseMatrix(dense_matrix=mat, use_numpy=True)
+    self.assertEqual([-3, 4, 0], numpy_matrix.diagonal_dominance_margins())
+
+  def testSparseMatrixDiagonalDominanceMargins_NonSquare(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=[[8, 1, -1, 1]])
+    self.assertIsNone(matrix_a.diagonal_dominance_margins())
+
+  def testSparseMatrixBandwidth(self):
+    tridiagonal = [[4, 1, 0],
+                   [1, 4, 1],
+                   [0, 1, 4]]
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=tridiagonal)
+    self.assertEqual(1, matrix_a.bandwidth())
+    self.assertTrue(matrix_a.is_tridiagonal())
+    numpy_matrix = sparse_matrix.SparseMatrix(
+        dense_matrix=tridiagonal, use_numpy=True)
+    self.assertEqual(1, numpy_matrix.bandwidth())
+
+    wide = [[4, 0, 1],
+            [0, 4, 0],
+            [0, 0, 4]]
+    matrix_b = sparse_matrix.SparseMatrix(dense_matrix=wide)
+    self.assertEqual(2, matrix_b.bandwidth())
+    self.assertFalse(matrix_b.is_tridiagonal())
+
+  def testSparseMatrixGreedyColoring_Tridiagonal(self):
+    tridiagonal = [[4, 1, 0, 0],
+                   [1, 4, 1, 0],
+                   [0, 1, 4, 1],
+                   [0, 0, 1, 4]]
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=tridiagonal)
+    self.assertEqual([0, 1, 0, 1], matrix_a.greedy_coloring())
+
+  def testSparseMatrixGreedyColoring_NoCouplingWithinColor(self):
+    mat = [[7, 1, 0, 3, 0],
+           [0, -7, 1, 0, 0],
+           [1, 0, 8, 2, 0],
+           [1, 0, 0, 7, 2],
+           [-1, 0, -1, 0, 9]]
+    colors = sparse_matrix.SparseMatrix(dense_matrix=mat).greedy_coloring()
+    for i in range(5):
+      for j in range(5):
+        if i != j and mat[i][j] != 0:
+          self.assertNotEqual(colors[i], colors[j])
+
+  def testSparseMatrixGreedyColoring_NonSquare(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=[[8, 1, -1, 1]])
+    self.assertRaises(sparse_matrix.NonConformableException,
+                      matrix_a.greedy_coloring)
+
   def testSparseMatrixMultiplyByVectorSquareMatrix(self):
     square_mat = [[8, 1, -1],
                   [2, 9, -3],
@@ -167,5 +311,33 @@ class SparseMatrixTest(unittest.TestCase):
 
     self.assertEqual(10.1, matrix_a.infinity_norm())
 
+  def testSparseMatrix_NumpyStorage(self):
+    dense = [[9.1, 0, 0, 0, 1],
+             [0, 0, 1, 0, 0],
+             [0, 0, 0, 0, 0],
+             [0, 0, 1, 0, 0],
+             [6, 1, 1, 1, 1]]
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=dense, use_numpy=True)
+
+    self.assertEqual(numpy.int64, matrix_a.rowStart.dtype)
+    self.assertEqual(numpy.int64, matrix_a.cols.dtype)
+    self.assertEqual(numpy.float64, matrix_a.vals.dtype)
+    self.assertEqual(dense, matrix_a.to_dense_matrix())
+
+  def testSparseMatrix_NumpyStorageMatchesListStorage(self):
+    non_square_mat = [[8, 1, -1, 1],
+                      [2, 9, -3, 1],
+                      [0, 0, 0, 0],
+                      [1, -8, 10, 1]]
+    list_matrix = sparse_matrix.SparseMatrix(dense_matrix=non_square_mat)
+    numpy_matrix = sparse_matrix.SparseMatrix(
+        dense_matrix=non_square_mat, use_numpy=True)
+    vector_b = vector.Vector(number_list=[1, 2, 3, 4])
+
+    self.assertEqual(list_matrix.multiply_by_vector(vector_b),
+                     numpy_matrix.multiply_by_vector(vector_b).tolist())
+    self.assertEqual(list_matrix.one_norm(), numpy_matrix.one_norm())
+    self.assertEqual(list_matrix.infinity_norm(), numpy_matrix.infinity_norm())
+
 if __name__ == '__main__':
   unittest.main()
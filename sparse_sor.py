@@ -1,23 +1,57 @@
 """Docstring"""
+import numpy
+import result_cache
 import sparse_matrix
+import time
 import vector
 from proto_genfiles.protos import sor_pb2
 
+# Orders in which the rows of x are relaxed.
+NATURAL_ORDERING = "natural"
+MULTICOLOR_ORDERING = "multicolor"
+
 
 class SorSolverInputException(Exception):
   """An exception for when the inputs are not compatible."""
 
+
+def _as_list(values):
+  """Returns a plain list for either a list or a numpy array."""
+  if hasattr(values, "tolist"):
+    return values.tolist()
+  return values
+
+
 class SparseSorSolver(object):
-  def __init__(self, matrix, vector, maxits=10, e=.01, w=1.0, debug=False):
+  def __init__(self, matrix, vector=None, maxits=10, e=.01, w=1.0,
+               debug=False, initial_guess=None, fused=False,
+               residual_check_interval=1, ordering=NATURAL_ORDERING,
+               cache=None):
     """Initialize Sparse SOR Solver
 
+    The one time setup for the matrix happens here. If a vector is passed it
+    is solved immediately, otherwise call solve() for each right hand side.
+
     Args:
       matrix: A sparse_matrix.Matrix. This needs to be diagonally dominant.
-      vector: A vector.Vector
+      vector: An optional vector.Vector
       maxits: The maximum number of iterations to run before stopping.
       e: float tolerance.
       w: float relaxation rate.
       debug: boolean whether to print extra useful debugging messages.
+      initial_guess: An optional list of numbers to start iterating from when
+          a vector is passed. Defaults to 0.
+      fused: boolean whether to accumulate the x sequence difference inside
+          the sweep instead of copying x and making a second pass.
+      residual_check_interval: Only compute the residual for the convergence
+          check every this many iterations.
+      ordering: NATURAL_ORDERING to relax rows one by one, or
+          MULTICOLOR_ORDERING to relax each color class of uncoupled rows
+          as one batched array operation.
+      cache: An optional result_cache.SorResultCache. Solves already in the
+          cache return the stored result without iterating.
+    Raises:
+      SorSolverInputException if the ordering is unknown.
     """
     self.debug = debug
     # Need to perform checks here.
@@ -25,28 +59,148 @@ class SparseSorSolver(object):
       # This is also checking for zero on diagonal.
       print("Warning input matrix is not strictly diagonally dominant. "
             "Convergence may not occur")
-    if not matrix.rows == vector.length:
-      print("Matrix rows: %s" % matrix.rows)
-      print("Vector length: %s" % vector.length)
-      raise SorSolverInputException(
-          "Lengths are not conformable Ax = b hence number of rows in A must "
-          "equal number of rows in b")
+      margins = matrix.diagonal_dominance_margins()
+      if margins is not None:
+        worst_row = min(range(len(margins)), key=margins.__getitem__)
+        print("Smallest dominance margin: %s in row %s" %
+              (margins[worst_row], worst_row))
     self.A = matrix
-    self.b = vector
     self.maxits = maxits
     self.tolerance = e
     self.relaxation_rate = w
+    self.fused = fused
+    self.residual_check_interval = residual_check_interval
 
     self.machine_epsilon = 2 ** -52
+    self._split_diagonal()
+    self._numpy_split_arrays = None
+    if ordering == MULTICOLOR_ORDERING:
+      self._setup_color_classes()
+    elif ordering != NATURAL_ORDERING:
+      raise SorSolverInputException("Unknown ordering: %s" % ordering)
+    self.ordering = ordering
+    self.sweep_times = []
+    self.cache = cache
+    self._matrix_digest = None
+
+    self.b = None
+    self.iteration = 0
+    self.stopping_reason = sor_pb2.SorReturnValue.UNKNOWN
+    self.x = None
+    self.x_old = None
+    if vector is not None:
+      self.solve(vector, initial_guess)
+
+  def _split_diagonal(self):
+    """Splits A into its diagonal and its off diagonal csr entries."""
+    row_start = _as_list(self.A.rowStart)
+    cols = _as_list(self.A.cols)
+    vals = _as_list(self.A.vals)
+    self.diagonal = [0] * self.A.rows
+    self.off_diagonal_row_start = [0]
+    self.off_diagonal_cols = []
+    self.off_diagonal_vals = []
+    for i in range(self.A.rows):
+      for j in range(row_start[i], row_start[i + 1]):
+        if cols[j] == i:
+          self.diagonal[i] = vals[j]
+        else:
+          self.off_diagonal_cols.append(cols[j])
+          self.off_diagonal_vals.append(vals[j])
+      self.off_diagonal_row_start.append(len(self.off_diagonal_cols))
+
+  def _numpy_split(self):
+    """Returns the diagonal split of A as numpy arrays.
 
-    # Fill out
+    Returns:
+      A tuple of the diagonal and the row index, column index and value of
+      every off diagonal entry. Built once and cached.
+    """
+    if self._numpy_split_arrays is None:
+      self._numpy_split_arrays = (
+          numpy.array(self.diagonal, dtype=numpy.float64),
+          numpy.repeat(numpy.arange(self.A.rows, dtype=numpy.int64),
+                       numpy.diff(self.off_diagonal_row_start)),
+          numpy.array(self.off_diagonal_cols, dtype=numpy.int64),
+          numpy.array(self.off_diagonal_vals, dtype=numpy.float64))
+    return self._numpy_split_arrays
+
+  def _setup_color_classes(self):
+    """Colors A and splits the off diagonal entries by row color.
+
+    Rows of one color do not couple, so each color class can be relaxed as a
+    single array operation.
+    """
+    self.coloring = self.A.greedy_coloring()
+    self.color_count = max(self.coloring) + 1 if self.coloring else 0
+    colors = numpy.array(self.coloring, dtype=numpy.int64)
+    (diagonal, off_diagonal_rows, off_diagonal_cols,
+     off_diagonal_vals) = self._numpy_split()
+    local_index = numpy.zeros(self.A.rows, dtype=numpy.int64)
+    self._color_classes = []
+    for color in range(self.color_count):
+      rows = numpy.flatnonzero(colors == color)
+      local_index[rows] = numpy.arange(len(rows))
+      in_class = colors[off_diagonal_rows] == color
+      self._color_classes.append((
+          rows, diagonal[rows], local_index[off_diagonal_rows[in_class]],
+          off_diagonal_cols[in_class], off_diagonal_vals[in_class]))
+
+  def solve(self, vector, x0=None):
+    """Solve Ax = b for a new right hand side reusing the matrix setup.
+
+    Args:
+      vector: A vector.Vector b.
+      x0: An optional list of numbers to start iterating from. Defaults to 0.
+
+    Returns:
+      A sor_pb2.SorReturnValue proto of the solution.
+
+    Raises:
+      SorSolverInputException if b or x0 are not conformable with A.
+    """
+    if not self.A.rows == vector.length:
+      print("Matrix rows: %s" % self.A.rows)
+      print("Vector length: %s" % vector.length)
+      raise SorSolverInputException(
+          "Lengths are not conformable Ax = b hence number of rows in A must "
+          "equal number of rows in b")
+    if x0 is not None and len(x0) != vector.length:
+      raise SorSolverInputException(
+          "Initial guess x0 must have the same length as b")
+    self.b = vector
     self.iteration = 0
     self.stopping_reason = sor_pb2.SorReturnValue.UNKNOWN
-    self.x = [0] * self.b.length
+    self.x = [0] * self.b.length if x0 is None else list(x0)
     self.x_old = None
     self.total_old = float("inf")
     self.x_growth_count = 0
+    self.sweep_times = []
+    if self.cache is None:
+      self.sparse_sor()
+      return self.to_proto()
+    key = self._cache_key(x0)
+    cached = self.cache.get(key)
+    if cached is not None:
+      self.x = list(cached.vector.values)
+      self.stopping_reason = cached.stopping_reason
+      self.iteration = cached.stopping_iteration
+      return cached
     self.sparse_sor()
+    result = self.to_proto()
+    self.cache.put(key, result)
+    return result
+
+  def _cache_key(self, x0):
+    """Returns the result cache key for solving with self.b from x0."""
+    if self._matrix_digest is None:
+      self._matrix_digest = result_cache.matrix_digest(self.A)
+    # Everything that can change the result. The orderings and the fused
+    # sweep can round differently, so they get separate entries.
+    parameters = (self.maxits, self.tolerance, self.relaxation_rate,
+                  self.fused, self.residual_check_interval, self.ordering)
+    return result_cache.solve_key(
+        self._matrix_digest, self.b.buffer, x0, parameters)
 
   def __repr__(self):
     """Change default object print format"""
@@ -69,40 +223,207 @@ class SparseSorSolver(object):
         "OUTPUT_X": self.x,
         "RESIDUAL": self.compute_absolute_residual_sum()}
 
+  def solve_batch(self, right_hand_sides, x0=None):
+    """Solve Ax = b for a block of right hand sides in the same sweeps.
+
+    Every column of the block is relaxed together, so each row of A is
+    loaded once per sweep rather than once per right hand side. Columns stop
+    independently, with the same convergence checks as solve().
+
+    Args:
+      right_hand_sides: A 2-D array like of shape (rows of A, number of
+          right hand sides). Each column is one b.
+      x0: An optional array like of the same shape to start iterating from.
+          Defaults to 0.
+
+    Returns:
+      A list of sor_pb2.SorReturnValue protos, one per column.
+
+    Raises:
+      SorSolverInputException if the block or x0 are not conformable with A.
+    """
+    b = numpy.array(right_hand_sides, dtype=numpy.float64)
+    if b.ndim != 2 or b.shape[0] != self.A.rows:
+      raise SorSolverInputException(
+          "Right hand sides must be a 2-D block with one row per row in A")
+    if x0 is None:
+      x = numpy.zeros(b.shape)
+    else:
+      x = numpy.array(x0, dtype=numpy.float64)
+      if x.shape != b.shape:
+        raise SorSolverInputException(
+            "Initial guess x0 must have the same shape as the right hand sides")
+    columns = b.shape[1]
+    diagonal, off_diagonal_rows, off_diagonal_cols, off_diagonal_vals = (
+        self._numpy_split())
+    stopping_reasons = [sor_pb2.SorReturnValue.UNKNOWN] * columns
+    stopping_iterations = [0] * columns
+    if not diagonal.all():
+      print("Error Zero on diagonal. Computation terminated.")
+      stopping_reasons = [sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL] * columns
+      return self._batch_to_protos(x, stopping_reasons, stopping_iterations)
+
+    active = numpy.arange(columns)
+    total_old = numpy.full(columns, float("inf"))
+    x_growth_count = numpy.zeros(columns, dtype=numpy.int64)
+    iteration = 0
+    while len(active) and iteration < self.maxits:
+      x_active = x[:, active]
+      b_active = b[:, active]
+      x_total = numpy.zeros(len(active))
+      for i in range(self.A.rows):
+        start = self.off_diagonal_row_start[i]
+        end = self.off_diagonal_row_start[i + 1]
+        sums = off_diagonal_vals[start:end].dot(
+            x_active[off_diagonal_cols[start:end]])
+        adjustment = self.relaxation_rate * (
+            (b_active[i] - sums) / diagonal[i] - x_active[i])
+        x_active[i] += adjustment
+        x_total += numpy.abs(adjustment)
+      x[:, active] = x_active
+      iteration += 1
+
+      # The same checks as is_converged, applied to every active column.
+      grew = x_total > total_old[active]
+      x_growth_count[active] = numpy.where(
+          grew, x_growth_count[active] + 1, 0)
+      diverged = x_growth_count[active] > 5
+      x_converged = ~diverged & (
+          x_total <= self.calculate_stopping_threshold(x_total))
+      residual_converged = numpy.zeros(len(active), dtype=bool)
+      if iteration % self.residual_check_interval == 0:
+        estimate = diagonal[:, None] * x_active
+        for column in range(len(active)):
+          estimate[:, column] += numpy.bincount(
+              off_diagonal_rows,
+              weights=off_diagonal_vals * x_active[off_diagonal_cols, column],
+              minlength=self.A.rows)
+        residual_converged = ~diverged & ~x_converged & (
+            numpy.abs(b_active - estimate).sum(axis=0) <=
+            self.calculate_stopping_threshold(1))
+      for checks, reason in (
+          (diverged, sor_pb2.SorReturnValue.X_SEQUENCE_DIVERGENCE),
+          (x_converged, sor_pb2.SorReturnValue.X_SEQUENCE_CONVERGENCE),
+          (residual_converged, sor_pb2.SorReturnValue.RESIDUAL_CONVERGENCE)):
+        for column in active[checks]:
+          stopping_reasons[column] = reason
+          stopping_iterations[column] = iteration
+      total_old[active] = x_total
+      active = active[~(diverged | x_converged | residual_converged)]
+    for column in active:
+      stopping_iterations[column] = iteration
+    for column in range(columns):
+      if stopping_iterations[column] >= self.maxits:
+        stopping_reasons[column] = (
+            sor_pb2.SorReturnValue.MAX_ITERATIONS_REACHED)
+    return self._batch_to_protos(x, stopping_reasons, stopping_iterations)
+
+  def _batch_to_protos(self, x, stopping_reasons, stopping_iterations):
+    """Converts the columns of a batch solve into SorReturnValue protos."""
+    return [sor_pb2.SorReturnValue(
+        result_name="x", stopping_reason=stopping_reasons[column],
+        vector=vector.Vector(
+            name="x", number_list=x[:, column].tolist()).to_proto(),
+        stopping_iteration=stopping_iterations[column])
+            for column in range(x.shape[1])]
+
   def sparse_sor(self):
     """Compute the sparse sor solution for Ax = b.
 
     Returns:
       A list of numeric values and a termination reason.
     """
-    while not self.is_converged() and self.iteration < self.maxits:
-      self.x_old = self.x[:]
-      for i in range(self.b.length):
-        # This needs revision see chapter 4 slide 92.
-        sum = 0
-        d = 0
-        for j in range(self.A.rowStart[i], self.A.rowStart[i + 1]):
-          if self.A.cols[j] != i:
-            sum = sum + self.A.vals[j] * self.x[self.A.cols[j]]
-          else:
-            d = self.A.vals[j]
-        try:
-          adjustment = self.relaxation_rate * (
-                    (self.b.values[i] - sum) / d - self.x[i])
-        except ZeroDivisionError:
-          print("Error Zero on diagonal. Computation terminated.")
-          self.stopping_reason = (
-            sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL)
-          return
-        if self.debug:
-          print ("row = %s, x = %s, b = %s, sum = %s, d = %s adjustment = %s" %
-                 (i, self.x[i], self.b.values[i], sum, d, adjustment))
-        self.x[i] = (self.x[i] + adjustment)
-      self.iteration += 1
+    if self.ordering == MULTICOLOR_ORDERING:
+      sweep = self._multicolor_sweep
+      # x stays a numpy array while iterating. It is converted back to a
+      # list once, when the solve finishes.
+      self.x = numpy.array(self.x, dtype=numpy.float64)
+      self._b_array = numpy.asarray(self.b, dtype=numpy.float64)
+    else:
+      sweep = self._relaxation_sweep
+    try:
+      if self.fused or self.ordering == MULTICOLOR_ORDERING:
+        while self.iteration < self.maxits:
+          x_total = self._timed_sweep(sweep)
+          if x_total is None:
+            return
+          self.iteration += 1
+          if self.is_converged(x_total):
+            break
+      else:
+        while not self.is_converged() and self.iteration < self.maxits:
+          self.x_old = self.x[:]
+          if self._timed_sweep(sweep) is None:
+            return
+          self.iteration += 1
+    finally:
+      self.x = _as_list(self.x)
     if self.iteration >= self.maxits:
       self.stopping_reason = (
           sor_pb2.SorReturnValue.MAX_ITERATIONS_REACHED)
 
+  def _timed_sweep(self, sweep):
+    """Runs one sweep and records its wall clock time in self.sweep_times."""
+    start = time.perf_counter()
+    x_total = sweep()
+    self.sweep_times.append(time.perf_counter() - start)
+    return x_total
+
+  def _multicolor_sweep(self):
+    """Relax x one color class at a time using array operations.
+
+    Returns:
+      The float sum of the absolute changes made to x, or None if a zero on
+      the diagonal terminated the computation.
+    """
+    x = self.x
+    x_total = 0.0
+    for rows, diagonal, local_rows, cols, vals in self._color_classes:
+      if not diagonal.all():
+        print("Error Zero on diagonal. Computation terminated.")
+        self.stopping_reason = (
+          sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL)
+        return None
+      sums = numpy.bincount(local_rows, weights=vals * x[cols],
+                            minlength=len(rows))
+      adjustment = self.relaxation_rate * (
+          (self._b_array[rows] - sums) / diagonal - x[rows])
+      x[rows] += adjustment
+      x_total += numpy.abs(adjustment).sum()
+    return float(x_total)
+
+  def _relaxation_sweep(self):
+    """Relax every row of x once in place.
+
+    Returns:
+      The float sum of the absolute changes made to x, or None if a zero on
+      the diagonal terminated the computation.
+    """
+    x = self.x
+    b = self.b.buffer
+    x_total = 0
+    for i in range(self.b.length):
+      # This needs revision see chapter 4 slide 92.
+      sum = 0
+      for j in range(self.off_diagonal_row_start[i],
+                     self.off_diagonal_row_start[i + 1]):
+        sum = sum + self.off_diagonal_vals[j] * x[self.off_diagonal_cols[j]]
+      d = self.diagonal[i]
+      try:
+        adjustment = self.relaxation_rate * (
+                  (b[i] - sum) / d - x[i])
+      except ZeroDivisionError:
+        print("Error Zero on diagonal. Computation terminated.")
+        self.stopping_reason = (
+          sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL)
+        return None
+      if self.debug:
+        print ("row = %s, x = %s, b = %s, sum = %s, d = %s adjustment = %s" %
+               (i, x[i], b[i], sum, d, adjustment))
+      x[i] = (x[i] + adjustment)
+      x_total += abs(adjustment)
+    return x_total
+
   def compute_absolute_residual_sum(self):
     """Compute the sum of the absolute deviations from Ax from b.
 
@@ -110,9 +431,10 @@ class SparseSorSolver(object):
       A float the total of the absolute residuals.
     """
     estimate = self.A.multiply_by_vector(vector.Vector(number_list=self.x))
+    b = self.b.buffer
     residual_total = 0
     for i in range(len(estimate)):
-      residual_total += abs(self.b.values[i] - estimate[i])
+      residual_total += abs(b[i] - estimate[i])
     return residual_total
 
   def compute_absolute_x_sequence_difference_sum(self):
@@ -126,17 +448,22 @@ class SparseSorSolver(object):
     """Calculate the stopping threshold for a given value."""
     return self.tolerance + 4.0 * self.machine_epsilon * abs(value)
 
-  def is_converged(self):
+  def is_converged(self, x_total=None):
     """Performs a series of convergence checks.
 
     Updates the self.stopping_reason variable if necessary
 
+    Args:
+      x_total: The float sum of absolute x changes in the last sweep if it was
+          already accumulated. Computed from self.x_old otherwise.
+
     Returns:
       boolean whether we should stop.
     """
-    if self.x_old is None:
-      return False
-    x_total = self.compute_absolute_x_sequence_difference_sum()
+    if x_total is None:
+      if self.x_old is None:
+        return False
+      x_total = self.compute_absolute_x_sequence_difference_sum()
     if self.debug:
       print("x_total = %s, x_old = %s" % (x_total, self.total_old))
     if x_total > self.total_old:
@@ -154,7 +481,8 @@ class SparseSorSolver(object):
           sor_pb2.SorReturnValue.X_SEQUENCE_CONVERGENCE)
       return True
     residual_threshold = self.calculate_stopping_threshold(1)
-    if self.compute_absolute_residual_sum() <= residual_threshold:
+    if (self.iteration % self.residual_check_interval == 0 and
+        self.compute_absolute_residual_sum() <= residual_threshold):
       self.stopping_reason = (
           sor_pb2.SorReturnValue.RESIDUAL_CONVERGENCE)
       return True
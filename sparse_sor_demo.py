@@ -1,30 +1,280 @@
 #! /usr/bin/python3
-"""End to end demonstration script for sparse_sor."""
+"""End to end demonstration script for sparse_sor.
+
+Solves one input file, or with --batch every input in a directory or glob
+across a pool of worker processes, e.g.
+
+  python3 sparse_sor_demo.py --batch 'inputs/*.in' --output-dir outputs
+"""
+import argparse
+import collections
+import concurrent.futures
+import csr_file
 import data_io
+import glob
+import os
+import result_cache
 import vector
 import sparse_sor
 import sparse_matrix
-from proto_genfiles.protos import sor_pb2
 import sys
+import time
+from proto_genfiles.protos import sor_pb2
+
+DEFAULT_INPUT_FILENAME = "nas_Sor.in"
+DEFAULT_OUTPUT_FILENAME = "nas_Sor.out"
+# Files picked up when --batch names a directory.
+INPUT_EXTENSIONS = (".in", ".mtx", ".csr") + data_io.BINARY_EXTENSIONS
+OUTPUT_EXTENSION = ".out"
+# Solver parameters used for every solve.
+MAXITS = 10
+TOLERANCE = .0001
+RELAXATION_RATE = 1.0
+
+# Outcome of solving one file in batch mode. stopping_reason is the
+# StoppingReason name, or None when error holds the failure message.
+BatchResult = collections.namedtuple(
+    "BatchResult", ["input_filename", "output_filename", "stopping_reason",
+                    "iterations", "seconds", "error"])
+
+
+class BatchOutputError(Exception):
+  """Exception for when batch outputs would overwrite inputs or each other."""
+
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(
+      description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument(
+      "input_filename", nargs="?", default=None,
+      help="Defaults to %s." % DEFAULT_INPUT_FILENAME)
+  parser.add_argument(
+      "output_filename", nargs="?", default=None,
+      help="Defaults to %s." % DEFAULT_OUTPUT_FILENAME)
+  parser.add_argument(
+      "rhs_filename", nargs="?", default=None,
+      help="Matrix Market b for .mtx and .csr inputs. Defaults to A times "
+      "a vector of ones.")
+  parser.add_argument(
+      "--cache-dir", default=None,
+      help="Directory of a result cache. Identical solves are read back "
+      "from it instead of being recomputed.")
+  parser.add_argument(
+      "--cache-max-mb", type=float,
+      default=result_cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+      help="Size bound of the result cache in megabytes.")
+  parser.add_argument(
+      "--batch", default=None,
+      help="Directory or glob of input files to solve instead of a single "
+      "input. Matrix Market and csr inputs use b = A times ones.")
+  parser.add_argument(
+      "--output-dir", default=None,
+      help="Directory for batch outputs. Defaults to next to each input.")
+  parser.add_argument(
+      "--workers", type=int, default=os.cpu_count(),
+      help="Number of worker processes in batch mode.")
+  args = parser.parse_args(argv)
+  if args.batch is not None:
+    if args.input_filename is not None:
+      parser.error("--batch replaces the input and output file arguments")
+    if args.workers < 1:
+      parser.error("--workers must be at least 1")
+    return args
+  if args.input_filename is None:
+    args.input_filename = DEFAULT_INPUT_FILENAME
+  if args.output_filename is None:
+    args.output_filename = DEFAULT_OUTPUT_FILENAME
+  if args.rhs_filename and not args.input_filename.endswith((".mtx", ".csr")):
+    parser.error("A right hand side file needs a .mtx or .csr input")
+  return args
+
+
+def read_problem(input_filename, rhs_filename=None):
+  """Returns the sparse_matrix.SparseMatrix A and vector.Vector b to solve."""
+  if input_filename.endswith((".mtx", ".csr")):
+    # Matrix Market and csr files hold only A. b is read from its own .mtx
+    # file, or defaults to A times a vector of ones so the solution is known.
+    if input_filename.endswith(".csr"):
+      # Verifying reads the whole file once, but a corrupt matrix would
+      # otherwise be solved without any error.
+      matrix_a = csr_file.open_csr_file(input_filename, verify=True)
+    else:
+      matrix_a = data_io.read_matrix_market(input_filename, use_numpy=True)
+    if rhs_filename:
+      vector_b = vector.Vector(
+          vector_proto=data_io.read_matrix_market_vector(rhs_filename))
+    else:
+      vector_b = vector.Vector(
+          name="b", number_list=matrix_a.multiply_by_vector(
+              vector.Vector(number_list=[1.0] * matrix_a.columns)))
+  else:
+    matrix_proto, vector_proto = data_io.read_input(input_filename)
+    matrix_a = sparse_matrix.SparseMatrix(matrix_proto)
+    vector_b = vector.Vector(vector_proto=vector_proto)
+  return matrix_a, vector_b
+
+
+def _open_cache(cache_dir, cache_max_bytes):
+  """Returns a result_cache.SorResultCache, or None without a cache_dir."""
+  if not cache_dir:
+    return None
+  return result_cache.SorResultCache(cache_dir, cache_max_bytes)
+
+
+def solve_problem(matrix_a, vector_b, cache=None):
+  """Returns the sor_pb2.SorReturnValue solving Ax = b."""
+  solver = sparse_sor.SparseSorSolver(
+      matrix_a, vector_b, MAXITS, TOLERANCE, RELAXATION_RATE, cache=cache)
+  return solver.to_proto()
+
+
+def find_batch_inputs(pattern):
+  """Returns the sorted input filenames in a directory or matching a glob."""
+  if os.path.isdir(pattern):
+    return sorted(
+        os.path.join(pattern, name) for name in os.listdir(pattern)
+        if name.endswith(INPUT_EXTENSIONS) and
+        os.path.isfile(os.path.join(pattern, name)))
+  return sorted(name for name in glob.glob(pattern) if os.path.isfile(name))
+
+
+def batch_output_filename(input_filename, output_directory=None):
+  """Returns the output path matching an input path."""
+  output_filename = os.path.splitext(input_filename)[0] + OUTPUT_EXTENSION
+  if output_directory is None:
+    return output_filename
+  return os.path.join(output_directory, os.path.basename(output_filename))
+
+
+def check_batch_outputs(input_filenames, output_filenames):
+  """Checks that no output overwrites an input or another output.
+
+  Args:
+    input_filenames: A list of string input filenames.
+    output_filenames: A list of the string output filename of each input.
+  Raises:
+    BatchOutputError naming the clashing files.
+  """
+  inputs = {os.path.realpath(name): name for name in input_filenames}
+  outputs = {}
+  for input_filename, output_filename in zip(input_filenames,
+                                             output_filenames):
+    path = os.path.realpath(output_filename)
+    if path in inputs:
+      raise BatchOutputError("Output %s of %s would overwrite input %s" % (
+          output_filename, input_filename, inputs[path]))
+    if path in outputs:
+      raise BatchOutputError("%s and %s would both write %s" % (
+          outputs[path], input_filename, output_filename))
+    outputs[path] = input_filename
+
+
+def solve_file(input_filename, output_filename, cache_dir=None,
+               cache_max_bytes=result_cache.DEFAULT_MAX_BYTES):
+  """Solves one input file and writes its output. Runs in a batch worker.
+
+  Returns:
+    A BatchResult. Failures are reported in it rather than raised so one bad
+    input does not stop the batch.
+  """
+  start = time.perf_counter()
+  try:
+    matrix_a, vector_b = read_problem(input_filename)
+    solution_proto = solve_problem(
+        matrix_a, vector_b, _open_cache(cache_dir, cache_max_bytes))
+    data_io.write_output(solution_proto, output_filename)
+  except Exception as error:
+    return BatchResult(input_filename, output_filename, None, 0,
+                       time.perf_counter() - start,
+                       "%s: %s" % (type(error).__name__, error))
+  return BatchResult(
+      input_filename, output_filename,
+      sor_pb2.SorReturnValue.StoppingReason.Name(
+          solution_proto.stopping_reason),
+      solution_proto.stopping_iteration, time.perf_counter() - start, None)
+
+
+def run_batch(input_filenames, output_directory=None, workers=None,
+              cache_dir=None, cache_max_bytes=result_cache.DEFAULT_MAX_BYTES):
+  """Solves every input file across a pool of worker processes.
+
+  Args:
+    input_filenames: A list of string input filenames.
+    output_directory: An optional directory for the outputs. Each output is
+        written next to its input otherwise.
+    workers: The integer number of worker processes. Defaults to the number
+        of CPUs.
+    cache_dir: An optional result cache directory shared by the workers.
+    cache_max_bytes: The integer size bound of the result cache.
+  Returns:
+    A list of BatchResult in the order of input_filenames.
+  Raises:
+    BatchOutputError if an output would overwrite an input or another
+        output. Nothing is solved or written then.
+  """
+  output_filenames = [batch_output_filename(input_filename, output_directory)
+                      for input_filename in input_filenames]
+  check_batch_outputs(input_filenames, output_filenames)
+  if output_directory is not None:
+    os.makedirs(output_directory, exist_ok=True)
+  with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+    futures = [
+        pool.submit(solve_file, input_filename, output_filename, cache_dir,
+                    cache_max_bytes)
+        for input_filename, output_filename in zip(input_filenames,
+                                                   output_filenames)]
+    return [future.result() for future in futures]
+
+
+def format_batch_summary(results, elapsed_seconds):
+  """Returns a printable summary of throughput, failures and stop reasons."""
+  failures = [result for result in results if result.error is not None]
+  histogram = collections.Counter(
+      result.stopping_reason for result in results if result.error is None)
+  lines = ["Solved %s of %s inputs in %.3f s (%.1f inputs/s)" % (
+      len(results) - len(failures), len(results), elapsed_seconds,
+      len(results) / elapsed_seconds if elapsed_seconds > 0 else 0.0)]
+  lines.append("Stopping reasons:")
+  for reason, count in sorted(histogram.items()):
+    lines.append("  %-26s %s" % (reason, count))
+  lines.append("Failures: %s" % len(failures))
+  for result in failures:
+    lines.append("  %s: %s" % (result.input_filename, result.error))
+  return "\n".join(lines)
+
+
+def main(argv=None):
+  args = parse_args(argv)
+  cache_max_bytes = int(args.cache_max_mb * 1024 * 1024)
+  if args.batch is not None:
+    input_filenames = find_batch_inputs(args.batch)
+    if not input_filenames:
+      print("No input files found for: %s" % args.batch)
+      return 1
+    print("Solving %s inputs with %s workers" %
+          (len(input_filenames), args.workers))
+    start = time.perf_counter()
+    try:
+      results = run_batch(input_filenames, args.output_dir, args.workers,
+                          args.cache_dir, cache_max_bytes)
+    except BatchOutputError as error:
+      print("Not solving the batch: %s" % error)
+      return 1
+    print(format_batch_summary(results, time.perf_counter() - start))
+    return 1 if any(result.error for result in results) else 0
+
+  cache = _open_cache(args.cache_dir, cache_max_bytes)
+  print("Reading input data from file: %s" % args.input_filename)
+  matrix_a, vector_b = read_problem(args.input_filename, args.rhs_filename)
+  solution_proto = solve_problem(matrix_a, vector_b, cache)
+  if cache is not None:
+    print("Result cache: %(hits)s hits, %(misses)s misses, %(evictions)s "
+          "evictions, %(entries)s entries, %(bytes)s bytes" % cache.stats())
+  print("Calculation complete. Writing solution to: %s" %
+        args.output_filename)
+  data_io.write_output(solution_proto, args.output_filename)
+  return 0
+
 
 if __name__ == "__main__":
-  # Remove one for the program itself.
-  args = len(sys.argv) - 1
-  print("Number of additional command line args passed: %s" % args)
-  # Default values
-  input_filename = "nas_Sor.in"
-  output_filename = "nas_Sor.out"
-  if args > 2:
-    raise Exception("Error: Too many command line args passed")
-  elif args == 2:
-    output_filename = sys.argv[2]
-  if args >= 1:
-    input_filename = sys.argv[1]
-  print("Reading input data from file: %s" % input_filename)
-  matrix_proto, vector_proto = data_io.read_input(input_filename)
-  matrix_a = sparse_matrix.SparseMatrix(matrix_proto)
-  vector_b = vector.Vector(vector_proto=vector_proto)
-  solver = sparse_sor.SparseSorSolver(matrix_a, vector_b, 10, .0001, 1.0)
-  solution_proto = solver.to_proto()
-  print("Calculation complete. Writing solution to: %s" % output_filename)
-  data_io.write_output(solution_proto, output_filename)
+  sys.exit(main())
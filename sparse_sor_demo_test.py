@@ -0,0 +1,95 @@
+#! /usr/bin/python3
+"""Unit tests associated with sparse_sor_demo.py."""
+import csr_file
+import os
+import shutil
+import sparse_matrix
+import tempfile
+import unittest
+import sparse_sor_demo
+
+INPUT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "testdata", "nas_Sor.in")
+
+class SparseSorDemoBatchTest(unittest.TestCase):
+
+  def setUp(self):
+    self.temporary_directory = tempfile.TemporaryDirectory()
+    self.input_directory = os.path.join(self.temporary_directory.name, "in")
+    self.output_directory = os.path.join(self.temporary_directory.name, "out")
+    os.makedirs(self.input_directory)
+    for name in ("a.in", "b.in"):
+      shutil.copy(INPUT_FILENAME, os.path.join(self.input_directory, name))
+    with open(os.path.join(self.input_directory, "bad.in"), "w") as file_obj:
+      file_obj.write("junk")
+    with open(os.path.join(self.input_directory, "notes.txt"), "w") as file_obj:
+      file_obj.write("not an input")
+
+  def tearDown(self):
+    self.temporary_directory.cleanup()
+
+  def testFindBatchInputs(self):
+    names = [os.path.basename(name) for name in
+             sparse_sor_demo.find_batch_inputs(self.input_directory)]
+    self.assertEqual(["a.in", "b.in", "bad.in"], names)
+    names = [os.path.basename(name) for name in
+             sparse_sor_demo.find_batch_inputs(
+                 os.path.join(self.input_directory, "[ab].in"))]
+    self.assertEqual(["a.in", "b.in"], names)
+
+  def testBatchOutputFilename(self):
+    self.assertEqual("in/a.out",
+                     sparse_sor_demo.batch_output_filename("in/a.in"))
+    self.assertEqual("out/a.out",
+                     sparse_sor_demo.batch_output_filename("in/a.in", "out"))
+
+  def testRunBatch_DuplicateOutputs(self):
+    inputs = [os.path.join(self.input_directory, "a.in"),
+              os.path.join(self.input_directory, "a.mtx")]
+    with self.assertRaisesRegex(sparse_sor_demo.BatchOutputError,
+                                "would both write"):
+      sparse_sor_demo.run_batch(inputs, self.output_directory, 1)
+    self.assertFalse(os.path.exists(self.output_directory))
+
+  def testRunBatch_OutputOverwritesInput(self):
+    output_input = os.path.join(self.input_directory, "c.out")
+    shutil.copy(INPUT_FILENAME, output_input)
+    inputs = sparse_sor_demo.find_batch_inputs(
+        os.path.join(self.input_directory, "*"))
+    with self.assertRaisesRegex(sparse_sor_demo.BatchOutputError,
+                                "would overwrite input"):
+      sparse_sor_demo.run_batch(inputs, None, 1)
+    with open(output_input) as file_obj, open(INPUT_FILENAME) as expected:
+      self.assertEqual(expected.read(), file_obj.read())
+
+  def testReadProblem_CorruptCsrFile(self):
+    filename = os.path.join(self.input_directory, "a.csr")
+    csr_file.write_csr_file(sparse_matrix.SparseMatrix(
+        dense_matrix=[[4.0, 1.0], [1.0, 4.0]]), filename)
+    matrix_a, _ = sparse_sor_demo.read_problem(filename)
+    self.assertEqual([[4.0, 1.0], [1.0, 4.0]], matrix_a.to_dense_matrix())
+    with open(filename, "r+b") as file_obj:
+      file_obj.seek(-1, os.SEEK_END)
+      file_obj.write(b"\x7f")
+    self.assertRaises(csr_file.CsrFileError, sparse_sor_demo.read_problem,
+                      filename)
+
+  def testRunBatch(self):
+    inputs = sparse_sor_demo.find_batch_inputs(self.input_directory)
+    results = sparse_sor_demo.run_batch(inputs, self.output_directory, 2)
+    self.assertEqual(inputs, [result.input_filename for result in results])
+    self.assertEqual(["RESIDUAL_CONVERGENCE", "RESIDUAL_CONVERGENCE", None],
+                     [result.stopping_reason for result in results])
+    self.assertIn("TextFormatError", results[2].error)
+    expected = sparse_sor_demo.solve_problem(
+        *sparse_sor_demo.read_problem(INPUT_FILENAME))
+    for result in results[:2]:
+      with open(result.output_filename) as file_obj:
+        self.assertEqual(str(expected), file_obj.read())
+    summary = sparse_sor_demo.format_batch_summary(results, 1.0)
+    self.assertIn("Solved 2 of 3 inputs", summary)
+    self.assertIn("RESIDUAL_CONVERGENCE       2", summary)
+    self.assertIn("Failures: 1", summary)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -123,6 +123,188 @@ class SparseSorSolverTest(unittest.TestCase):
     solution_proto = sparse_sor_solver.to_proto()
     self.assertEqual(type(solution_proto), sor_pb2.SorReturnValue)
 
+  def testSparseSorSolver_ReusedForManyRightHandSides(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[3, -1, 1],
+         [-1, 3, -1],
+         [1, -1, 3]])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(matrix_a, maxits=50, e=10**-8)
+
+    solution_1 = sparse_sor_solver.solve(
+        vector.Vector(name="b", number_list=[-1, 7, -7]))
+    solution_2 = sparse_sor_solver.solve(
+        vector.Vector(name="b", number_list=[3, 1, 3]))
+
+    self.assertEqual(type(solution_1), sor_pb2.SorReturnValue)
+    self.assertTrue(all(almost_equal(*values) for values in
+                        zip([1, 2, -2], solution_1.vector.values)))
+    self.assertTrue(all(almost_equal(*values) for values in
+                        zip([1, 1, 1], solution_2.vector.values)))
+    self.assertEqual(solution_2, sparse_sor_solver.to_proto())
+
+  def testSparseSorSolver_InitialGuess(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[3, -1, 1],
+         [-1, 3, -1],
+         [1, -1, 3]])
+    vector_b = vector.Vector(name="b", number_list=[-1, 7, -7])
+
+    cold_solver = sparse_sor.SparseSorSolver(
+        matrix_a, vector_b, 50, 10**-8, 1.0)
+    warm_solver = sparse_sor.SparseSorSolver(
+        matrix_a, vector_b, 50, 10**-8, 1.0, initial_guess=[1.001, 2, -2])
+
+    self.assertLess(warm_solver.iteration, cold_solver.iteration)
+    self.assertTrue(all(
+        almost_equal(*values) for values in zip([1, 2, -2], warm_solver.x)))
+
+  def testSparseSorSolver_FusedMatchesStoppingReasons(self):
+    vector_b = vector.Vector(name="b", number_list=[-1, 7, -7])
+    for matrix in (self.matrix_a, self.positive_definite_symmetric):
+      for maxits, e, w in ((10, 10**-20, 1.0), (50, 10**-20, 1.9),
+                           (250, 10**-20, 1.0), (100, .0001, 30.0)):
+        solver = sparse_sor.SparseSorSolver(matrix, vector_b, maxits, e, w)
+        fused_solver = sparse_sor.SparseSorSolver(
+            matrix, vector_b, maxits, e, w, fused=True)
+        self.assertEqual(solver.stopping_reason, fused_solver.stopping_reason)
+        self.assertEqual(solver.iteration, fused_solver.iteration)
+
+  def testSparseSorSolver_ResidualCheckInterval(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[3.9, 0, 0],
+         [0, 7.8, 0],
+         [0, 0, 11.7]])
+    vector_b = vector.Vector(name="b", number_list=[2, 3, 4])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(
+        matrix_a, vector_b, 10, .0001, 1.0, fused=True,
+        residual_check_interval=3)
+    self.assertEqual(sparse_sor_solver.stopping_reason,
+                     sor_pb2.SorReturnValue.X_SEQUENCE_CONVERGENCE)
+    self.assertEqual(sparse_sor_solver.iteration, 2)
+
+  def testSparseSorSolver_FusedZeroOnDiagonal(self):
+    zero_diagonal_mat = sparse_matrix.SparseMatrix(dense_matrix=
+          [[4, 1],
+           [1, 0]])
+    b_vector = vector.Vector(name = "b", number_list = [2, 2])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(
+            zero_diagonal_mat, b_vector, 50, 10**-20, 1, fused=True)
+    self.assertEqual(sparse_sor_solver.stopping_reason,
+                     sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL)
+
+  def testSparseSorSolver_Multicolor(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[3, -1, 1],
+         [-1, 3, -1],
+         [1, -1, 3]])
+    vector_b = vector.Vector(name="b", number_list=[-1, 7, -7])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(
+        matrix_a, vector_b, 100, 10**-8, 1.0,
+        ordering=sparse_sor.MULTICOLOR_ORDERING)
+
+    self.assertEqual(3, sparse_sor_solver.color_count)
+    self.assertEqual([0, 1, 2], sparse_sor_solver.coloring)
+    self.assertEqual(sparse_sor_solver.iteration,
+                     len(sparse_sor_solver.sweep_times))
+    self.assertNotEqual(sparse_sor_solver.stopping_reason,
+                        sor_pb2.SorReturnValue.MAX_ITERATIONS_REACHED)
+    self.assertTrue(all(
+        almost_equal(*values) for values in zip([1, 2, -2], sparse_sor_solver.x)))
+
+  def testSparseSorSolver_MulticolorTridiagonal(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[4, 1, 0, 0, 0],
+         [1, 4, 1, 0, 0],
+         [0, 1, 4, 1, 0],
+         [0, 0, 1, 4, 1],
+         [0, 0, 0, 1, 4]])
+    vector_b = vector.Vector(name="b", number_list=[5, 6, 6, 6, 5])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(
+        matrix_a, vector_b, 100, 10**-10, 1.2,
+        ordering=sparse_sor.MULTICOLOR_ORDERING)
+
+    self.assertEqual(2, sparse_sor_solver.color_count)
+    self.assertTrue(all(
+        almost_equal(value, 1) for value in sparse_sor_solver.x))
+    self.assertIsInstance(sparse_sor_solver.x, list)
+    self.assertEqual(sor_pb2.SorReturnValue,
+                     type(sparse_sor_solver.to_proto()))
+
+  def testSparseSorSolver_MulticolorZeroOnDiagonal(self):
+    zero_diagonal_mat = sparse_matrix.SparseMatrix(dense_matrix=
+          [[4, 1],
+           [1, 0]])
+    b_vector = vector.Vector(name = "b", number_list = [2, 2])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(
+            zero_diagonal_mat, b_vector, 50, 10**-20, 1,
+            ordering=sparse_sor.MULTICOLOR_ORDERING)
+    self.assertEqual(sparse_sor_solver.stopping_reason,
+                     sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL)
+    self.assertIsInstance(sparse_sor_solver.x, list)
+
+  def testSparseSorSolver_UnknownOrdering(self):
+    self.assertRaises(sparse_sor.SorSolverInputException,
+                      sparse_sor.SparseSorSolver, self.matrix_a,
+                      ordering="backwards")
+
+  def testSparseSorSolver_SolveBatchMatchesSingleSolves(self):
+    right_hand_sides = [[-1, 1, 2],
+                        [7, 1, 3],
+                        [-7, 1, 4]]
+    for matrix in (self.matrix_a, self.positive_definite_symmetric):
+      for maxits, e, w in ((10, 10**-20, 1.0), (250, 10**-10, 1.0),
+                           (100, .0001, 1.5), (100, .0001, 30.0)):
+        sparse_sor_solver = sparse_sor.SparseSorSolver(
+            matrix, maxits=maxits, e=e, w=w, fused=True)
+        batch = sparse_sor_solver.solve_batch(right_hand_sides)
+        self.assertEqual(3, len(batch))
+        for column, solution in enumerate(batch):
+          single = sparse_sor_solver.solve(vector.Vector(
+              name="b", number_list=[row[column] for row in right_hand_sides]))
+          self.assertEqual(single.stopping_reason, solution.stopping_reason)
+          self.assertEqual(single.stopping_iteration,
+                           solution.stopping_iteration)
+          if single.stopping_reason != (
+              sor_pb2.SorReturnValue.X_SEQUENCE_DIVERGENCE):
+            self.assertTrue(all(almost_equal(*values, accuracy=10**-9)
+                                for values in zip(single.vector.values,
+                                                  solution.vector.values)))
+
+  def testSparseSorSolver_SolveBatchZeroOnDiagonal(self):
+    zero_diagonal_mat = sparse_matrix.SparseMatrix(dense_matrix=
+          [[4, 1],
+           [1, 0]])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(zero_diagonal_mat)
+    batch = sparse_sor_solver.solve_batch([[2, 1], [2, 1]])
+    self.assertEqual([sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL] * 2,
+                     [solution.stopping_reason for solution in batch])
+
+  def testSparseSorSolver_SolveBatchNonConformable(self):
+    sparse_sor_solver = sparse_sor.SparseSorSolver(self.matrix_a)
+    self.assertRaises(sparse_sor.SorSolverInputException,
+                      sparse_sor_solver.solve_batch, [[1, 2], [3, 4]])
+    self.assertRaises(sparse_sor.SorSolverInputException,
+                      sparse_sor_solver.solve_batch, [[1], [2], [3]], [[0]])
+
+  def testSparseSorSolver_SolveNonConformable(self):
+    sparse_sor_solver = sparse_sor.SparseSorSolver(self.matrix_a)
+    self.assertRaises(sparse_sor.SorSolverInputException,
+                      sparse_sor_solver.solve,
+                      vector.Vector(name="b", number_list=[1, 1]))
+    self.assertRaises(sparse_sor.SorSolverInputException,
+                      sparse_sor_solver.solve, self.vector_b, [0, 0])
+
+  def testSparseSorSolver_NumpyStorage(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[3, -1, 1],
+         [-1, 3, -1],
+         [1, -1, 3]], use_numpy=True)
+    vector_b = vector.Vector(name="b", number_list=[-1, 7, -7])
+    sparse_sor_solver = sparse_sor.SparseSorSolver(
+        matrix_a, vector_b, 10, .0001, 1.0)
+    self.assertTrue(all(
+        almost_equal(*values) for values in zip([1, 2, -2], sparse_sor_solver.x)))
+
   def testIllConditionedNormalRelaxation(self):
     matrix_ill_conditioned = sparse_matrix.SparseMatrix(dense_matrix=
           [[1.01, 1],
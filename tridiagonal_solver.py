@@ -0,0 +1,120 @@
+"""Direct O(n) solver for tridiagonal systems Ax = b (Thomas algorithm)."""
+import sparse_sor
+import vector
+from proto_genfiles.protos import sor_pb2
+
+
+class TridiagonalSolver(object):
+  def __init__(self, matrix, vector=None):
+    """Initialize Tridiagonal Solver
+
+    The LU factorization of A is computed once here. If a vector is passed it
+    is solved immediately, otherwise call solve() for each right hand side.
+
+    Args:
+      matrix: A sparse_matrix.SparseMatrix. This needs to be tridiagonal.
+      vector: An optional vector.Vector
+
+    Raises:
+      sparse_sor.SorSolverInputException if the matrix is not tridiagonal.
+    """
+    if not matrix.is_tridiagonal():
+      raise sparse_sor.SorSolverInputException(
+          "Matrix must be square with bandwidth 1 for a tridiagonal solve")
+    self.A = matrix
+    self._factorize()
+    self.b = None
+    self.iteration = 0
+    self.stopping_reason = sor_pb2.SorReturnValue.UNKNOWN
+    self.x = None
+    if vector is not None:
+      self.solve(vector)
+
+  def _factorize(self):
+    """Splits A into its three diagonals and eliminates the lower one.
+
+    Sets self.lower, the sub diagonal, self.pivots, the diagonal after
+    elimination, and self.upper_ratios, the super diagonal divided by the
+    pivots. self.pivot_failure is the first row with a 0 pivot, or None.
+    """
+    n = self.A.rows
+    lower = [0] * n
+    diagonal = [0] * n
+    upper = [0] * n
+    for i in range(n):
+      for j in range(self.A.rowStart[i], self.A.rowStart[i + 1]):
+        col = self.A.cols[j]
+        if col == i - 1:
+          lower[i] = self.A.vals[j]
+        elif col == i:
+          diagonal[i] = self.A.vals[j]
+        else:
+          upper[i] = self.A.vals[j]
+    self.lower = lower
+    self.pivots = [0] * n
+    self.upper_ratios = [0] * n
+    self.pivot_failure = None
+    upper_ratio = 0
+    for i in range(n):
+      pivot = diagonal[i] - lower[i] * upper_ratio
+      if pivot == 0:
+        self.pivot_failure = i
+        return
+      upper_ratio = upper[i] / pivot
+      self.pivots[i] = pivot
+      self.upper_ratios[i] = upper_ratio
+
+  def solve(self, vector, x0=None):
+    """Solve Ax = b directly for a new right hand side.
+
+    Args:
+      vector: A vector.Vector b.
+      x0: Ignored. Accepted so this can stand in for a
+          sparse_sor.SparseSorSolver.
+
+    Returns:
+      A sor_pb2.SorReturnValue proto of the solution.
+
+    Raises:
+      sparse_sor.SorSolverInputException if b is not conformable with A.
+    """
+    if not self.A.rows == vector.length:
+      raise sparse_sor.SorSolverInputException(
+          "Lengths are not conformable Ax = b hence number of rows in A must "
+          "equal number of rows in b")
+    self.b = vector
+    n = self.A.rows
+    self.x = [0] * n
+    if self.pivot_failure is not None:
+      print("Error Zero pivot in row %s. Computation terminated." %
+            self.pivot_failure)
+      self.iteration = 0
+      self.stopping_reason = sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL
+      return self.to_proto()
+    # Forward substitution.
+    x = self.x
+    previous = 0
+    values = vector.buffer
+    for i in range(n):
+      previous = (values[i] - self.lower[i] * previous) / self.pivots[i]
+      x[i] = previous
+    # Back substitution.
+    for i in range(n - 2, -1, -1):
+      x[i] -= self.upper_ratios[i] * x[i + 1]
+    self.iteration = 1
+    self.stopping_reason = sor_pb2.SorReturnValue.DIRECT_SOLVE
+    return self.to_proto()
+
+  def get_solution(self):
+    """Returns the solution vector x.
+    Returns:
+      A vector.Vector of the solution x.
+    """
+    return vector.Vector(name = 'x', number_list = self.x)
+
+  def to_proto(self):
+    """Converts solution to proto for storage and transmission."""
+    return sor_pb2.SorReturnValue(
+        result_name="x", stopping_reason=self.stopping_reason,
+        vector=self.get_solution().to_proto(),
+        stopping_iteration=self.iteration)
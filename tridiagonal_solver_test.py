@@ -0,0 +1,67 @@
+#! /usr/bin/python3
+"""Unit tests associated with tridiagonal_solver.py."""
+import sparse_matrix
+import sparse_sor
+import tridiagonal_solver
+import vector
+from proto_genfiles.protos import sor_pb2
+import unittest
+
+def almost_equal(value_1, value_2, accuracy = 10**-9):
+  return abs(value_1 - value_2) < accuracy
+
+class TridiagonalSolverTest(unittest.TestCase):
+
+  def setUp(self):
+    self.matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[4, 1, 0, 0],
+         [2, 5, 1, 0],
+         [0, -1, 6, 2],
+         [0, 0, 3, 7]])
+
+  def testTridiagonalSolver_SolvedExample(self):
+    # b = A * [1, 2, 3, 4]
+    vector_b = vector.Vector(name="b", number_list=[6, 15, 24, 37])
+    solver = tridiagonal_solver.TridiagonalSolver(self.matrix_a, vector_b)
+
+    self.assertTrue(all(
+        almost_equal(*values) for values in zip([1, 2, 3, 4], solver.x)))
+    self.assertEqual(sor_pb2.SorReturnValue.DIRECT_SOLVE,
+                     solver.stopping_reason)
+    self.assertEqual(1, solver.iteration)
+
+  def testTridiagonalSolver_MatchesSor(self):
+    vector_b = vector.Vector(name="b", number_list=[1, -2, 3, 5])
+    solver = tridiagonal_solver.TridiagonalSolver(self.matrix_a)
+    solution = solver.solve(vector_b)
+    sor_solver = sparse_sor.SparseSorSolver(
+        self.matrix_a, vector_b, 200, 10**-14, 1.0)
+
+    self.assertEqual(type(solution), sor_pb2.SorReturnValue)
+    self.assertTrue(all(almost_equal(*values, accuracy=10**-6) for values in
+                        zip(sor_solver.x, solution.vector.values)))
+
+  def testTridiagonalSolver_NotTridiagonal(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[3, -1, 1],
+         [-1, 3, -1],
+         [1, -1, 3]])
+    self.assertRaises(sparse_sor.SorSolverInputException,
+                      tridiagonal_solver.TridiagonalSolver, matrix_a)
+
+  def testTridiagonalSolver_ZeroPivot(self):
+    matrix_a = sparse_matrix.SparseMatrix(dense_matrix=
+        [[1, 1],
+         [1, 1]])
+    vector_b = vector.Vector(name="b", number_list=[2, 2])
+    solver = tridiagonal_solver.TridiagonalSolver(matrix_a, vector_b)
+    self.assertEqual(sor_pb2.SorReturnValue.ZERO_ON_DIAGONAL,
+                     solver.stopping_reason)
+
+  def testTridiagonalSolver_NonConformable(self):
+    solver = tridiagonal_solver.TridiagonalSolver(self.matrix_a)
+    self.assertRaises(sparse_sor.SorSolverInputException, solver.solve,
+                      vector.Vector(name="b", number_list=[1, 1]))
+
+if __name__ == '__main__':
+  unittest.main()
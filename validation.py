@@ -1,6 +1,7 @@
 """Validation libraries for testing assumptions."""
 import proto_genfiles.protos.sor_pb2
 import numbers
+import numpy
 
 class ValidationError(Exception):
   """If the data is invalid"""
@@ -33,19 +34,70 @@ def ValidateSparseMatrixProto(sparse_matrix_proto):
   """
   max_rows = sparse_matrix_proto.row_count
   max_columns = sparse_matrix_proto.column_count
-  collision_grid = [
-      [False for _ in range(max_columns)] for _ in range(max_rows)]
   if len(sparse_matrix_proto.values) > max_rows * max_columns:
     raise ValidationError("Too many values present in sparse matrix proto")
+  # Cells already written to, packed into a single integer key. Memory scales
+  # with the number of values rather than the matrix dimensions.
+  seen_cells = set()
   for value in sparse_matrix_proto.values:
     if value.column_index >= max_columns or value.row_index >= max_rows:
       raise ValidationError("Row or column index out of bounds")
     # Need to check collisions. I.e. two or more values writing to same cell.
-    if collision_grid[value.row_index][value.column_index]:
+    cell = value.row_index * max_columns + value.column_index
+    if cell in seen_cells:
       raise ValidationError("Duplicate values written to one cell")
-    else:
-      # Set the value for this cell to seen.
-      collision_grid[value.row_index][value.column_index] = True
+    seen_cells.add(cell)
+  return True
+
+def ValidateCsrMatrixProto(csr_matrix_proto):
+  """Check if the CsrMatrix proto is consistent
+
+  Args:
+    csr_matrix_proto: A sor_pb2.CsrMatrix.
+  Returns:
+    True if the input is valid.
+  Raises:
+    ValidationError if the input is invalid.
+  """
+  if len(csr_matrix_proto.row_ptr) != csr_matrix_proto.row_count + 1:
+    raise ValidationError("row_ptr must have row_count + 1 entries")
+  return ValidateCsrArrays(
+      csr_matrix_proto.row_ptr, csr_matrix_proto.col_index,
+      len(csr_matrix_proto.value), csr_matrix_proto.column_count)
+
+def ValidateCsrArrays(row_ptr, col_index, value_count, column_count):
+  """Check if csr arrays are consistent
+
+  Args:
+    row_ptr: A sequence of the rows + 1 offsets into col_index.
+    col_index: A sequence of the column index of each value.
+    value_count: The integer number of values.
+    column_count: The integer number of columns.
+  Returns:
+    True if the input is valid.
+  Raises:
+    ValidationError if the input is invalid.
+  """
+  try:
+    row_ptr = numpy.asarray(row_ptr, dtype=numpy.int64)
+    col_index = numpy.asarray(col_index, dtype=numpy.int64)
+  except OverflowError:
+    # The uint64 proto fields can hold offsets no real matrix reaches.
+    raise ValidationError("row_ptr and col_index entries must be below 2**63")
+  if not len(row_ptr):
+    raise ValidationError("row_ptr must have row_count + 1 entries")
+  if row_ptr[0] != 0 or (numpy.diff(row_ptr) < 0).any():
+    raise ValidationError("row_ptr must start at 0 and never decrease")
+  if not row_ptr[-1] == len(col_index) == value_count:
+    raise ValidationError("row_ptr, col_index and value lengths do not match")
+  if len(col_index) and (
+      col_index.max() >= column_count or col_index.min() < 0):
+    raise ValidationError("Row or column index out of bounds")
+  # Columns must increase within each row. This also rules out duplicates.
+  row_continues = numpy.ones(len(col_index), dtype=bool)
+  row_continues[row_ptr[:-1][row_ptr[:-1] < len(col_index)]] = False
+  if (numpy.diff(col_index) <= 0)[row_continues[1:]].any():
+    raise ValidationError("Columns must be increasing within each row")
   return True
 
 def ValidateNumberList(number_list):
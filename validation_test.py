@@ -53,6 +53,49 @@ class ValidationTest(unittest.TestCase):
     self.assertRaises(validation.ValidationError,
                       validation.ValidateSparseMatrixProto, matrix_a_proto)
 
+  def testValidateSparseMatrixProto_LargeDimensions(self):
+    matrix_a_proto = sor_pb2.SparseMatrix(
+      matrix_name='a', row_count=10**6, column_count=10**6)
+    for i in range(0, 10**6, 1000):
+      value = matrix_a_proto.values.add()
+      value.row_index = i
+      value.column_index = 10**6 - 1 - i
+      value.value = 1
+    self.assertTrue(validation.ValidateSparseMatrixProto(matrix_a_proto))
+
+  def testValidateCsrMatrixProto_Success(self):
+    csr_matrix_proto = sor_pb2.CsrMatrix(
+      matrix_name='a', row_count=3, column_count=3, row_ptr=[0, 2, 2, 3],
+      col_index=[0, 2, 1], value=[1, 2, 3])
+    self.assertTrue(validation.ValidateCsrMatrixProto(csr_matrix_proto))
+
+  def testValidateCsrMatrixProto_Invalid(self):
+    invalid_fields = [
+        # Wrong number of row offsets.
+        dict(row_ptr=[0, 2, 3], col_index=[0, 2, 1], value=[1, 2, 3]),
+        # Decreasing row offsets.
+        dict(row_ptr=[0, 2, 1, 3], col_index=[0, 2, 1], value=[1, 2, 3]),
+        # Too few values.
+        dict(row_ptr=[0, 2, 2, 3], col_index=[0, 2, 1], value=[1, 2]),
+        # Column out of bounds.
+        dict(row_ptr=[0, 2, 2, 3], col_index=[0, 3, 1], value=[1, 2, 3]),
+        # Duplicate column within a row.
+        dict(row_ptr=[0, 2, 2, 3], col_index=[1, 1, 1], value=[1, 2, 3]),
+    ]
+    for fields in invalid_fields:
+      csr_matrix_proto = sor_pb2.CsrMatrix(
+          matrix_name='a', row_count=3, column_count=3, **fields)
+      self.assertRaises(validation.ValidationError,
+                        validation.ValidateCsrMatrixProto, csr_matrix_proto)
+
+  def testValidateCsrMatrixProto_IndexTooLarge(self):
+    for fields in (dict(row_ptr=[0, 1, 2**63], col_index=[0], value=[1]),
+                   dict(row_ptr=[0, 1, 1], col_index=[2**63], value=[1])):
+      csr_matrix_proto = sor_pb2.CsrMatrix(
+          matrix_name='a', row_count=2, column_count=2, **fields)
+      self.assertRaises(validation.ValidationError,
+                        validation.ValidateCsrMatrixProto, csr_matrix_proto)
+
   def testValidateNumberList_Success(self):
     self.assertTrue(validation.ValidateNumberList([1, 2, 4, 6.5]))
   
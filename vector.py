@@ -1,4 +1,6 @@
 """Class and methods for working with Vectors."""
+import array
+import numpy
 import validation
 from proto_genfiles.protos import sor_pb2
 
@@ -6,12 +8,18 @@ class Vector(object):
   def __init__(self, name=None, number_list=None,  vector_proto=None):
     """Create a new vector object from the received vector proto.
 
+    The values are copied into one contiguous array('d') of doubles, so
+    indexing returns plain floats and the buffer can be shared with numpy
+    without copying.
+
     Args:
+      name: a string name for the vector
+      number_list: a sequence of numbers, an array('d') or a numpy array.
       vector_proto: A sor_pb2.Vector proto.
     Raises:
       validation.ValidationError if the proto is invalid.
     """
-    if number_list and vector_proto:
+    if number_list is not None and vector_proto is not None:
       raise Exception("Don't specify both")
     elif vector_proto is not None:
       self._from_proto(vector_proto)
@@ -25,23 +33,61 @@ class Vector(object):
 
     Args:
       name: a string name for the vector
-      number_list: a list of numbers either floats or integers.
+      number_list: a sequence of numbers, an array('d') or a numpy array.
     Raises:
       validation.ValidationError if there are non numbers passed.
     """
-    validation.ValidateNumberList(number_list)
     self._name = name
-    self._values = number_list
-    self._length = len(self.values)
+    if isinstance(number_list, (numpy.ndarray, array.array)):
+      # Bulk copy of the whole buffer rather than element by element.
+      self._values = array.array('d')
+      self._values.frombytes(
+          numpy.ascontiguousarray(number_list, dtype=numpy.float64).tobytes())
+    else:
+      try:
+        self._values = array.array('d', number_list)
+      except TypeError:
+        raise validation.ValidationError("Non numbers passed in list")
+    self._length = len(self._values)
 
   @property
   def values(self):
-    return self._values
+    """A snapshot list of the values.
+
+    Every access builds a new list, and changing it does not change the
+    vector. Index buffer instead in loops and to write values in place.
+    """
+    return self._values.tolist()
 
   @property
   def length(self):
     return self._length
 
+  @property
+  def buffer(self):
+    """A memoryview of the values that shares their memory.
+
+    buffer and numpy.asarray(vector) are the supported ways to reach the
+    memory. memoryview(vector) needs Python 3.12 or later.
+    """
+    return memoryview(self._values)
+
+  def __buffer__(self, flags):
+    """The buffer protocol hook. Python 3.12 and later only."""
+    return memoryview(self._values)
+
+  def __array__(self, dtype=None, copy=None):
+    """A numpy view of the values. Lets numpy.asarray skip the copy."""
+    values = numpy.frombuffer(self._values, dtype=numpy.float64)
+    if dtype is not None:
+      values = values.astype(dtype, copy=False)
+    if copy:
+      values = values.copy()
+    return values
+
+  def __len__(self):
+    return self._length
+
   def __repr__(self):
     return str(self.values)
 
@@ -55,10 +101,69 @@ class Vector(object):
     """
     validation.ValidateVectorProto(vector_proto)
     self._name = vector_proto.vector_name
-    self._values = vector_proto.values
+    # One bulk copy out of the repeated field. Indexing the field directly is
+    # much slower than indexing an array.
+    self._values = array.array('d', vector_proto.values)
     # This was verified above.
     self._length = len(self._values)
 
+  def _as_array(self, other):
+    """Returns other, a Vector or sequence of numbers, as a numpy array."""
+    other = numpy.asarray(other, dtype=numpy.float64)
+    if other.shape != (self._length,):
+      raise validation.ValidationError(
+          "Vector shapes do not match: %s and %s" %
+          ((self._length,), other.shape))
+    return other
+
+  def axpy(self, a, other):
+    """Adds a times other to this vector in place.
+
+    Args:
+      a: A float scale.
+      other: A Vector or sequence of numbers of the same length.
+    Returns:
+      This vector.
+    Raises:
+      validation.ValidationError if the lengths differ.
+    """
+    values = numpy.frombuffer(self._values, dtype=numpy.float64)
+    values += a * self._as_array(other)
+    return self
+
+  def dot(self, other):
+    """Returns the float dot product with a Vector or sequence of numbers."""
+    return float(numpy.frombuffer(self._values, dtype=numpy.float64).dot(
+        self._as_array(other)))
+
+  def norm1(self):
+    """Returns the float sum of the absolute values."""
+    return float(numpy.abs(
+        numpy.frombuffer(self._values, dtype=numpy.float64)).sum())
+
+  def norm_inf(self):
+    """Returns the float largest absolute value, 0 for an empty vector."""
+    if not self._length:
+      return 0.0
+    return float(numpy.abs(
+        numpy.frombuffer(self._values, dtype=numpy.float64)).max())
+
+  def copy_into(self, target, offset=0):
+    """Copies the values into part of a preallocated buffer.
+
+    Args:
+      target: A writable float64 numpy array, array('d') or Vector, or a list.
+      offset: The integer index in target to start writing at.
+    Returns:
+      target.
+    """
+    end = offset + self._length
+    if isinstance(target, list):
+      target[offset:end] = self._values
+    else:
+      numpy.asarray(target)[offset:end] = numpy.frombuffer(
+          self._values, dtype=numpy.float64)
+    return target
 
   def to_proto(self):
     """Converts Vector object to sor_pb2.Vector object
@@ -1,7 +1,10 @@
 #! /usr/bin/python3
 """Unit tests associated with validation.py."""
 from proto_genfiles.protos import sor_pb2
+import array
+import numpy
 import unittest
+import validation
 import vector
 
 class VectorTest(unittest.TestCase):
@@ -24,5 +27,57 @@ class VectorTest(unittest.TestCase):
     vector_a = vector.Vector(number_list=expected)
     self.assertEqual(vector_a.values, expected)
 
+  def testVector_NonNumbers(self):
+    self.assertRaises(validation.ValidationError, vector.Vector,
+                      number_list=[1, "2", 3])
+
+  def testVector_FromNumpyArray(self):
+    vector_a = vector.Vector(number_list=numpy.array([1, 2, 3]))
+    self.assertEqual([1.0, 2.0, 3.0], vector_a.values)
+    self.assertEqual(3, vector_a.length)
+
+  def testVector_SharesBuffer(self):
+    vector_a = vector.Vector(number_list=[1.0, 2.0])
+    view = numpy.asarray(vector_a)
+    view[0] = 5.0
+    self.assertEqual(5.0, vector_a.values[0])
+    self.assertEqual("d", vector_a.buffer.format)
+    vector_a.buffer[1] = 6.0
+    self.assertEqual([5.0, 6.0], vector_a.values)
+
+  def testVector_ValuesIsAList(self):
+    vector_a = vector.Vector(number_list=[1.0, 2.0])
+    self.assertIsInstance(vector_a.values, list)
+    vector_a.values[0] = 3.0
+    self.assertEqual([1.0, 2.0], vector_a.values)
+
+  def testVector_Kernels(self):
+    vector_a = vector.Vector(number_list=[1.0, -4.0, 2.0])
+    vector_b = vector.Vector(number_list=[2.0, 1.0, 0.5])
+    self.assertEqual(-1.0, vector_a.dot(vector_b))
+    self.assertEqual(7.0, vector_a.norm1())
+    self.assertEqual(4.0, vector_a.norm_inf())
+    self.assertIs(vector_a, vector_a.axpy(2.0, vector_b))
+    self.assertEqual([5.0, -2.0, 3.0], vector_a.values)
+    self.assertRaises(validation.ValidationError, vector_a.axpy, 1.0, [1.0])
+    self.assertRaises(validation.ValidationError, vector_a.dot, 1.0)
+
+  def testVector_CopyInto(self):
+    vector_a = vector.Vector(number_list=[1.0, 2.0])
+    target = numpy.zeros(4)
+    vector_a.copy_into(target, 1)
+    self.assertEqual([0.0, 1.0, 2.0, 0.0], target.tolist())
+    target = array.array('d', [0.0] * 3)
+    vector_a.copy_into(target)
+    self.assertEqual([1.0, 2.0, 0.0], list(target))
+    target = [9, 9, 9]
+    vector_a.copy_into(target, 1)
+    self.assertEqual([9, 1.0, 2.0], target)
+
+  def testVector_RoundTripProto(self):
+    vector_a = vector.Vector(name="a", number_list=[1.5, 2.5])
+    self.assertEqual(vector_a.to_proto(),
+                     vector.Vector(vector_proto=vector_a.to_proto()).to_proto())
+
 if __name__ == '__main__':
   unittest.main()